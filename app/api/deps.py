@@ -1,15 +1,40 @@
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import event
 from sqlalchemy.future import select
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import SessionLocal
-from app.schemas.user import TokenData
+from app.schemas.user import TokenData, UserPrincipal
 from app.models.sql import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+# Raw bearer token -> UserPrincipal. Entries never outlive the token's own expiry.
+_principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+def invalidate_user(user_id: int) -> int:
+    """
+    Drops every cached token of a user. Called automatically when a User row changes.
+    """
+    return _principal_cache.invalidate_where(lambda principal: principal.id == user_id)
+
+def _on_user_changed(mapper, connection, target):
+    invalidate_user(target.id)
+
+event.listen(User, "after_update", _on_user_changed)
+event.listen(User, "after_delete", _on_user_changed)
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserPrincipal:
+    cached = _principal_cache.get(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -20,13 +45,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        token_data = TokenData(email=email, user_id=payload.get("uid"))
     except JWTError:
         raise credentials_exception
     
     async with SessionLocal() as session:
-        result = await session.execute(select(User).where(User.email == token_data.email))
-        user = result.scalars().first()
-        if user is None:
+        # Tokens issued before the 'uid' claim existed fall back to the email lookup.
+        if token_data.user_id is not None:
+            stmt = select(User.id, User.email, User.full_name).where(User.id == token_data.user_id)
+        else:
+            stmt = select(User.id, User.email, User.full_name).where(User.email == token_data.email)
+        result = await session.execute(stmt)
+        row = result.first()
+        if row is None or row.email != token_data.email:
             raise credentials_exception
-        return user
+
+    principal = UserPrincipal(id=row.id, email=row.email, full_name=row.full_name)
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp else settings.AUTH_CACHE_TTL_SECONDS
+    _principal_cache.set(token, principal, ttl=ttl)
+    return principal
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import ingestion, chat, auth, budgets, dashboard
+from app.api.v1.endpoints import ingestion, chat, auth, budgets, dashboard, export, transactions
 
 api_router = APIRouter()
 
@@ -8,3 +8,5 @@ api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
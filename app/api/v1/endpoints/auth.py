@@ -4,13 +4,25 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.future import select
 
 from app.core.database import SessionLocal
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import (
+    hash_password_async,
+    verify_and_update_password_async,
+    create_access_token,
+    PasswordQueueFull,
+)
 from app.core.config import settings
 from app.models.sql import User
 from app.schemas.user import UserCreate, UserOut, Token
 
 router = APIRouter()
 
+def _busy_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/signup", response_model=UserOut)
 async def signup(user_in: UserCreate):
     async with SessionLocal() as session:
@@ -22,10 +34,15 @@ async def signup(user_in: UserCreate):
                 detail="The user with this email already exists in the system."
             )
         
+        try:
+            hashed_password = await hash_password_async(user_in.password)
+        except PasswordQueueFull:
+            raise _busy_exception()
+
         user = User(
             email=user_in.email,
             full_name=user_in.full_name,
-            hashed_password=get_password_hash(user_in.password)
+            hashed_password=hashed_password
         )
         session.add(user)
         await session.commit()
@@ -38,15 +55,27 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         result = await session.execute(select(User).where(User.email == form_data.username))
         user = result.scalars().first()
 
-        if not user or not verify_password(form_data.password, user.hashed_password): 
+        valid, new_hash = False, None
+        if user:
+            try:
+                valid, new_hash = await verify_and_update_password_async(form_data.password, user.hashed_password)
+            except PasswordQueueFull:
+                raise _busy_exception()
+
+        if not valid:
              raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+
+        # Work factor changed since this hash was created: upgrade it transparently.
+        if new_hash:
+            user.hashed_password = new_hash
+            await session.commit()
         
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
         )
         return {"access_token": access_token, "token_type": "bearer"}
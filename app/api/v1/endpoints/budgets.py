@@ -5,15 +5,18 @@ from typing import List
 
 from app.api.deps import get_current_user
 from app.core.database import SessionLocal
-from app.models.sql import User, Budget, Transaction, Document
+from app.models.sql import Budget, Transaction, MonthlyRollup
 from app.schemas.budget import BudgetCreate, BudgetOut, BudgetStatus
+from app.schemas.user import UserPrincipal
+from app.services.fx import base_amount_column
+from app.services.data_version import bump_data_version
 
 router = APIRouter()
 
 @router.post("/", response_model=BudgetOut)
 async def create_or_update_budget(
     budget_in: BudgetCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     async with SessionLocal() as session:
         # Check if budget exists for this category
@@ -24,11 +27,15 @@ async def create_or_update_budget(
             )
         )
         existing_budget = result.scalars().first()
-        
+        # Imported on first use so loading the API does not pull in numpy
+        from app.services.profile import update_profile
+
         if existing_budget:
             existing_budget.amount = budget_in.amount
+            await bump_data_version(session, current_user.id)
             await session.commit()
             await session.refresh(existing_budget)
+            await update_profile(current_user.id)
             return existing_budget
         else:
             new_budget = Budget(
@@ -37,13 +44,15 @@ async def create_or_update_budget(
                 amount=budget_in.amount
             )
             session.add(new_budget)
+            await bump_data_version(session, current_user.id)
             await session.commit()
             await session.refresh(new_budget)
+            await update_profile(current_user.id)
             return new_budget
 
 @router.get("/", response_model=List[BudgetOut])
 async def read_budgets(
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     async with SessionLocal() as session:
         result = await session.execute(
@@ -53,7 +62,7 @@ async def read_budgets(
 
 @router.get("/status", response_model=List[BudgetStatus])
 async def get_budget_status(
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Compares set budgets vs actual spending (Global/All-time for now).
@@ -70,12 +79,22 @@ async def get_budget_status(
         for budget in budgets:
             # 2. Sum transactions for this category (User specific)
             # Use denormalized user_id for direct filtering (more efficient)
-            stmt = select(func.sum(Transaction.amount)).where(
+            # Summed in the base currency (amount_base is converted at ingestion)
+            stmt = select(func.sum(base_amount_column())).where(
                 Transaction.user_id == current_user.id,
                 Transaction.category == budget.category
             )
             spent_result = await session.execute(stmt)
             spent = spent_result.scalar() or 0.0
+
+            # Plus archived months, kept as per-category monthly totals
+            archived_result = await session.execute(
+                select(func.sum(MonthlyRollup.total)).where(
+                    MonthlyRollup.user_id == current_user.id,
+                    MonthlyRollup.category == budget.category
+                )
+            )
+            spent += archived_result.scalar() or 0.0
             
             remaining = budget.amount - spent
             percent_used = (spent / budget.amount) * 100 if budget.amount > 0 else 0.0
@@ -1,12 +1,14 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from langchain_core.messages import HumanMessage
-from app.services.agent import app_graph
 from app.api.deps import get_current_user
-from app.models.sql import User
-from app.core.context import user_id_context
+from app.schemas.user import UserPrincipal
+from app.core.config import settings
+from app.core.context import user_id_context, set_deadline, DeadlineExceeded
+from app.core.logging import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 class ChatRequest(BaseModel):
     message: str
@@ -17,27 +19,35 @@ class ChatResponse(BaseModel):
 @router.post("/message", response_model=ChatResponse)
 async def chat_endpoint(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Interact with the Financial Agent.
     """
+    # Imported on first use so auth/dashboard-only workers never load LangChain/LangGraph
+    from langchain_core.messages import HumanMessage
+    from app.services.agent import get_app_graph
+
     try:
         # Set user context for thread-safe user isolation
         user_id_context.set(current_user.id)
+        # Every LLM call made for this answer shares one deadline (see llm_gateway)
+        set_deadline(settings.CHAT_DEADLINE_SECONDS)
 
         # Invoke the LangGraph agent
         # The input is the initial state: a list of messages
         inputs = {"messages": [HumanMessage(content=request.message)]}
-        print(request.message)
-        print("current_user", current_user.id)
+        logger.debug("chat message", extra={"user_id": current_user.id, "chars": len(request.message)})
         # We use .invoke() to run the graph until the end
-        result = await app_graph.ainvoke(inputs)
+        result = await asyncio.wait_for(get_app_graph().ainvoke(inputs), timeout=settings.CHAT_DEADLINE_SECONDS)
         
         # Extract the last message content (the agent's final answer)
         last_message = result["messages"][-1]
         
         return ChatResponse(response=last_message.content)
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        logger.warning("chat deadline exceeded", extra={"user_id": current_user.id, "deadline": settings.CHAT_DEADLINE_SECONDS})
+        raise HTTPException(status_code=504, detail="The assistant took too long to answer. Please try again.")
     except Exception as e:
-        print(f"Error in chat endpoint: {e}")
+        logger.exception("chat failed", extra={"user_id": current_user.id})
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,63 +1,31 @@
-from datetime import datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import text
 from app.api.deps import get_current_user
-from app.models.sql import User
-from app.core.database import SessionLocal
-from app.schemas.dashboard import DashboardStats, TimeRange, CategoryStat, TrendPoint
+from app.schemas.user import UserPrincipal
+from app.core.database import ReadSessionLocal
+from app.core.dialect import month_expr, day_expr
+from app.schemas.dashboard import DashboardStats, TimeRange, CategoryStat, TrendPoint, AnomalyOut, SpendingForecast
+from app.services.filters import build_transaction_filters, build_rollup_filters
+from app.services.fx import BASE_AMOUNT_SQL
 
 router = APIRouter()
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     time_range: TimeRange = Query(TimeRange.LAST_30D),
     categories: Optional[List[str]] = Query(None)
 ):
     """
     Get aggregated dashboard statistics with filters.
     """
-    # 1. Calculate Start Date
-    start_date = None
-    today = datetime.now().date()
-    
-    if time_range == TimeRange.LAST_24H:
-        start_date = today - timedelta(days=1)
-    elif time_range == TimeRange.LAST_7D:
-        start_date = today - timedelta(days=7)
-    elif time_range == TimeRange.LAST_30D:
-        start_date = today - timedelta(days=30)
-    elif time_range == TimeRange.LAST_3M:
-        start_date = today - timedelta(days=90)
-    elif time_range == TimeRange.LAST_6M:
-        start_date = today - timedelta(days=180)
-    elif time_range == TimeRange.LAST_1Y:
-        start_date = today - timedelta(days=365)
-    # ALL_TIME -> start_date remains None
+    where_clause, params = build_transaction_filters(current_user.id, time_range, categories)
+    # Archived months (python -m app.lifecycle) only exist as per-category monthly totals
+    rollup_where, rollup_params = build_rollup_filters(current_user.id, time_range, categories)
+    params = {**params, **rollup_params}
 
-    # 2. Build Query Filters
-    filters = ["user_id = :uid"]
-    params = {"uid": current_user.id}
-
-    if start_date:
-        filters.append("date >= :start_date")
-        params["start_date"] = start_date
-
-    if categories:
-        # Handling list IN clause safely with SQLAlchemy text is tricky with bind params for lists in some drivers.
-        # We will expand keys like :cat_0, :cat_1
-        cat_clauses = []
-        for i, cat in enumerate(categories):
-            key = f"cat_{i}"
-            cat_clauses.append(f":{key}")
-            params[key] = cat
-        if cat_clauses:
-            filters.append(f"category IN ({','.join(cat_clauses)})")
-
-    where_clause = " WHERE " + " AND ".join(filters)
-
-    async with SessionLocal() as session:
+    async with ReadSessionLocal() as session:
         # --- A. Total Spent & Top Category ---
         # Note: We can reuse the result of Category Breakdown to avoid extra queries, 
         # but a direct sum is cleaner for the 'total' if categories filter excludes items.
@@ -65,9 +33,18 @@ async def get_dashboard_stats(
         
         # --- B. Category Breakdown ---
         cat_query = f"""
-        SELECT category, SUM(amount) as total
-        FROM transactions
-        {where_clause}
+        SELECT category, SUM(total) as total
+        FROM (
+            SELECT category, SUM({BASE_AMOUNT_SQL}) as total
+            FROM transactions
+            {where_clause}
+            GROUP BY category
+            UNION ALL
+            SELECT category, SUM(total) as total
+            FROM monthly_rollups
+            {rollup_where}
+            GROUP BY category
+        ) combined
         GROUP BY category
         ORDER BY total DESC
         """
@@ -92,18 +69,31 @@ async def get_dashboard_stats(
         
         if is_long_range:
             # Group by Month (YYYY-MM)
-            date_col = "strftime('%Y-%m', date)" 
+            date_col = month_expr("date")
         else:
             # Group by Day (YYYY-MM-DD)
-            date_col = "date"
+            date_col = day_expr("date")
 
         trend_query = f"""
-        SELECT {date_col} as period, SUM(amount) as total
+        SELECT {date_col} as period, SUM({BASE_AMOUNT_SQL}) as total
         FROM transactions
         {where_clause}
         GROUP BY period
-        ORDER BY period ASC
         """
+        if is_long_range:
+            # Archived months only have monthly totals; daily ranges (<= 3m) never reach them
+            trend_query = f"""
+            SELECT period, SUM(total) as total
+            FROM ({trend_query}
+                UNION ALL
+                SELECT month as period, SUM(total) as total
+                FROM monthly_rollups
+                {rollup_where}
+                GROUP BY month
+            ) combined
+            GROUP BY period
+            """
+        trend_query += " ORDER BY period ASC"
         trend_result = await session.execute(text(trend_query), params)
         trend_rows = trend_result.fetchall()
         
@@ -115,3 +105,34 @@ async def get_dashboard_stats(
         category_breakdown=breakdown,
         monthly_trend=trend
     )
+
+@router.get("/forecast", response_model=SpendingForecast)
+async def get_spending_forecast(
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """
+    Projected month-end spending per category (baseline + recurring charges) against budgets.
+    """
+    # Imported on first use so loading the API does not pull in numpy
+    from app.services.forecast import get_forecast
+    return SpendingForecast(**await get_forecast(current_user.id))
+
+@router.get("/anomalies", response_model=List[AnomalyOut])
+async def get_anomalies(
+    current_user: UserPrincipal = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Most recent unusual charges flagged at ingestion time.
+    """
+    query = """
+    SELECT a.transaction_id, t.date, t.merchant, t.category, a.amount, a.dimension, a.expected, a.zscore
+    FROM anomalies a
+    JOIN transactions t ON t.id = a.transaction_id
+    WHERE a.user_id = :uid
+    ORDER BY a.created_at DESC, a.id DESC
+    LIMIT :limit
+    """
+    async with ReadSessionLocal() as session:
+        result = await session.execute(text(query), {"uid": current_user.id, "limit": limit})
+        return [AnomalyOut(**row._mapping) for row in result.fetchall()]
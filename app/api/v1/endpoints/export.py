@@ -0,0 +1,43 @@
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_user
+from app.schemas.dashboard import TimeRange
+from app.schemas.user import UserPrincipal
+from app.services.export import (
+    ExportFormat,
+    ExportUnavailable,
+    MEDIA_TYPES,
+    check_format_available,
+    stream_transactions_export,
+)
+from app.services.filters import build_transaction_filters
+
+router = APIRouter()
+
+@router.get("/transactions")
+async def export_transactions(
+    current_user: UserPrincipal = Depends(get_current_user),
+    format: ExportFormat = Query(ExportFormat.CSV),
+    time_range: TimeRange = Query(TimeRange.ALL_TIME),
+    categories: Optional[List[str]] = Query(None)
+):
+    """
+    Stream the user's full transaction history as CSV, Arrow IPC or Parquet.
+    Accepts the same filters as the dashboard.
+    """
+    try:
+        check_format_available(format)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    where_clause, params = build_transaction_filters(current_user.id, time_range, categories)
+    filename = f"transactions_{date.today().isoformat()}.{format.value}"
+
+    return StreamingResponse(
+        stream_transactions_export(where_clause, params, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,32 +1,34 @@
 import os
 import shutil
 import uuid
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Depends
-from app.services.pdf import process_document_task
+from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from app.api.deps import get_current_user
-from app.models.sql import User
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.sql import Document
+from app.schemas.user import UserPrincipal
+from app.services.jobs import enqueue_ingestion
 
 router = APIRouter()
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
 @router.post("/ingest")
 async def ingest_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """
     Upload a PDF document for ingestion.
-    The processing functionality happens in the background.
+    The file is queued and processed by an ingestion worker (python -m app.worker).
     """
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
     # Use UUID to prevent filename collisions
     unique_filename = f"{uuid.uuid4()}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
     
     # Save file to disk
     try:
@@ -35,10 +37,21 @@ async def ingest_document(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not save file: {e}")
 
-    # Trigger Background Task
-    background_tasks.add_task(process_document_task, file_path, current_user.id)
+    # Record the document and its job in one transaction
+    async with SessionLocal() as session:
+        document = Document(
+            filename=unique_filename,
+            upload_date=datetime.now(),
+            status="queued",
+            user_id=current_user.id
+        )
+        session.add(document)
+        await session.flush()
+        await enqueue_ingestion(session, document.id, current_user.id, file_path)
+        await session.commit()
 
     return {
         "message": "File uploaded successfully. Processing started.",
-        "filename": file.filename
+        "filename": file.filename,
+        "document_id": document.id
     }
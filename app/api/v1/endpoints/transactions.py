@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import text
+
+from app.api.deps import get_current_user
+from app.core.database import ReadSessionLocal
+from app.schemas.transaction import TransactionOut, TransactionPage
+from app.schemas.user import UserPrincipal
+from app.services.filters import build_transaction_list_filters
+
+router = APIRouter()
+
+def encode_cursor(tx_date, tx_id: int) -> str:
+    raw = json.dumps([str(tx_date), tx_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tx_date, tx_id = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(tx_date), int(tx_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=TransactionPage)
+async def list_transactions(
+    current_user: UserPrincipal = Depends(get_current_user),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    categories: Optional[List[str]] = Query(None),
+    merchant_prefix: Optional[str] = Query(None, min_length=1),
+    min_amount: Optional[float] = Query(None),
+    max_amount: Optional[float] = Query(None)
+):
+    """
+    Page through transactions, newest first.
+    Uses keyset (seek) pagination on (date, id), so deep pages cost the same as the first one.
+    """
+    where_clause, params = build_transaction_list_filters(
+        current_user.id, start_date, end_date, categories, merchant_prefix, min_amount, max_amount
+    )
+    params["limit"] = limit + 1
+    if cursor:
+        # Seek past the last row of the previous page. The bare 'date <=' gives the planner a range bound.
+        c_date, c_id = decode_cursor(cursor)
+        where_clause += " AND date <= :c_date AND (date < :c_date OR id < :c_id)"
+        params["c_date"] = c_date
+        params["c_id"] = c_id
+
+    query = f"""
+    SELECT id, date, merchant, amount, currency, category
+    FROM transactions
+    {where_clause}
+    ORDER BY date DESC, id DESC
+    LIMIT :limit
+    """
+
+    async with ReadSessionLocal() as session:
+        result = await session.execute(text(query), params)
+        rows = result.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [TransactionOut(**row._mapping) for row in rows]
+    next_cursor = encode_cursor(rows[-1].date, rows[-1].id) if has_more else None
+    return TransactionPage(items=items, next_cursor=next_cursor)
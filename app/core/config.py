@@ -10,10 +10,123 @@ class Settings:
     
     # We will add OpenAI and Database config here later
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    # Point at an OpenAI-compatible server (e.g. benchmarks/fake_openai.py) instead of api.openai.com
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-4o")
+
+    # LLM gateway: the account's quota. Buckets live in each process, so every process enforces a
+    # slice of it: API processes split LLM_CHAT_SHARE, worker processes split the rest.
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+    LLM_CHAT_SHARE: float = float(os.getenv("LLM_CHAT_SHARE", "0.5"))
+    LLM_API_PROCESSES: int = int(os.getenv("LLM_API_PROCESSES", "1"))
+    LLM_WORKER_PROCESSES: int = int(os.getenv("LLM_WORKER_PROCESSES", "1")) # 0: extraction only runs embedded in the API
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    LLM_CALL_TIMEOUT_SECONDS: float = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "30"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+    # Send a duplicate request once a call runs past this latency percentile (0 = no hedging)
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    # End-to-end budgets for one chat answer and for one document's extraction
+    CHAT_DEADLINE_SECONDS: float = float(os.getenv("CHAT_DEADLINE_SECONDS", "45"))
+    EXTRACTION_DEADLINE_SECONDS: float = float(os.getenv("EXTRACTION_DEADLINE_SECONDS", "300"))
+
+    # Database
+    # SQLite for local dev. In prod, point this at Postgres (postgresql+asyncpg://...).
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./financial_agent.db")
+    # Optional replica for read-heavy paths (dashboard, agent SQL). Defaults to DATABASE_URL.
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL", "")
+    # Postgres schema holding the app's tables; the agent's SQL sandbox qualifies real tables with it.
+    DATABASE_SCHEMA: str = os.getenv("DATABASE_SCHEMA", "public")
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    READ_DB_POOL_SIZE: int = int(os.getenv("READ_DB_POOL_SIZE", "10"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+    # Rows fetched from the server-side cursor (and written) per export batch.
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+    # Charges this many standard deviations above a merchant/category mean are flagged.
+    ANOMALY_Z_THRESHOLD: float = float(os.getenv("ANOMALY_Z_THRESHOLD", "3.0"))
+    ANOMALY_MIN_HISTORY: int = int(os.getenv("ANOMALY_MIN_HISTORY", "5"))
+
+    # Vector store layout: "shared" (the original single collection filtered by metadata),
+    # "per_user" (one collection per user) or "sharded" (user_id % VECTOR_SHARDS).
+    # Defaults to the layout existing stores already have; run app.migrate_vectors before switching.
+    VECTOR_PARTITIONING: str = os.getenv("VECTOR_PARTITIONING", "shared")
+    VECTOR_SHARDS: int = int(os.getenv("VECTOR_SHARDS", "16"))
+
+    # Per-user in-memory lexical indexes for transaction search.
+    LEXICAL_INDEX_MAX_USERS: int = int(os.getenv("LEXICAL_INDEX_MAX_USERS", "1000"))
+    LEXICAL_INDEX_TTL_SECONDS: int = int(os.getenv("LEXICAL_INDEX_TTL_SECONDS", "3600"))
+
+    # Ingestion job queue (see app/worker.py)
+    INGESTION_MAX_ATTEMPTS: int = int(os.getenv("INGESTION_MAX_ATTEMPTS", "5"))
+    INGESTION_LEASE_SECONDS: int = int(os.getenv("INGESTION_LEASE_SECONDS", "120"))
+    INGESTION_HEARTBEAT_SECONDS: int = int(os.getenv("INGESTION_HEARTBEAT_SECONDS", "30"))
+    INGESTION_RETRY_BASE_SECONDS: float = float(os.getenv("INGESTION_RETRY_BASE_SECONDS", "10"))
+    INGESTION_POLL_SECONDS: float = float(os.getenv("INGESTION_POLL_SECONDS", "1.0"))
+    # Consumers run inside the API process (handy for local dev). Production API nodes keep 0.
+    INGESTION_EMBEDDED_WORKERS: int = int(os.getenv("INGESTION_EMBEDDED_WORKERS", "0"))
+
+    # Subsystems initialized during startup instead of on the first request,
+    # comma separated: agent, vector, extraction. Empty keeps boot as light as possible.
+    WARMUP_COMPONENTS: str = os.getenv("WARMUP_COMPONENTS", "")
+
+    # Currency normalization: aggregates are reported in BASE_CURRENCY
+    BASE_CURRENCY: str = os.getenv("BASE_CURRENCY", "USD").upper()
+    FX_RATES_FILE: str = os.getenv("FX_RATES_FILE", "") # CSV feed: date,currency,rate
+    FX_CACHE_TTL_SECONDS: int = int(os.getenv("FX_CACHE_TTL_SECONDS", "3600"))
+
+    # Ingestion de-duplication: same user/amount/merchant within this many days is one transaction
+    DEDUP_WINDOW_DAYS: int = int(os.getenv("DEDUP_WINDOW_DAYS", "3"))
+
+    # Forecast cache (entries are also invalidated by users.data_version)
+    FORECAST_CACHE_MAX_USERS: int = int(os.getenv("FORECAST_CACHE_MAX_USERS", "10000"))
+    FORECAST_CACHE_TTL_SECONDS: int = int(os.getenv("FORECAST_CACHE_TTL_SECONDS", "3600"))
+
+    # Per-user financial profile rendered into the agent's system prompt (see services/profile.py)
+    AGENT_PROFILE_ENABLED: bool = os.getenv("AGENT_PROFILE_ENABLED", "true").lower() == "true"
+    PROFILE_MONTHS: int = int(os.getenv("PROFILE_MONTHS", "3")) # complete months, plus the current one
+    PROFILE_PROMPT_MAX_TOKENS: int = int(os.getenv("PROFILE_PROMPT_MAX_TOKENS", "400"))
+
+    # Agent SQL tools. The batch tool runs up to MAX_QUERIES labeled queries concurrently on the read pool.
+    AGENT_SQL_BATCH_ENABLED: bool = os.getenv("AGENT_SQL_BATCH_ENABLED", "true").lower() == "true"
+    AGENT_SQL_BATCH_MAX_QUERIES: int = int(os.getenv("AGENT_SQL_BATCH_MAX_QUERIES", "8"))
+    AGENT_SQL_MAX_ROWS: int = int(os.getenv("AGENT_SQL_MAX_ROWS", "100")) # per batch query
+    AGENT_SQL_TIMEOUT_SECONDS: float = float(os.getenv("AGENT_SQL_TIMEOUT_SECONDS", "5")) # enforced by the database, both SQL tools
+
+    # Storage lifecycle (python -m app.lifecycle)
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    # Processed PDFs are gzipped here under their SHA-256 (identical uploads are stored once)
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    # Originals of completed documents are deleted this long after upload; failed ones are kept
+    UPLOAD_RETENTION_DAYS: int = int(os.getenv("UPLOAD_RETENTION_DAYS", "30"))
+    # Whole months of transactions kept in the hot table; older ones move to transactions_archive + monthly_rollups.
+    # At least 13 so every bounded dashboard range (up to 1y) still reads full-resolution rows.
+    TRANSACTION_HOT_MONTHS: int = int(os.getenv("TRANSACTION_HOT_MONTHS", "24"))
+
+    # Observability
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text") # text | json
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
 
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "super-secret-key-change-this-in-prod")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # bcrypt work factor. Changing it rehashes passwords transparently on next login.
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Threads dedicated to hashing, and how many operations may wait for one before we shed load.
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+    # Decoded tokens -> user principals. Set the TTL to 0 to always hit the database.
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
 
 settings = Settings()
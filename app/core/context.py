@@ -1,4 +1,26 @@
 from contextvars import ContextVar
+import time
 
 # Thread-safe context variable to store the current user_id during a request
 user_id_context: ContextVar[int] = ContextVar("user_id_context", default=None)
+
+# Absolute time.monotonic() by which the current request must finish (None = no deadline)
+deadline_context: ContextVar[float] = ContextVar("deadline_context", default=None)
+
+class DeadlineExceeded(Exception):
+    pass
+
+def set_deadline(seconds: float):
+    """
+    Starts a deadline for the current task; tasks spawned from it inherit the same absolute deadline.
+    """
+    return deadline_context.set(time.monotonic() + seconds)
+
+def remaining_time():
+    """
+    Seconds left before the current deadline, or None when no deadline is set.
+    """
+    deadline = deadline_context.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
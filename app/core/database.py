@@ -1,14 +1,69 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-# SQLite for local dev. In prod, switch to Postgres.
-DATABASE_URL = "sqlite+aiosqlite:///./financial_agent.db"
+from app.core.config import settings
 
-engine = create_async_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}, # Needed for SQLite
-    echo=True # Log SQL queries for debugging
-)
+DATABASE_URL = settings.DATABASE_URL
+READ_DATABASE_URL = settings.READ_DATABASE_URL or DATABASE_URL
+
+def _set_sqlite_pragmas(read_only: bool):
+    """
+    Returns a 'connect' listener that tunes every new SQLite connection.
+    WAL lets readers run alongside the single writer instead of blocking on it.
+    """
+    def listener(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return listener
+
+def create_engine_for(url: str, read_only: bool = False, pool_size: int = None):
+    """
+    Engine factory shared by the API, workers and scripts.
+    Applies pool tuning for every backend and connection pragmas for SQLite.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    is_memory = backend == "sqlite" and parsed.database in (None, "", ":memory:")
+
+    kwargs = {"echo": settings.DB_ECHO}
+    if backend == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False} # Needed for SQLite
+
+    # In-memory SQLite is pinned to a single connection; pool tuning does not apply.
+    if not is_memory:
+        kwargs.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=pool_size or settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=backend != "sqlite",
+        )
+
+    new_engine = create_async_engine(url, **kwargs)
+    if backend == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas(read_only))
+    return new_engine
+
+# Write engine: ingestion, auth, budgets.
+engine = create_engine_for(DATABASE_URL)
+
+# Read engine: dashboard and agent queries. Same file for SQLite (WAL readers), a replica for Postgres.
+read_engine = create_engine_for(READ_DATABASE_URL, read_only=True, pool_size=settings.READ_DB_POOL_SIZE)
+
+if settings.METRICS_ENABLED:
+    from app.core.metrics import instrument_engine
+    instrument_engine(engine, "write")
+    instrument_engine(read_engine, "read")
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -17,8 +72,19 @@ SessionLocal = sessionmaker(
     autoflush=False
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
+
 Base = declarative_base()
 
 async def get_db():
     async with SessionLocal() as session:
         yield session
+
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        yield session
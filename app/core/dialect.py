@@ -0,0 +1,40 @@
+"""
+Small helpers that render dialect-specific SQL fragments,
+so the raw text() queries in the dashboard and tools run on SQLite and Postgres alike.
+"""
+from app.core.config import settings
+from app.core.database import read_engine
+
+def _dialect_name(bind=None) -> str:
+    return (bind or read_engine).dialect.name
+
+def month_expr(column: str, bind=None) -> str:
+    """
+    Truncates a date column to a 'YYYY-MM' string.
+    """
+    if _dialect_name(bind) == "postgresql":
+        return f"to_char({column}, 'YYYY-MM')"
+    return f"strftime('%Y-%m', {column})"
+
+def day_expr(column: str, bind=None) -> str:
+    """
+    Renders a date column as a 'YYYY-MM-DD' string.
+    """
+    if _dialect_name(bind) == "postgresql":
+        return f"to_char({column}, 'YYYY-MM-DD')"
+    return f"date({column})"
+
+def table_schema(bind=None) -> str:
+    """
+    Schema that holds the app's tables: "main" on SQLite, DATABASE_SCHEMA on Postgres.
+    """
+    if _dialect_name(bind) == "sqlite":
+        return "main"
+    return settings.DATABASE_SCHEMA
+
+def base_table(name: str, bind=None) -> str:
+    """
+    Reference to the real table from inside a CTE of the same name.
+    Unqualified, the name would resolve to the CTE itself: always on SQLite, and on Postgres under WITH RECURSIVE.
+    """
+    return f"{table_schema(bind)}.{name}"
@@ -0,0 +1,196 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Hot paths only append to preallocated bucket lists (no locks, no allocation
+per observation beyond the first time a label set is seen); the expensive
+work happens when /metrics is scraped.
+"""
+import re
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Distinct SQL fingerprints tracked before new ones are folded into "other"
+MAX_FINGERPRINTS = 500
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def _format_labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+class Histogram:
+    def __init__(self, name: str, help: str, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {} # labels -> [count per bucket (+Inf last), sum]
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(self.label_names + ('le',), labels + (le,))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}"
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+
+class Gauge:
+    """
+    Read at scrape time from a callback returning a number or a {labels tuple: value} dict.
+    """
+    def __init__(self, name: str, help: str, collect, label_names=(), type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.label_names = tuple(label_names)
+        self.type = type
+
+    def render(self):
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+
+REGISTRY = []
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+http_request_duration = register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+))
+db_query_duration = register(Histogram(
+    "db_query_duration_seconds", "SQL execution time by statement fingerprint.", ("engine", "statement"), QUERY_BUCKETS
+))
+
+# 1. HTTP
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead).
+    Labels by the matched route template so /transactions/{id} is one series, not one per id.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                (scope["method"], getattr(route, "path", "unmatched"), str(status["code"])),
+                time.perf_counter() - start
+            )
+
+# 2. Database
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_seen_fingerprints = set()
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalizes a SQL statement so executions differing only in literals share one series.
+    """
+    normalized = _SPACES.sub(" ", statement).strip()
+    normalized = _LITERALS.sub("?", normalized)
+    normalized = _IN_LISTS.sub("(?...)", normalized)
+    normalized = re.sub(r"(?:\$\d+|%\(\w+\)s|:\w+)", "?", normalized)
+    normalized = normalized[:200]
+    if normalized not in _seen_fingerprints:
+        if len(_seen_fingerprints) >= MAX_FINGERPRINTS:
+            return "other"
+        _seen_fingerprints.add(normalized)
+    return normalized
+
+def instrument_engine(engine, name: str):
+    """
+    Times every cursor execution on an AsyncEngine's underlying sync engine.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        db_query_duration.observe((name, fingerprint(statement)), time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    _pools[name] = sync_engine.pool
+
+_pools = {}
+
+def _pool_connections():
+    values = {}
+    for name, pool in _pools.items():
+        # StaticPool / NullPool (in-memory SQLite) have no counters
+        values[(name, "checked_out")] = getattr(pool, "checkedout", lambda: 0)()
+        values[(name, "size")] = getattr(pool, "size", lambda: 0)()
+        values[(name, "overflow")] = max(getattr(pool, "overflow", lambda: 0)(), 0)
+    return values
+
+register(Gauge("db_pool_connections", "Pooled connections per engine by state.", _pool_connections, ("engine", "state")))
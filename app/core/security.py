@@ -1,10 +1,33 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max to the configured rounds makes needs_update() flag any hash
+# created with a different work factor, so login can rehash it.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small dedicated pool keeps the event loop free
+# while capping how much CPU a login burst can take from other requests.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_stats_lock = threading.Lock()
+_password_stats = {"queued": 0, "running": 0, "completed": 0, "rejected": 0}
+
+class PasswordQueueFull(Exception):
+    """Raised when too many password operations are already waiting for a worker."""
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,6 +35,50 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def password_executor_stats() -> dict:
+    """
+    Snapshot of the hashing pool: 'queued' is the queue depth waiting for a worker.
+    """
+    with _stats_lock:
+        return dict(_password_stats, workers=settings.PASSWORD_HASH_WORKERS)
+
+def _tracked(fn, *args):
+    with _stats_lock:
+        _password_stats["queued"] -= 1
+        _password_stats["running"] += 1
+    try:
+        return fn(*args)
+    finally:
+        with _stats_lock:
+            _password_stats["running"] -= 1
+            _password_stats["completed"] += 1
+
+async def _run_password_op(fn, *args):
+    with _stats_lock:
+        if _password_stats["queued"] >= settings.PASSWORD_HASH_MAX_QUEUE:
+            _password_stats["rejected"] += 1
+            raise PasswordQueueFull()
+        _password_stats["queued"] += 1
+    future = _password_executor.submit(_tracked, fn, *args)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Client went away before a worker picked the job up: give its queue slot back.
+        if future.cancelled():
+            with _stats_lock:
+                _password_stats["queued"] -= 1
+        raise
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_op(pwd_context.hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies off the event loop. Returns (valid, new_hash); new_hash is set when
+    the stored hash uses outdated settings and should be replaced.
+    """
+    return await _run_password_op(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
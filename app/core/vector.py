@@ -1,20 +1,113 @@
-import chromadb
-from chromadb.utils import embedding_functions
+import threading
 from app.core.config import settings
 
-# Initialize Chroma Client (Persistent)
-# This creates a folder 'chroma_db' in the project root
-client = chromadb.PersistentClient(path="./chroma_db")
+# chromadb and the embedding function are created on first use, so workers
+# that never touch the vector store don't pay for importing them.
+_client = None
+_embedding_function = None
+_init_lock = threading.Lock()
 
-# Use OpenAI Embedding Function
-openai_ef = embedding_functions.OpenAIEmbeddingFunction(
-    api_key=settings.OPENAI_API_KEY,
-    model_name="text-embedding-3-small"
-)
+def get_client():
+    """
+    Chroma Client (Persistent). This creates a folder 'chroma_db' in the project root.
+    """
+    global _client
+    if _client is None:
+        with _init_lock:
+            if _client is None:
+                import chromadb
+                _client = chromadb.PersistentClient(path="./chroma_db")
+    return _client
+
+def get_embedding_function():
+    """
+    OpenAI Embedding Function, shared by every collection.
+    """
+    global _embedding_function
+    if _embedding_function is None:
+        with _init_lock:
+            if _embedding_function is None:
+                from chromadb.utils import embedding_functions
+                _embedding_function = embedding_functions.OpenAIEmbeddingFunction(
+                    api_key=settings.OPENAI_API_KEY,
+                    model_name="text-embedding-3-small",
+                    api_base=settings.OPENAI_BASE_URL or None
+                )
+    return _embedding_function
+
+# The original single collection shared by every user (filtered by metadata at query time)
+SHARED_COLLECTION_NAME = "financial_transactions"
+
+# Collection handles are cheap to keep and costly to look up, so fetch each one once per process
+_collections = {}
+
+def shard_for(user_id: int) -> int:
+    return user_id % settings.VECTOR_SHARDS
+
+def collection_name_for(user_id: int, strategy: str = None) -> str:
+    """
+    Routes a user to their collection under the configured partitioning strategy.
+    """
+    strategy = strategy or settings.VECTOR_PARTITIONING
+    if strategy == "per_user":
+        return f"transactions_user_{user_id}"
+    if strategy == "sharded":
+        return f"transactions_shard_{shard_for(user_id)}"
+    return SHARED_COLLECTION_NAME
+
+def get_collection(name: str):
+    collection = _collections.get(name)
+    if collection is None:
+        collection = get_client().get_or_create_collection(
+            name=name,
+            embedding_function=get_embedding_function()
+        )
+        _collections[name] = collection
+    return collection
 
 # Create or Get Collection
-def get_transaction_collection():
-    return client.get_or_create_collection(
-        name="financial_transactions",
-        embedding_function=openai_ef
-    )
+def get_transaction_collection(user_id: int = None):
+    """
+    The collection holding this user's vectors. Queries should still pass
+    where={"user_id": ...}, which is required for the sharded and shared layouts.
+    """
+    if user_id is None:
+        return get_collection(SHARED_COLLECTION_NAME)
+    return get_collection(collection_name_for(user_id))
+
+def list_transaction_collections(strategy: str = None):
+    """
+    Names of the existing collections that belong to a partitioning layout.
+    """
+    strategy = strategy or settings.VECTOR_PARTITIONING
+    # Older chromadb returns Collection objects, newer returns names
+    existing = [getattr(item, "name", item) for item in get_client().list_collections()]
+    if strategy == "shared":
+        return [name for name in existing if name == SHARED_COLLECTION_NAME]
+    prefix = "transactions_user_" if strategy == "per_user" else "transactions_shard_"
+    return [name for name in existing if name.startswith(prefix)]
+
+def forget_collection(name: str):
+    """
+    Drops a cached handle, e.g. after the collection was deleted.
+    """
+    _collections.pop(name, None)
+
+def transaction_document(merchant, category, tx_date, amount, currency) -> str:
+    """
+    The text we embed and search against: "Starbucks (Food) on 2024-01-01. Amount: 5.5 USD"
+    """
+    return f"{merchant} ({category}) on {tx_date}. Amount: {amount} {currency}"
+
+def transaction_metadata(merchant, category, amount, tx_date, doc_id, user_id) -> dict:
+    """
+    Metadata stored next to each vector; 'user_id' is required for RLS filtering and routing.
+    """
+    return {
+        "merchant": merchant,
+        "category": category or "Unknown",
+        "amount": amount,
+        "date": tx_date, # String format YYYY-MM-DD
+        "doc_id": doc_id,
+        "user_id": user_id
+    }
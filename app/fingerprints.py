@@ -0,0 +1,53 @@
+"""
+Backfill transaction fingerprints for rows ingested (or archived) before de-duplication existed.
+
+    python -m app.fingerprints                 # rows with no fingerprint yet
+    python -m app.fingerprints --recompute     # every row (after changing merchant_key normalization)
+
+Without a fingerprint an old row cannot be matched, so a statement overlapping
+it would be double counted. Both transactions and transactions_archive are
+covered. Rows already stored are not de-duplicated here.
+"""
+import argparse
+import asyncio
+from sqlalchemy import select, update
+
+from app.core.database import SessionLocal
+from app.models.sql import Transaction, TransactionArchive
+from app.services.dedup import transaction_fingerprint
+
+async def backfill(batch_size: int, recompute: bool) -> int:
+    updated = 0
+    for model in (Transaction, TransactionArchive):
+        updated += await _backfill_table(model, batch_size, recompute)
+    return updated
+
+async def _backfill_table(model, batch_size: int, recompute: bool) -> int:
+    last_id, updated = 0, 0
+    while True:
+        query = select(
+            model.id, model.user_id, model.merchant, model.amount, model.currency
+        ).where(model.id > last_id)
+        if not recompute:
+            query = query.where(model.fingerprint.is_(None))
+
+        async with SessionLocal() as session:
+            rows = (await session.execute(query.order_by(model.id).limit(batch_size))).all()
+            if not rows:
+                return updated
+            await session.execute(update(model), [
+                {"id": r.id, "fingerprint": transaction_fingerprint(r.user_id, r.merchant, r.amount, r.currency)}
+                for r in rows
+            ])
+            await session.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"... fingerprinted {updated} {model.__tablename__} rows (last id {last_id})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--recompute", action="store_true")
+    args = parser.parse_args()
+    print(f"Fingerprinted {asyncio.run(backfill(args.batch_size, args.recompute))} transactions.")
@@ -0,0 +1,42 @@
+"""
+FX rate feed loader and amount_base backfill.
+
+    python -m app.fx_rates load rates.csv           # upsert daily rates (date,currency,rate)
+    python -m app.fx_rates backfill                 # fill amount_base where it is still NULL
+    python -m app.fx_rates backfill --recompute     # redo every row, e.g. after a feed correction
+
+Rates are BASE_CURRENCY per 1 unit of the currency. Run 'load' from the daily
+feed job (or set FX_RATES_FILE and call it without a path), then 'backfill'
+once after the first load; new transactions are converted at ingestion.
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.services.fx import load_feed, backfill_amount_base
+
+async def main(args):
+    configure_logging() # backfill progress is logged per batch
+    if args.command == "load":
+        path = args.path or settings.FX_RATES_FILE
+        if not path:
+            raise SystemExit("No feed file given and FX_RATES_FILE is not set.")
+        counts = await load_feed(path)
+        print(f"Loaded {path}: {counts['inserted']} new rates, {counts['updated']} updated.")
+    else:
+        result = await backfill_amount_base(args.batch_size, recompute=args.recompute, user_id=args.user_id)
+        print(f"Converted {result['converted']} transactions to {settings.BASE_CURRENCY}.")
+        for currency, count in sorted(result["missing_rates"].items()):
+            print(f"  no rate for {currency}: {count} rows left unconverted")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load")
+    load.add_argument("path", nargs="?", default="")
+    backfill = sub.add_parser("backfill")
+    backfill.add_argument("--batch-size", type=int, default=5000)
+    backfill.add_argument("--recompute", action="store_true")
+    backfill.add_argument("--user-id", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -1,18 +1,58 @@
 import asyncio
 import os
 import shutil
+import sys
+from sqlalchemy import inspect, text
 from app.core.database import engine, Base
 from app.models.sql import User, Document, Transaction
 
-async def init_models():
+# Indexes replaced by wider versions; dropped so writes don't maintain both.
+SUPERSEDED_INDEXES = ["ix_transactions_user_date_id", "ix_transactions_user_category_date"]
+
+def ensure_columns(sync_conn):
+    """
+    create_all() never alters existing tables, so columns added to a model later are added here
+    (nullable, no default; backfills populate them).
+    """
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present:
+                column_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"Added column {table.name}.{column.name}")
+
+def drop_superseded_indexes(sync_conn):
+    for name in SUPERSEDED_INDEXES:
+        sync_conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def create_missing_indexes(sync_conn):
+    """
+    create_all() skips tables that already exist, so indexes added later need their own pass.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+async def init_models(reset_vectors: bool = False):
     # 1. Reset SQL
     async with engine.begin() as conn:
         #await conn.run_sync(Base.metadata.drop_all) # Uncomment to drop SQL tables
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_columns)
+        await conn.run_sync(drop_superseded_indexes)
+        await conn.run_sync(create_missing_indexes)
     print("SQL Tables created successfully.")
 
-    # 2. Reset Vector DB (Development Mode)
-    # This prevents "Ghost Data" when you reset the DB but keep the embeddings
+    # 2. Reset Vector DB (Development Mode, opt-in)
+    # This prevents "Ghost Data" when you reset the DB but keep the embeddings.
+    # Otherwise use `python -m app.reindex diff` to find and fix drift.
+    if not reset_vectors:
+        return
     persist_dir = os.path.join(os.getcwd(), "chroma_db")
     if os.path.exists(persist_dir):
         try:
@@ -22,4 +62,4 @@ async def init_models():
             print(f"Error clearing Vector DB: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(init_models())
+    asyncio.run(init_models(reset_vectors="--reset-vectors" in sys.argv))
@@ -0,0 +1,44 @@
+"""
+Storage lifecycle job: archive processed PDFs and move cold transactions out of the hot table.
+
+    python -m app.lifecycle documents                 # gzip completed PDFs into ARCHIVE_DIR, purge old originals
+    python -m app.lifecycle transactions              # archive months older than TRANSACTION_HOT_MONTHS
+    python -m app.lifecycle run --vacuum              # both (nightly cron), then reclaim SQLite space
+
+Both steps are idempotent and commit per batch, so an interrupted run is
+simply re-run. Archived transactions keep their vectors, so search still finds
+them; to limit search to the hot table, drop those vectors explicitly with
+`python -m app.reindex diff --delete-archived`.
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.lifecycle import archive_documents, archive_transactions, compact
+
+async def main(args):
+    if args.command in ("documents", "run"):
+        counts = await archive_documents(args.retention_days)
+        print(
+            f"Documents: {counts['archived']} archived, {counts['purged']} originals deleted"
+            f" (older than {args.retention_days} days), {counts['missing']} with no file on disk."
+        )
+    if args.command in ("transactions", "run"):
+        if args.months < 13:
+            raise SystemExit("--months must be at least 13: dashboard ranges up to 1y read full-resolution rows.")
+        counts = await archive_transactions(args.months, args.batch_size, user_id=args.user_id)
+        print(f"Transactions: moved {counts['moved']} rows dated before {counts['cutoff']} ({counts['users']} users).")
+    if args.vacuum:
+        await compact(engine)
+        print("Compacted the database file.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["documents", "transactions", "run"])
+    parser.add_argument("--retention-days", type=int, default=settings.UPLOAD_RETENTION_DAYS)
+    parser.add_argument("--months", type=int, default=settings.TRANSACTION_HOT_MONTHS)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM SQLite afterwards (no-op on Postgres)")
+    asyncio.run(main(parser.parse_args()))
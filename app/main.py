@@ -1,13 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.core.metrics import MetricsMiddleware, Gauge, register, render_metrics
+from app.core.security import password_executor_stats
 from app.api.v1.api import api_router
+from app.services.jobs import pending_job_count
+from app.services.llm_gateway import gateway
+from app.services.warmup import warm_up
 
 from fastapi.middleware.cors import CORSMiddleware
 
+configure_logging()
+logger = get_logger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy subsystems load lazily; WARMUP_COMPONENTS moves that cost to boot for chat workers.
+    if settings.WARMUP_COMPONENTS:
+        warmed = await asyncio.to_thread(warm_up)
+        logger.info("warmed up", extra={"components": ",".join(warmed)})
+
+    # Optional in-process ingestion consumers (dev only; production runs python -m app.worker)
+    stop_workers, workers = asyncio.Event(), None
+    if settings.INGESTION_EMBEDDED_WORKERS > 0:
+        from app.worker import run_workers
+        workers = asyncio.create_task(run_workers(settings.INGESTION_EMBEDDED_WORKERS, stop_workers))
+
+    yield
+
+    if workers:
+        stop_workers.set()
+        await workers
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -19,8 +51,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost and times the whole stack, CORS included
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Gauges read at scrape time. The ingestion backlog needs a DB query, so /metrics refreshes it.
+_ingestion_backlog = {"pending": 0}
+
+register(Gauge("ingestion_jobs_pending", "Ingestion jobs queued or running.", lambda: _ingestion_backlog["pending"]))
+register(Gauge(
+    "password_hash_pool", "Password hashing executor by state.",
+    lambda: {(k,): v for k, v in password_executor_stats().items() if k in ("queued", "running", "workers")}, ("state",)
+))
+register(Gauge(
+    "password_hash_operations_total", "Password hash operations by outcome.",
+    lambda: {(k,): password_executor_stats()[k] for k in ("completed", "rejected")}, ("outcome",), type="counter"
+))
+register(Gauge("llm_in_flight", "LLM calls currently running.", lambda: gateway.stats()["in_flight"]))
+register(Gauge(
+    "llm_queued", "LLM calls waiting for admission by priority.",
+    lambda: {(p,): s["queued"] for p, s in gateway.stats().items() if p != "in_flight"}, ("priority",)
+))
+register(Gauge(
+    "llm_queue_wait_seconds_total", "Total time LLM calls spent waiting for admission.",
+    lambda: {(p,): s["wait_seconds_sum"] for p, s in gateway.stats().items() if p != "in_flight"}, ("priority",), type="counter"
+))
+register(Gauge(
+    "llm_calls_total", "LLM call events by priority (dispatched, retries, timeouts, hedged, failed).",
+    lambda: {
+        (p, event): s[event]
+        for p, s in gateway.stats().items() if p != "in_flight"
+        for event in ("dispatched", "retries", "timeouts", "hedged", "failed")
+    },
+    ("priority", "event"), type="counter"
+))
+
 @app.get("/")
 async def root():
     return {
@@ -28,6 +95,17 @@ async def root():
         "docs": "/docs"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus text exposition.
+    """
+    try:
+        _ingestion_backlog["pending"] = await pending_job_count()
+    except Exception as e:
+        logger.warning("could not count ingestion backlog", extra={"error": repr(e)})
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
@@ -0,0 +1,72 @@
+"""
+Moves vectors from one partitioning layout to another without re-embedding.
+
+    python -m app.migrate_vectors --to per_user         # shared -> one collection per user
+    python -m app.migrate_vectors --to sharded --delete-source
+
+Then set VECTOR_PARTITIONING to the new layout and restart; until then the
+app keeps reading the shared collection.
+
+Reads the source collection(s) in pages, routes each vector by its 'user_id'
+metadata and upserts it (with its stored embedding) into the target collection.
+Safe to re-run: upserts are idempotent.
+"""
+import argparse
+from collections import defaultdict
+
+from app.core.config import settings
+from app.core.vector import get_client, get_collection, forget_collection, collection_name_for, list_transaction_collections
+
+def migrate(source: str, target: str, batch_size: int, delete_source: bool):
+    if source == target:
+        print("Source and target layouts are the same; nothing to do.")
+        return
+
+    moved = 0
+    for name in list_transaction_collections(source):
+        collection = get_collection(name)
+        offset = 0
+        while True:
+            page = collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            if not page["ids"]:
+                break
+
+            routed = defaultdict(lambda: {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+            for i, vec_id in enumerate(page["ids"]):
+                metadata = page["metadatas"][i] or {}
+                user_id = metadata.get("user_id")
+                if user_id is None:
+                    print(f"Skipping {vec_id}: no user_id metadata")
+                    continue
+                bucket = routed[collection_name_for(int(user_id), target)]
+                bucket["ids"].append(vec_id)
+                bucket["embeddings"].append(page["embeddings"][i])
+                bucket["documents"].append(page["documents"][i])
+                bucket["metadatas"].append(metadata)
+
+            for target_name, bucket in routed.items():
+                get_collection(target_name).upsert(**bucket)
+                moved += len(bucket["ids"])
+
+            offset += len(page["ids"])
+            print(f"{name}: {offset} vectors read, {moved} written so far")
+
+        if delete_source:
+            get_client().delete_collection(name)
+            forget_collection(name)
+            print(f"Deleted source collection {name}")
+
+    print(f"Migration {source} -> {target} complete: {moved} vectors written.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="source", default="shared", choices=["shared", "per_user", "sharded"])
+    parser.add_argument("--to", dest="target", default=settings.VECTOR_PARTITIONING, choices=["shared", "per_user", "sharded"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--delete-source", action="store_true")
+    args = parser.parse_args()
+    migrate(args.source, args.target, args.batch_size, args.delete_source)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -10,6 +10,7 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     full_name = Column(String)
     hashed_password = Column(String)
+    data_version = Column(Integer, default=0) # bumped on ingestion / budget changes; keys derived caches
     
     documents = relationship("Document", back_populates="user")
     budgets = relationship("Budget", back_populates="user")
@@ -30,12 +31,19 @@ class Document(Base):
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String)
     upload_date = Column(DateTime, default=datetime.utcnow)
-    status = Column(String, default="pending") # pending, processed, failed
+    status = Column(String, default="pending") # queued, processing, retrying, completed, failed
     user_id = Column(Integer, ForeignKey("users.id"))
+    duplicates_skipped = Column(Integer, nullable=True) # rows already present from an overlapping statement
+    archive_key = Column(String, nullable=True) # SHA-256 of the PDF, stored gzipped under ARCHIVE_DIR (see services/lifecycle.py)
+    purged_at = Column(DateTime, nullable=True) # when the original in UPLOAD_DIR was deleted
     
     user = relationship("User", back_populates="documents")
     transactions = relationship("Transaction", back_populates="document")
 
+    __table_args__ = (
+        Index("ix_documents_user_status", "user_id", "status"),
+    )
+
 class Transaction(Base):
     __tablename__ = "transactions"
 
@@ -47,7 +55,153 @@ class Transaction(Base):
     merchant = Column(String)
     amount = Column(Float)
     currency = Column(String, default="USD")
+    amount_base = Column(Float, nullable=True) # amount in settings.BASE_CURRENCY at the transaction date; NULL = no rate yet
     category = Column(String) # Inferred by LLM
+    fingerprint = Column(String, nullable=True) # see services/dedup.py; matched within a date window
     description_embedding_id = Column(String, nullable=True) # Link to VectorDB
     
     document = relationship("Document", back_populates="transactions")
+
+    __table_args__ = (
+        # Keyset pagination on (date, id). Carries every listed column so pages and dashboard sums are index-only scans.
+        Index("ix_transactions_user_date_cover", "user_id", "date", "id", "merchant", "category", "amount", "currency", "amount_base"),
+        Index("ix_transactions_user_category_base", "user_id", "category", "date", "id", "amount_base", "amount"),
+        Index("ix_transactions_user_merchant", "user_id", "merchant"),
+        Index("ix_transactions_document", "document_id"),
+        Index("ix_transactions_user_fingerprint_date", "user_id", "fingerprint", "date"),
+    )
+
+class TransactionArchive(Base):
+    """
+    Cold transactions moved out of the hot table by the lifecycle job.
+    Same ids and reporting columns, read by exports and per-user lookups. The vector id is
+    kept so the vector consistency check still counts these rows' vectors as live, and the
+    fingerprint so a re-uploaded old statement is not counted on top of monthly_rollups.
+    """
+    __tablename__ = "transactions_archive"
+
+    id = Column(Integer, primary_key=True) # id the row had in transactions
+    document_id = Column(Integer)
+    user_id = Column(Integer)
+    date = Column(Date)
+    merchant = Column(String)
+    amount = Column(Float)
+    currency = Column(String)
+    amount_base = Column(Float, nullable=True)
+    category = Column(String)
+    description_embedding_id = Column(String, nullable=True) # NULL on rows archived before it was kept
+    fingerprint = Column(String, nullable=True) # re-uploads of archived months are de-duplicated against it
+
+    __table_args__ = (
+        Index("ix_transactions_archive_user_date", "user_id", "date"),
+        Index("ix_transactions_archive_embedding_id", "description_embedding_id"),
+        Index("ix_transactions_archive_user_fingerprint_date", "user_id", "fingerprint", "date"),
+    )
+
+class MonthlyRollup(Base):
+    """
+    Per user, month and category totals (base currency) of archived transactions.
+    Aggregates add these to sums over the hot table.
+    """
+    __tablename__ = "monthly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    month = Column(String) # YYYY-MM
+    category = Column(String, nullable=True)
+    total = Column(Float, default=0.0)
+    count = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "category", name="uq_monthly_rollups_user_month_category"),
+    )
+
+class UserProfile(Base):
+    """
+    Precomputed financial snapshot per user (JSON from services/profile.py), built from
+    the data as of users.data_version == data_version.
+    """
+    __tablename__ = "user_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True)
+    data_version = Column(Integer, default=0)
+    payload = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class SpendingStat(Base):
+    """
+    Running amount statistics (Welford) per user and merchant or category.
+    Updated in O(new rows) at ingestion; variance = m2 / (count - 1).
+    """
+    __tablename__ = "spending_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    dimension = Column(String) # merchant, category
+    key = Column(String)
+    count = Column(Integer, default=0)
+    mean = Column(Float, default=0.0)
+    m2 = Column(Float, default=0.0)
+    last_seen = Column(Date, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "dimension", "key", name="uq_spending_stats_user_dimension_key"),
+    )
+
+class Anomaly(Base):
+    __tablename__ = "anomalies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    transaction_id = Column(Integer, ForeignKey("transactions.id"))
+    dimension = Column(String) # merchant, category
+    key = Column(String)
+    amount = Column(Float)
+    expected = Column(Float) # Running mean before this charge
+    zscore = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_anomalies_user_created", "user_id", "created_at"),
+    )
+
+class IngestionJob(Base):
+    """
+    Durable ingestion queue. Workers lease a job, heartbeat while processing it
+    and either complete it or reschedule it with backoff.
+    """
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
+    file_path = Column(String)
+    status = Column(String, default="queued") # queued, running, completed, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_ingestion_jobs_status_run_after", "status", "run_after"),
+    )
+
+class FxRate(Base):
+    """
+    Daily FX rates from the file feed: 1 unit of `currency` = `rate` units of settings.BASE_CURRENCY.
+    """
+    __tablename__ = "fx_rates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date)
+    currency = Column(String)
+    rate = Column(Float)
+
+    __table_args__ = (
+        UniqueConstraint("currency", "date", name="uq_fx_rates_currency_date"),
+    )
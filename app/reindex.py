@@ -0,0 +1,254 @@
+"""
+Batched, resumable vector re-index and SQL <-> vector consistency checker.
+
+    python -m app.reindex run                     # re-embed everything, resuming from the checkpoint
+    python -m app.reindex run --user-id 7 --reset # one tenant, from scratch
+    python -m app.reindex diff                    # report missing / orphaned vector ids (no embedding calls)
+    python -m app.reindex diff --repair --delete-orphans
+    python -m app.reindex diff --delete-archived  # also drop vectors of archived transactions
+
+'run' streams transactions in id order, re-embeds and upserts them with at most
+--concurrency batches in flight, and writes the last fully indexed id to the
+checkpoint file after each wave so a crashed run picks up where it stopped.
+
+'diff' counts a vector as live while its transaction is in transactions or
+transactions_archive; only vectors with neither are orphans.
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import defaultdict
+from sqlalchemy import text
+
+from app.core.database import ReadSessionLocal, SessionLocal
+from app.core.vector import (
+    get_collection,
+    collection_name_for,
+    list_transaction_collections,
+    transaction_document,
+    transaction_metadata,
+)
+from app.services.embeddings import embed
+from app.services.llm_gateway import gateway, process_quota
+
+DEFAULT_CHECKPOINT = "reindex_checkpoint.json"
+# Values per IN (...) list, below SQLite's default limit of 999 bind variables
+IN_CHUNK = 500
+
+def load_checkpoint(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f).get("last_id", 0)
+
+def save_checkpoint(path: str, last_id: int):
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_id": last_id}, f)
+    os.replace(tmp_path, path)
+
+async def fetch_batch(after_id: int, batch_size: int, user_id: int = None):
+    filters = ["id > :after_id"]
+    params = {"after_id": after_id, "limit": batch_size}
+    if user_id is not None:
+        filters.append("user_id = :uid")
+        params["uid"] = user_id
+    query = f"""
+    SELECT id, user_id, document_id, date, merchant, amount, currency, category, description_embedding_id
+    FROM transactions
+    WHERE {" AND ".join(filters)}
+    ORDER BY id
+    LIMIT :limit
+    """
+    async with ReadSessionLocal() as session:
+        result = await session.execute(text(query), params)
+        return result.fetchall()
+
+async def assign_missing_embedding_ids(rows) -> dict:
+    """
+    Rows ingested without a vector id get a stable one ('tx_<id>') so upserts stay idempotent.
+    """
+    assigned = {row.id: f"tx_{row.id}" for row in rows if not row.description_embedding_id}
+    if assigned:
+        async with SessionLocal() as session:
+            await session.execute(
+                text("UPDATE transactions SET description_embedding_id = :vec_id WHERE id = :id"),
+                [{"id": tx_id, "vec_id": vec_id} for tx_id, vec_id in assigned.items()]
+            )
+            await session.commit()
+    return assigned
+
+def group_by_collection(rows, assigned: dict):
+    grouped = defaultdict(lambda: {"ids": [], "documents": [], "metadatas": []})
+    for row in rows:
+        tx_date = str(row.date)[:10]
+        bucket = grouped[collection_name_for(row.user_id)]
+        bucket["ids"].append(row.description_embedding_id or assigned[row.id])
+        bucket["documents"].append(transaction_document(row.merchant, row.category, tx_date, row.amount, row.currency))
+        bucket["metadatas"].append(
+            transaction_metadata(row.merchant, row.category, row.amount, tx_date, row.document_id, row.user_id)
+        )
+    return grouped
+
+async def upsert_rows(rows, semaphore: asyncio.Semaphore):
+    assigned = await assign_missing_embedding_ids(rows)
+    for name, bucket in group_by_collection(rows, assigned).items():
+        async with semaphore:
+            bucket["embeddings"] = await embed(bucket["documents"])
+            # Chroma's client is blocking
+            await asyncio.to_thread(get_collection(name).upsert, **bucket)
+
+async def run(args):
+    last_id = 0 if args.reset else load_checkpoint(args.checkpoint)
+    if last_id:
+        print(f"Resuming after transaction id {last_id}")
+    semaphore = asyncio.Semaphore(args.concurrency)
+    total = 0
+
+    while True:
+        # One wave = up to `concurrency` batches embedded in parallel
+        wave, cursor = [], last_id
+        for _ in range(args.concurrency):
+            rows = await fetch_batch(cursor, args.batch_size, args.user_id)
+            if not rows:
+                break
+            wave.append(rows)
+            cursor = rows[-1].id
+        if not wave:
+            break
+
+        await asyncio.gather(*[upsert_rows(rows, semaphore) for rows in wave])
+        last_id = cursor
+        total += sum(len(rows) for rows in wave)
+        save_checkpoint(args.checkpoint, last_id)
+        print(f"Indexed {total} transactions (checkpoint: id {last_id})")
+
+    print(f"Re-index complete: {total} transactions upserted.")
+
+async def find_missing(args):
+    """
+    SQL rows whose vector id is NULL or absent from the routed collection.
+    """
+    missing, cursor = [], 0
+    while True:
+        rows = await fetch_batch(cursor, args.batch_size, args.user_id)
+        if not rows:
+            break
+        cursor = rows[-1].id
+        by_collection = defaultdict(dict)
+        for row in rows:
+            if not row.description_embedding_id:
+                missing.append(row)
+            else:
+                by_collection[collection_name_for(row.user_id)][row.description_embedding_id] = row
+        for name, expected in by_collection.items():
+            found = await asyncio.to_thread(get_collection(name).get, ids=list(expected), include=[])
+            for vec_id in set(expected) - set(found["ids"]):
+                missing.append(expected[vec_id])
+    return missing
+
+async def _present(session, query: str, values) -> set:
+    """
+    First-column values returned by query (with an {in_list} placeholder) for each chunk of values.
+    """
+    found = set()
+    for start in range(0, len(values), IN_CHUNK):
+        params = {f"v_{k}": value for k, value in enumerate(values[start:start + IN_CHUNK])}
+        result = await session.execute(text(query.format(in_list=",".join(f":{key}" for key in params))), params)
+        found.update(row[0] for row in result.fetchall())
+    return found
+
+async def find_orphans(args):
+    """
+    Vector ids with no matching transaction row, and ids of archived transactions.
+    Returns ({collection name: [orphan ids]}, {collection name: [archived ids]}).
+    """
+    orphans, archived = defaultdict(list), defaultdict(list)
+    async with ReadSessionLocal() as session:
+        # Rows archived before the vector id was kept: match their vectors by document instead
+        result = await session.execute(text(
+            "SELECT DISTINCT document_id FROM transactions_archive WHERE description_embedding_id IS NULL"
+        ))
+        unkeyed_documents = {row[0] for row in result.fetchall()}
+
+    names = list_transaction_collections()
+    if args.user_id is not None:
+        names = [n for n in names if n == collection_name_for(args.user_id)]
+    for name in names:
+        collection = get_collection(name)
+        offset = 0
+        while True:
+            page = await asyncio.to_thread(
+                collection.get, limit=args.batch_size, offset=offset, include=["metadatas"]
+            )
+            ids = page["ids"]
+            if not ids:
+                break
+            offset += len(ids)
+            metadatas = dict(zip(ids, (m or {} for m in page["metadatas"])))
+            if args.user_id is not None:
+                ids = [i for i in ids if metadatas[i].get("user_id") == args.user_id]
+            if not ids:
+                continue
+            async with ReadSessionLocal() as session:
+                hot = await _present(session, "SELECT description_embedding_id FROM transactions WHERE description_embedding_id IN ({in_list})", ids)
+                cold = await _present(session, "SELECT description_embedding_id FROM transactions_archive WHERE description_embedding_id IN ({in_list})", ids)
+            for vec_id in ids:
+                if vec_id in hot:
+                    continue
+                if vec_id in cold or metadatas[vec_id].get("doc_id") in unkeyed_documents:
+                    archived[name].append(vec_id)
+                else:
+                    orphans[name].append(vec_id)
+    return orphans, archived
+
+async def diff(args):
+    missing = await find_missing(args)
+    orphans, archived = await find_orphans(args)
+    orphan_count = sum(len(ids) for ids in orphans.values())
+    archived_count = sum(len(ids) for ids in archived.values())
+
+    print(f"Missing vectors : {len(missing)}")
+    for row in missing[:10]:
+        print(f"  transaction {row.id} (user {row.user_id}) -> {row.description_embedding_id or 'NULL'}")
+    print(f"Orphaned vectors: {orphan_count}")
+    for name, ids in orphans.items():
+        for vec_id in ids[:10]:
+            print(f"  {name}: {vec_id}")
+    print(f"Archived vectors: {archived_count} (kept unless --delete-archived)")
+
+    if args.repair and missing:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        for start in range(0, len(missing), args.batch_size):
+            await upsert_rows(missing[start:start + args.batch_size], semaphore)
+        print(f"Re-embedded {len(missing)} missing vectors.")
+    if args.delete_orphans and orphan_count:
+        for name, ids in orphans.items():
+            if ids:
+                await asyncio.to_thread(get_collection(name).delete, ids=ids)
+        print(f"Deleted {orphan_count} orphaned vectors.")
+    if args.delete_archived and archived_count:
+        for name, ids in archived.items():
+            if ids:
+                await asyncio.to_thread(get_collection(name).delete, ids=ids)
+        print(f"Deleted {archived_count} vectors of archived transactions.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["run", "diff"])
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reset", action="store_true", help="Ignore the checkpoint and start from the first row")
+    parser.add_argument("--repair", action="store_true", help="diff: re-embed missing vectors")
+    parser.add_argument("--delete-orphans", action="store_true", help="diff: delete vectors with no row in transactions or transactions_archive")
+    parser.add_argument("--delete-archived", action="store_true", help="diff: delete vectors of archived transactions (search then covers the hot table only)")
+    args = parser.parse_args()
+    if args.user_id is not None and args.checkpoint == DEFAULT_CHECKPOINT:
+        args.checkpoint = f"reindex_checkpoint_user_{args.user_id}.json"
+    # Re-embedding is ingestion work: spend the workers' slice of the quota, not the API's
+    gateway.set_quota(*process_quota("worker"))
+    asyncio.run(run(args) if args.mode == "run" else diff(args))
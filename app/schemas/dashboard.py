@@ -26,3 +26,39 @@ class DashboardStats(BaseModel):
     top_category: Optional[str] = None
     category_breakdown: List[CategoryStat]
     monthly_trend: List[TrendPoint]
+
+class CategoryForecast(BaseModel):
+    category: str
+    spent: float
+    baseline_remaining: float # typical day-to-day spending expected for the rest of the month
+    recurring_remaining: float # subscriptions / bills still due this month
+    projected: float
+    budget: Optional[float] = None
+    projected_vs_budget: Optional[float] = None # positive = projected overspend
+    status: Optional[str] = None # on_track, at_risk, over (None without a budget)
+
+class UpcomingCharge(BaseModel):
+    merchant: str
+    category: str
+    amount: float
+    date: date
+    pending: bool # was due earlier this month and has not posted yet
+
+class SpendingForecast(BaseModel):
+    month: str
+    as_of: date
+    days_remaining: int
+    spent: float
+    projected: float
+    categories: List[CategoryForecast]
+    upcoming_recurring: List[UpcomingCharge]
+
+class AnomalyOut(BaseModel):
+    transaction_id: int
+    date: date
+    merchant: Optional[str] = None
+    category: Optional[str] = None
+    amount: float
+    dimension: str # merchant or category the charge was unusual for
+    expected: float
+    zscore: float
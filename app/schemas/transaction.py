@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from datetime import date as date_type
 from typing import List, Optional
 
 class Transaction(BaseModel):
@@ -11,3 +12,15 @@ class Transaction(BaseModel):
 class ExtractedFinancialData(BaseModel):
     transactions: List[Transaction]
     summary: str = Field(description="Brief summary of the statement period and total spend")
+
+class TransactionOut(BaseModel):
+    id: int
+    date: date_type
+    merchant: Optional[str] = None
+    amount: float
+    currency: Optional[str] = None
+    category: Optional[str] = None
+
+class TransactionPage(BaseModel):
+    items: List[TransactionOut]
+    next_cursor: Optional[str] = None # Opaque; pass back as ?cursor= to get the next page
@@ -7,6 +7,18 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    user_id: Optional[int] = None
+
+class UserPrincipal(BaseModel):
+    """
+    Lightweight authenticated identity handed to endpoints instead of the User ORM row.
+    """
+    id: int
+    email: str
+    full_name: Optional[str] = None
+
+    class Config:
+        from_attributes = True
 
 class UserCreate(BaseModel):
     email: EmailStr
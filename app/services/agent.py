@@ -1,93 +1,154 @@
-from typing import TypedDict, Literal, Annotated
+from datetime import date
+from typing import TypedDict, Literal, Annotated, List
 from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
-from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langgraph.graph import StateGraph, END, add_messages
 from langgraph.prebuilt import ToolNode
+from pydantic import BaseModel, Field
 
 from app.core.config import settings
 from app.core.context import user_id_context
-from app.services.tools import run_sql_query, search_vector_db, get_db_schema, check_budget_status, diagnose_spending
+from app.services.llm_gateway import gateway, get_chat_model, estimate_tokens, Priority
+from app.services.profile import get_profile_text
+from app.services.tools import run_sql_query, run_sql_batch, search_vector_db, get_db_schema, check_budget_status, diagnose_spending, forecast_spending
 
 # 1. Tools for LangChain
+# User scoping comes from user_id_context (set per request), never from the model's arguments.
 @tool
-async def query_sql_tool(query: str, user_id: int):
+async def query_sql_tool(query: str):
     """
-    Run a SQL query. The table name is 'transactions'.
-    Columns: date, merchant, amount, category.
-    Example: SELECT sum(amount) FROM transactions WHERE category = 'Food'
+    Run a read-only SQL query over the current user's data (see DATABASE SCHEMA).
+    Example: SELECT sum(amount_base) FROM transactions WHERE category = 'Food'
     """
-    return await run_sql_query(query, user_id)
+    return await run_sql_query(query, user_id_context.get())
+
+class LabeledQuery(BaseModel):
+    label: str = Field(description="Short name for this result, e.g. 'dining_2026_08'")
+    query: str = Field(description="Read-only SQL over the user's tables")
+
+@tool
+async def query_sql_batch_tool(queries: List[LabeledQuery]):
+    """
+    Run several read-only SQL queries in ONE call; they execute concurrently and come back labeled.
+    Use this for comparisons or whenever more than one figure is needed (e.g. dining vs groceries for each of the last 3 months).
+    """
+    return await run_sql_batch(
+        [q if isinstance(q, dict) else q.model_dump() for q in queries], user_id_context.get()
+    )
 
 @tool
-async def vector_search_tool(query: str, user_id: int):
+async def vector_search_tool(query: str):
     """
     Search for transactions by semantic meaning.
     Example: "coffee shops" -> returns Starbucks, Dunkin transactions.
     """
-    return await search_vector_db(query, user_id)
+    return await search_vector_db(query, user_id_context.get())
 
 @tool
-async def budget_tool(user_id: int):
+async def budget_tool():
     """
     Check the status of budgets (Spending vs Limit).
     Use this when the user asks about "budgets", "limits", or "overspending".
     """
-    return await check_budget_status(user_id)
+    return await check_budget_status(user_id_context.get())
 
 @tool
-async def diagnostics_tool(user_id: int):
+async def diagnostics_tool():
     """
     Analyzes spending history to find patterns, subscriptions, and bad habits.
     Use this when user asks "Where can I save?", "Analyze my spending", or "Find subscriptions".
     """
-    return await diagnose_spending(user_id)
+    return await diagnose_spending(user_id_context.get())
+
+@tool
+async def forecast_tool():
+    """
+    Projects month-end spending per category (typical spending + upcoming recurring charges) against budgets.
+    Use this when the user asks "Will I stay under budget?", "How much will I spend this month?" or about upcoming bills.
+    """
+    return await forecast_spending(user_id_context.get())
 
 # 2. State
 class AgentState(TypedDict):
     # The 'add_messages' reducer ensures valid history is preserved
     messages: Annotated[list, add_messages]
 
-# 3. Nodes (Brain)
+TOOLS = [query_sql_tool, vector_search_tool, budget_tool, diagnostics_tool, forecast_tool]
+if settings.AGENT_SQL_BATCH_ENABLED:
+    TOOLS.insert(1, query_sql_batch_tool)
+
+_llm_with_tools = None
+_app_graph = None
+
+def get_llm_with_tools():
+    """
+    The tool-bound chat model, created once per process (it owns the HTTP connection pool).
+    """
+    global _llm_with_tools
+    if _llm_with_tools is None:
+        _llm_with_tools = get_chat_model().bind_tools(TOOLS)
+    return _llm_with_tools
+
+# 3. Prompt
+def build_system_prefix() -> str:
+    """
+    Everything in the system prompt that is the same for every user and call: role,
+    guidelines, tool index and schema. Built once, so it is a byte-identical prefix
+    the provider can cache (see benchmarks/bench_prompt_layout.py).
+    """
+    tool_index = "\n".join(f"- {t.name}: {t.description.strip().splitlines()[0]}" for t in TOOLS)
+    batch_guideline = (
+        "\n   When you need several figures (comparisons, several months or categories), send all the queries"
+        " in ONE 'query_sql_batch_tool' call instead of calling 'query_sql_tool' repeatedly."
+        if settings.AGENT_SQL_BATCH_ENABLED else ""
+    )
+    return f"""You are a Financial Advisor. You have access to a SQL Database, Vector Store, and Diagnostic Tools.
+
+TOOLS:
+{tool_index}
+
+DATABASE SCHEMA:
+{get_db_schema()}
+
+GUIDELINES:
+0. If the USER FINANCIAL PROFILE already answers the question (monthly or category totals, budget usage, subscriptions), answer from it directly without calling a tool.
+1. For aggregation (Total spent, Count, Average), write a SQL query and use 'query_sql_tool'.
+   Queries only see the current user's rows; do not filter by user_id.{batch_guideline}
+2. For searching specific items (Where did I eat?, Shopping), use 'vector_search_tool'.
+3. For budget checks, use 'budget_tool'.
+4. For ADVICE, SAVING TIPS, or SPENDING PATTERNS, use 'diagnostics_tool'.
+5. For "Will I stay under budget?" or month-end projections and upcoming bills, use 'forecast_tool'.
+6. Always answer in a helpful, concise manner.
+"""
+
+SYSTEM_PREFIX = build_system_prefix()
+
+def system_messages(profile: str, today: date) -> list:
+    """
+    Static prefix first, unchanged across users and steps; then the small per-request suffix.
+    """
+    suffix = f"Today is {today.isoformat()}."
+    if profile:
+        suffix += f"\n\nUSER FINANCIAL PROFILE (precomputed, current as of the last upload or budget change):\n{profile}"
+    return [SystemMessage(content=SYSTEM_PREFIX), SystemMessage(content=suffix)]
+
+# 4. Nodes (Brain)
 async def agent_node(state: AgentState):
     """
     The Brain. Decides which tool to call.
     """
-    messages = state["messages"]
-    
-    # System Prompt with Schema Context
-    schema = get_db_schema()
-    
-    # Get Current User ID from Context
     user_id = user_id_context.get()
+    # Precomputed totals / budgets / subscriptions, so simple questions need no tool call
+    profile = await get_profile_text(user_id) if settings.AGENT_PROFILE_ENABLED else ""
+
+    messages = system_messages(profile, date.today()) + state["messages"]
     
-    system_message = SystemMessage(content=f"""
-    You are a Financial Advisor. You have access to a SQL Database, Vector Store, and Diagnostic Tools.
-    
-    CURRENT USER ID: {user_id}
-    
-    DATABASE SCHEMA:
-    {schema}
-    
-    GUIDELINES:
-    1. For aggregation (Total spent, Count, Average), write a SQL query and use 'query_sql_tool'.
-       CRITICAL: You MUST filter all SQL queries by 'user_id = {user_id}'.
-    2. For searching specific items (Where did I eat?, Shopping), use 'vector_search_tool'.
-    3. For budget checks, use 'budget_tool'.
-    4. For ADVICE, SAVING TIPS, or SPENDING PATTERNS, use 'diagnostics_tool'.
-    5. Always answer in a helpful, concise manner.
-    6. IMPORTANT: You MUST pass user_id={user_id} to EVERY tool call.
-    """)
-    
-    # Combine system message with history. 
-    # Ensure system message is first IF not already present (simplification)
-    if not isinstance(messages[0], SystemMessage):
-        messages = [system_message] + messages
-    
-    llm = ChatOpenAI(model="gpt-4o", api_key=settings.OPENAI_API_KEY)
-    llm_with_tools = llm.bind_tools([query_sql_tool, vector_search_tool, budget_tool, diagnostics_tool])
-    
-    response = llm_with_tools.invoke(messages)
+    # Chat priority: jumps ahead of queued extraction calls in the shared rate budget
+    response = await gateway.call(
+        lambda: get_llm_with_tools().ainvoke(messages),
+        priority=Priority.CHAT,
+        est_tokens=estimate_tokens(messages)
+    )
     return {"messages": [response]}
 
 def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
@@ -98,15 +159,25 @@ def should_continue(state: AgentState) -> Literal["tools", "__end__"]:
         return "tools"
     return "__end__"
 
-# 4. Build Graph
-workflow = StateGraph(AgentState)
+# 5. Build Graph
+def build_graph():
+    workflow = StateGraph(AgentState)
+
+    # Add Nodes
+    workflow.add_node("agent", agent_node)
+    workflow.add_node("tools", ToolNode(TOOLS))
 
-# Add Nodes
-workflow.add_node("agent", agent_node)
-workflow.add_node("tools", ToolNode([query_sql_tool, vector_search_tool, budget_tool, diagnostics_tool]))
+    workflow.set_entry_point("agent")
+    workflow.add_conditional_edges("agent", should_continue)
+    workflow.add_edge("tools", "agent")
 
-workflow.set_entry_point("agent")
-workflow.add_conditional_edges("agent", should_continue)
-workflow.add_edge("tools", "agent")
+    return workflow.compile()
 
-app_graph = workflow.compile()
+def get_app_graph():
+    """
+    Compiles the graph on first use instead of at import time.
+    """
+    global _app_graph
+    if _app_graph is None:
+        _app_graph = build_graph()
+    return _app_graph
@@ -0,0 +1,109 @@
+"""
+Streaming anomaly detection.
+
+Each new transaction is scored against the running statistics of its merchant
+and category, then folded into them with Welford's update. Only the stats rows
+touched by the batch are loaded, so ingestion cost is O(new rows).
+
+Updates for one user are serialized (see update_stats_and_flag), so concurrent
+ingestion consumers neither lose updates nor insert the same key twice.
+"""
+import math
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.sql import User, SpendingStat, Anomaly
+
+DIMENSIONS = ("merchant", "category")
+
+def welford_update(stat, amount: float, tx_date=None):
+    stat.count += 1
+    delta = amount - stat.mean
+    stat.mean += delta / stat.count
+    stat.m2 += delta * (amount - stat.mean)
+    if tx_date is not None and (stat.last_seen is None or tx_date > stat.last_seen):
+        stat.last_seen = tx_date
+
+def stddev(stat) -> float:
+    if stat.count < 2:
+        return 0.0
+    return math.sqrt(max(stat.m2, 0.0) / (stat.count - 1))
+
+def zscore(stat, amount: float) -> float:
+    # Floor the spread so merchants with identical past charges don't flag every cent of change.
+    spread = max(stddev(stat), abs(stat.mean) * 0.1, 1.0)
+    return (amount - stat.mean) / spread
+
+def score_and_update(stats: dict, rows, new_stat):
+    """
+    Pure core shared by ingestion and the correctness check.
+
+    stats: {(dimension, key): stat} with count/mean/m2/last_seen attributes.
+    rows: iterable of (transaction_id, date, merchant, category, amount).
+    new_stat: factory(dimension, key) for keys seen for the first time.
+    Returns a list of (transaction_id, dimension, key, amount, expected, zscore).
+    """
+    flagged = []
+    for tx_id, tx_date, merchant, category, amount in sorted(rows, key=lambda r: (r[1], r[0])):
+        for dimension, key in (("merchant", merchant), ("category", category)):
+            if key is None:
+                continue
+            stat = stats.get((dimension, key))
+            if stat is None:
+                stat = stats[(dimension, key)] = new_stat(dimension, key)
+            if stat.count >= settings.ANOMALY_MIN_HISTORY:
+                z = zscore(stat, amount)
+                if z >= settings.ANOMALY_Z_THRESHOLD:
+                    flagged.append((tx_id, dimension, key, amount, stat.mean, z))
+            welford_update(stat, amount, tx_date)
+    return flagged
+
+async def update_stats_and_flag(db, user_id: int, transactions) -> int:
+    """
+    Scores freshly flushed Transaction rows, records anomalies and updates running stats
+    inside the caller's session (committed together with the transactions).
+    """
+    if not transactions:
+        return 0
+
+    # Holds the user's stats until the caller commits: two documents of one user ingested at once would
+    # otherwise both read the old stats (a lost Welford update) or both insert a new key (unique violation).
+    # Postgres: NO KEY UPDATE, which the new rows' foreign-key checks on users do not conflict with.
+    # SQLite renders no lock; the flushed inserts already hold its single write lock.
+    await db.execute(select(User.id).where(User.id == user_id).with_for_update(key_share=True))
+
+    keys = {tx.merchant for tx in transactions} | {tx.category for tx in transactions}
+    keys.discard(None)
+    result = await db.execute(
+        select(SpendingStat).where(
+            SpendingStat.user_id == user_id,
+            SpendingStat.key.in_(keys)
+        )
+    )
+    stats = {(s.dimension, s.key): s for s in result.scalars().all()}
+
+    def new_stat(dimension, key):
+        stat = SpendingStat(user_id=user_id, dimension=dimension, key=key, count=0, mean=0.0, m2=0.0)
+        db.add(stat)
+        return stat
+
+    # Stats are kept in the base currency so a EUR and a USD charge at one merchant are comparable
+    rows = [
+        (tx.id, tx.date, tx.merchant, tx.category, (tx.amount_base if tx.amount_base is not None else tx.amount) or 0.0)
+        for tx in transactions
+    ]
+    flagged = score_and_update(stats, rows, new_stat)
+
+    db.add_all([
+        Anomaly(
+            user_id=user_id,
+            transaction_id=tx_id,
+            dimension=dimension,
+            key=key,
+            amount=amount,
+            expected=round(expected, 2),
+            zscore=round(z, 2)
+        )
+        for tx_id, dimension, key, amount, expected, z in flagged
+    ])
+    return len(flagged)
@@ -0,0 +1,22 @@
+"""
+Per-user data version: a counter bumped whenever a user's transactions or
+budgets change, so derived results (forecasts, profiles) can be cached until
+the next change instead of for a fixed time.
+"""
+from sqlalchemy import update, select, func
+
+from app.models.sql import User
+
+async def bump_data_version(session, user_id: int) -> int:
+    """
+    Increments inside the caller's transaction, so the bump commits with the change itself.
+    Returns the new version, which in-process caches can record after the commit.
+    """
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        # COALESCE: the column is NULL on rows that predate it
+        .values(data_version=func.coalesce(User.data_version, 0) + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return (await session.execute(select(User.data_version).where(User.id == user_id))).scalar()
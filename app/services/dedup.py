@@ -0,0 +1,81 @@
+"""
+Cross-statement duplicate detection.
+
+Overlapping statements (and card + checking exports of the same payment)
+repeat transactions. Each row gets a fingerprint of user, currency, amount in
+cents and a normalized merchant key; the date is left out of the hash and
+matched with a +/- DEDUP_WINDOW_DAYS window instead, because the same charge
+often posts a day or two apart on different statements. Lookups use the
+(user_id, fingerprint, date) index of transactions and of transactions_archive
+(archived months are still counted, through monthly_rollups): one query per
+table per ingestion batch.
+"""
+import hashlib
+import re
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.sql import Transaction, TransactionArchive
+from app.services.lexical import tokenize
+
+# Statement noise that differs between exports of the same merchant
+_NOISE_TOKENS = {"pos", "debit", "dbt", "purchase", "card", "checkcard", "visa", "mc", "ach", "recurring", "www", "com", "inc", "llc", "ltd"}
+_HAS_DIGIT = re.compile(r"\d")
+
+# Bound on IN (...) list size per query (SQLite's variable limit)
+_LOOKUP_CHUNK = 500
+
+def merchant_key(merchant: str) -> str:
+    """
+    'STARBUCKS #0412', 'Starbucks' and 'POS STARBUCKS 0412' all become 'starbucks'.
+    """
+    tokens = [t for t in tokenize(merchant) if t not in _NOISE_TOKENS and not _HAS_DIGIT.search(t)]
+    return " ".join(tokens) or (merchant or "").strip().lower()
+
+def transaction_fingerprint(user_id: int, merchant: str, amount: float, currency: str) -> str:
+    cents = int(round((amount or 0.0) * 100))
+    key = f"{user_id}|{(currency or settings.BASE_CURRENCY).upper()}|{cents}|{merchant_key(merchant)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+async def find_duplicates(db, user_id: int, document_id: int, candidates) -> set:
+    """
+    candidates: list of (fingerprint, date) for the rows about to be inserted.
+    Returns the candidate positions that match an already stored row (hot or archived)
+    of another document within the date window. Each stored row absorbs at most one
+    candidate, so two genuine identical charges are only skipped if two were stored.
+    """
+    if not candidates:
+        return set()
+    window = timedelta(days=settings.DEDUP_WINDOW_DAYS)
+    fingerprints = sorted({fp for fp, _ in candidates})
+    first = min(day for _, day in candidates) - window
+    last = max(day for _, day in candidates) + window
+
+    stored = defaultdict(list) # fingerprint -> [date] of existing rows
+    for model in (Transaction, TransactionArchive):
+        for start in range(0, len(fingerprints), _LOOKUP_CHUNK):
+            result = await db.execute(
+                select(model.fingerprint, model.date).where(
+                    model.user_id == user_id,
+                    model.fingerprint.in_(fingerprints[start:start + _LOOKUP_CHUNK]),
+                    model.date >= first,
+                    model.date <= last,
+                    model.document_id != document_id
+                )
+            )
+            for fingerprint, day in result.all():
+                stored[fingerprint].append(day)
+
+    duplicates = set()
+    for position, (fingerprint, day) in enumerate(candidates):
+        days = stored.get(fingerprint)
+        if not days:
+            continue
+        # Consume the closest stored row inside the window
+        best = min(range(len(days)), key=lambda i: abs((days[i] - day).days))
+        if abs((days[best] - day).days) <= settings.DEDUP_WINDOW_DAYS:
+            duplicates.add(position)
+            days.pop(best)
+    return duplicates
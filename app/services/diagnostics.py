@@ -0,0 +1,185 @@
+"""
+Vectorized spending diagnostics.
+
+A user's history is loaded once into NumPy arrays; habits, recurring charges and
+top expenses are then computed from those arrays without further queries.
+"""
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import text
+
+from app.core.database import ReadSessionLocal
+from app.services.fx import BASE_AMOUNT_SQL
+
+# label -> (period in days, tolerance in days, minimum occurrences)
+RECURRENCE_PERIODS = {
+    "weekly": (7, 1, 3),
+    "biweekly": (14, 2, 3),
+    "monthly": (30, 4, 2),
+    "quarterly": (91, 7, 2),
+    "annual": (365, 10, 2),
+}
+# Share of intervals that must match the period.
+INTERVAL_MATCH_RATIO = 0.75
+# Max/min amount ratio tolerated for one subscription (covers price changes).
+AMOUNT_BAND = 1.25
+MIN_RECURRING_AMOUNT = 5.0
+HABIT_MIN_COUNT = 5
+
+class SpendingHistory:
+    """
+    Column arrays for one user's transactions.
+    Merchants are dictionary-encoded: merchant_names[merchant_codes[i]] is row i's merchant.
+    """
+    def __init__(self, merchants, amounts, dates, categories):
+        self.merchant_names, self.merchant_codes = np.unique(
+            np.asarray(merchants, dtype=object).astype(str), return_inverse=True
+        )
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        self.categories = np.asarray(categories, dtype=object)
+
+    def __len__(self):
+        return len(self.amounts)
+
+async def load_history(user_id: int) -> SpendingHistory:
+    """
+    Single query for everything the diagnostics need.
+    """
+    async with ReadSessionLocal() as session:
+        result = await session.execute(
+            text(f"SELECT merchant, {BASE_AMOUNT_SQL} AS amount, date, category FROM transactions WHERE user_id = :uid"),
+            {"uid": user_id}
+        )
+        rows = result.fetchall()
+    if not rows:
+        return SpendingHistory([], [], [], [])
+    merchants, amounts, dates, categories = zip(*rows)
+    return SpendingHistory(
+        [m or "Unknown" for m in merchants],
+        [a or 0.0 for a in amounts],
+        [str(d)[:10] for d in dates],
+        categories,
+    )
+
+def _day_to_date(day: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=int(day))
+
+def frequency_habits(history: SpendingHistory, limit: int = 5):
+    counts = np.bincount(history.merchant_codes, minlength=len(history.merchant_names))
+    totals = np.bincount(history.merchant_codes, weights=history.amounts, minlength=len(history.merchant_names))
+    frequent = np.flatnonzero(counts >= HABIT_MIN_COUNT)
+    frequent = frequent[np.argsort(-counts[frequent], kind="stable")][:limit]
+    return [
+        {"merchant": history.merchant_names[i], "count": int(counts[i]), "total": round(float(totals[i]), 2)}
+        for i in frequent
+    ]
+
+def top_expenses(history: SpendingHistory, limit: int = 3):
+    if not len(history):
+        return []
+    k = min(limit, len(history))
+    idx = np.argpartition(-history.amounts, k - 1)[:k]
+    idx = idx[np.argsort(-history.amounts[idx], kind="stable")]
+    return [
+        {
+            "merchant": history.merchant_names[history.merchant_codes[i]],
+            "amount": float(history.amounts[i]),
+            "category": history.categories[i],
+            "date": _day_to_date(history.days[i]).isoformat(),
+        }
+        for i in idx
+    ]
+
+def detect_recurring(history: SpendingHistory):
+    """
+    Finds merchants charged at a regular interval with a stable amount.
+    Returns one entry per merchant with its period, latest amount and next expected date.
+    """
+    n_merchants = len(history.merchant_names)
+    if len(history) < 2:
+        return []
+
+    # Sort by merchant, then date, so each merchant's charges are contiguous.
+    order = np.lexsort((history.days, history.merchant_codes))
+    codes = history.merchant_codes[order]
+    days = history.days[order]
+    amounts = history.amounts[order]
+
+    counts = np.bincount(codes, minlength=n_merchants)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+
+    # Amount band per merchant.
+    amt_max = np.zeros(n_merchants)
+    amt_min = np.zeros(n_merchants)
+    amt_max[present] = np.maximum.reduceat(amounts, starts[present])
+    amt_min[present] = np.minimum.reduceat(amounts, starts[present])
+    stable_amount = (amt_min >= MIN_RECURRING_AMOUNT) & (amt_max <= amt_min * AMOUNT_BAND)
+
+    # Intervals between consecutive charges of the same merchant.
+    same = codes[1:] == codes[:-1]
+    interval_codes = codes[1:][same]
+    intervals = np.diff(days)[same]
+    interval_counts = np.bincount(interval_codes, minlength=n_merchants)
+
+    best_ratio = np.zeros(n_merchants)
+    best_period = np.full(n_merchants, -1)
+    labels = list(RECURRENCE_PERIODS)
+    for p, label in enumerate(labels):
+        period, tolerance, min_count = RECURRENCE_PERIODS[label]
+        hits = np.bincount(
+            interval_codes,
+            weights=(np.abs(intervals - period) <= tolerance).astype(np.float64),
+            minlength=n_merchants
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(interval_counts > 0, hits / interval_counts, 0.0)
+        better = (ratio >= INTERVAL_MATCH_RATIO) & (counts >= min_count) & (ratio > best_ratio)
+        best_ratio[better] = ratio[better]
+        best_period[better] = p
+
+    recurring = np.flatnonzero((best_period >= 0) & stable_amount)
+    ends = starts + counts - 1
+    results = []
+    for i in recurring:
+        label = labels[best_period[i]]
+        first_amount, last_amount = amounts[starts[i]], amounts[ends[i]]
+        last_day = days[ends[i]]
+        results.append({
+            "merchant": history.merchant_names[i],
+            "period": label,
+            "amount": float(last_amount),
+            "count": int(counts[i]),
+            "last_date": _day_to_date(last_day).isoformat(),
+            "next_expected": _day_to_date(last_day + RECURRENCE_PERIODS[label][0]).isoformat(),
+            "previous_amount": float(first_amount) if first_amount != last_amount else None,
+        })
+    results.sort(key=lambda r: -r["amount"])
+    return results
+
+def analyze(history: SpendingHistory) -> dict:
+    return {
+        "habits": frequency_habits(history),
+        "recurring": detect_recurring(history),
+        "top_expenses": top_expenses(history),
+    }
+
+def render_report(result: dict) -> str:
+    report = "--- Financial Diagnostics Report ---\n"
+    if result["habits"]:
+        report += "\n[High Frequency Habits]\n"
+        for row in result["habits"]:
+            report += f"- {row['merchant']}: {row['count']} times (Total: ${row['total']})\n"
+    if result["recurring"]:
+        report += "\n[Subscriptions / Recurring Charges]\n"
+        for row in result["recurring"]:
+            line = f"- {row['merchant']}: ${row['amount']:.2f} {row['period']} (seen {row['count']} times, next ~{row['next_expected']})"
+            if row["previous_amount"] is not None:
+                line += f" [price changed from ${row['previous_amount']:.2f}]"
+            report += line + "\n"
+    if result["top_expenses"]:
+        report += "\n[Largest Single Expenses]\n"
+        for row in result["top_expenses"]:
+            report += f"- {row['merchant']}: ${row['amount']} ({row['category']}) on {row['date']}\n"
+    return report
@@ -0,0 +1,26 @@
+"""
+Embedding calls, admitted through the LLM gateway.
+
+Chroma embeds texts itself inside upsert() and query(), which would spend
+OpenAI quota outside the gateway's token buckets. Callers embed here first and
+hand Chroma the vectors instead: ingestion and re-indexing at INGESTION
+priority, search queries at CHAT priority.
+"""
+import asyncio
+
+from app.core.vector import get_embedding_function
+from app.services.llm_gateway import gateway, Priority
+
+def estimate_embedding_tokens(texts) -> int:
+    """
+    ~4 characters per token; embeddings have no completion to leave headroom for.
+    """
+    return sum(len(t) for t in texts) // 4 + len(texts)
+
+async def embed(texts, priority: Priority = Priority.INGESTION) -> list:
+    if not texts:
+        return []
+    texts = list(texts)
+    function = await asyncio.to_thread(get_embedding_function)
+    # The OpenAI client inside the embedding function is blocking
+    return await gateway.call(lambda: asyncio.to_thread(function, texts), priority, estimate_embedding_tokens(texts))
@@ -0,0 +1,147 @@
+import csv
+import io
+from datetime import date
+from enum import Enum
+from typing import AsyncIterator
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+
+EXPORT_COLUMNS = ["id", "date", "merchant", "amount", "currency", "amount_base", "category", "document_id"]
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+class ExportUnavailable(Exception):
+    """Raised when the requested format needs an optional dependency that is not installed."""
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands back whatever was written since the last drain,
+    so Arrow/Parquet writers can be streamed without buffering the whole file.
+    """
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _load_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Arrow and Parquet exports require the 'pyarrow' package.")
+    return pa, pq
+
+def check_format_available(fmt: ExportFormat):
+    if fmt != ExportFormat.CSV:
+        _load_pyarrow()
+
+async def _iter_batches(where_clause: str, params: dict) -> AsyncIterator[list]:
+    """
+    Streams matching transactions from a server-side cursor in EXPORT_BATCH_SIZE chunks.
+    Archived rows (all older than the hot table's) are included, so exports keep the full history.
+    """
+    columns = ", ".join(EXPORT_COLUMNS)
+    query = text(f"""
+    SELECT {columns} FROM transactions_archive {where_clause}
+    UNION ALL
+    SELECT {columns} FROM transactions {where_clause}
+    ORDER BY date, id
+    """).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+    async with ReadSessionLocal() as session:
+        result = await session.stream(query, params)
+        async for partition in result.partitions(settings.EXPORT_BATCH_SIZE):
+            yield partition
+
+def _as_date(value):
+    # SQLite hands back ISO strings from raw text() queries; Postgres returns dates.
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+async def _stream_csv(batches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def _to_record_batch(pa, schema, rows):
+    columns = list(zip(*rows))
+    arrays = []
+    for name, values in zip(EXPORT_COLUMNS, columns):
+        if name == "date":
+            values = [_as_date(v) for v in values]
+        arrays.append(pa.array(values, type=schema.field(name).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+async def _stream_columnar(batches, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    pa, pq = _load_pyarrow()
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("date", pa.date32()),
+        ("merchant", pa.string()),
+        ("amount", pa.float64()),
+        ("currency", pa.string()),
+        ("amount_base", pa.float64()),
+        ("category", pa.string()),
+        ("document_id", pa.int64()),
+    ])
+    sink = _ChunkSink()
+    if fmt == ExportFormat.PARQUET:
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+        write = lambda batch: writer.write_table(pa.Table.from_batches([batch]))
+    else:
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+        write = writer.write_batch
+
+    async for rows in batches:
+        write(_to_record_batch(pa, schema, rows))
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+def stream_transactions_export(where_clause: str, params: dict, fmt: ExportFormat) -> AsyncIterator[bytes]:
+    """
+    Returns an async byte stream of the user's transactions in the requested format.
+    Memory is bounded by one batch regardless of the total row count.
+    """
+    batches = _iter_batches(where_clause, params)
+    if fmt == ExportFormat.CSV:
+        return _stream_csv(batches)
+    return _stream_columnar(batches, fmt)
@@ -1,36 +1,62 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
 from app.schemas.transaction import ExtractedFinancialData
 from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.llm_gateway import gateway, get_chat_model, Priority
 
-def clean_data_with_llm(raw_text: str) -> ExtractedFinancialData:
+logger = get_logger(__name__)
+
+_extraction_chain = None
+
+def get_extraction_chain():
+    """
+    Builds the prompt | structured LLM chain once per process.
+    LangChain is imported here rather than at module load to keep API startup light.
+    """
+    global _extraction_chain
+    if _extraction_chain is None:
+        from langchain_core.prompts import ChatPromptTemplate
+
+        llm = get_chat_model()
+
+        # We use the 'with_structured_output' method which is the modern (LangChain 0.1+) way
+        # to guarantee JSON output matching our Pydantic schema.
+        structured_llm = llm.with_structured_output(ExtractedFinancialData)
+
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "You are a specialized Data Extraction Assistant. "
+                       "Extract financial transactions from the following raw text. "
+                       "Standardize dates to YYYY-MM-DD. "
+                       "IMPORTANT: Infer the category for each transaction based on the merchant name "
+                       "(e.g., 'Groceries', 'Dining', 'Utilities', 'Entertainment', 'Shopping', 'Gas', 'Insurance', 'Health', 'Education', 'Subscription', 'Travel', 'Other'). "
+                       "Do not leave category as null."),
+            ("user", "Raw Text:\n{raw_text}")
+        ])
+
+        _extraction_chain = prompt | structured_llm
+    return _extraction_chain
+
+class ExtractionFailed(Exception):
+    """
+    The LLM could not produce structured data; the document must not be marked completed.
+    """
+
+async def clean_data_with_llm(raw_text: str) -> ExtractedFinancialData:
     """
     Uses OpenAI to parse raw text into structured JSON.
+    Runs at ingestion priority through the LLM gateway, so chat traffic is served first.
+    Raises ExtractionFailed instead of returning an empty result, so the job queue retries it.
     """
     if not settings.OPENAI_API_KEY:
-        print("WARNING: No OpenAI API Key found. Returning empty data.")
-        return ExtractedFinancialData(transactions=[], summary="No API Key")
+        raise ExtractionFailed("No OpenAI API Key configured")
 
-    llm = ChatOpenAI(model="gpt-4o", api_key=settings.OPENAI_API_KEY)
-    
-    # We use the 'with_structured_output' method which is the modern (LangChain 0.1+) way
-    # to guarantee JSON output matching our Pydantic schema.
-    structured_llm = llm.with_structured_output(ExtractedFinancialData)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a specialized Data Extraction Assistant. "
-                   "Extract financial transactions from the following raw text. "
-                   "Standardize dates to YYYY-MM-DD. "
-                   "IMPORTANT: Infer the category for each transaction based on the merchant name "
-                   "(e.g., 'Groceries', 'Dining', 'Utilities', 'Entertainment', 'Shopping', 'Gas', 'Insurance', 'Health', 'Education', 'Subscription', 'Travel', 'Other'). "
-                   "Do not leave category as null."),
-        ("user", "Raw Text:\n{raw_text}")
-    ])
-
-    chain = prompt | structured_llm
+    chain = get_extraction_chain()
     
     try:
-        return chain.invoke({"raw_text": raw_text})
+        return await gateway.call(
+            lambda: chain.ainvoke({"raw_text": raw_text}),
+            priority=Priority.INGESTION,
+            est_tokens=len(raw_text) // 4 + 1500
+        )
     except Exception as e:
-        print(f"Error during LLM extraction: {e}")
-        return ExtractedFinancialData(transactions=[], summary="Extraction Failed")
+        logger.warning("LLM extraction failed", extra={"error": repr(e)})
+        raise ExtractionFailed(f"LLM extraction failed: {e!r}") from e
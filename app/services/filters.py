@@ -0,0 +1,115 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from app.schemas.dashboard import TimeRange
+
+_RANGE_DAYS = {
+    TimeRange.LAST_24H: 1,
+    TimeRange.LAST_7D: 7,
+    TimeRange.LAST_30D: 30,
+    TimeRange.LAST_3M: 90,
+    TimeRange.LAST_6M: 180,
+    TimeRange.LAST_1Y: 365,
+}
+
+# Sorts after every valid character, turning a prefix into an index-friendly range.
+_PREFIX_UPPER_BOUND = "\U0010ffff"
+
+def resolve_start_date(time_range: TimeRange, today: Optional[date] = None) -> Optional[date]:
+    """
+    Start date for a dashboard time range. ALL_TIME -> None.
+    """
+    days = _RANGE_DAYS.get(time_range)
+    if days is None:
+        return None
+    today = today or datetime.now().date()
+    return today - timedelta(days=days)
+
+def add_category_filter(filters: List[str], params: dict, categories: Optional[List[str]]) -> None:
+    """
+    Appends a 'category IN (...)' clause, if categories are given.
+    """
+    if not categories:
+        return
+    # Handling list IN clause safely with SQLAlchemy text is tricky with bind params for lists in some drivers.
+    # We will expand keys like :cat_0, :cat_1
+    cat_clauses = []
+    for i, cat in enumerate(categories):
+        key = f"cat_{i}"
+        cat_clauses.append(f":{key}")
+        params[key] = cat
+    filters.append(f"category IN ({','.join(cat_clauses)})")
+
+def build_transaction_filters(
+    user_id: int,
+    time_range: TimeRange,
+    categories: Optional[List[str]] = None
+) -> Tuple[str, dict]:
+    """
+    Builds the WHERE clause + bind params shared by the dashboard and export endpoints.
+    """
+    filters = ["user_id = :uid"]
+    params = {"uid": user_id}
+
+    start_date = resolve_start_date(time_range)
+    if start_date:
+        filters.append("date >= :start_date")
+        params["start_date"] = start_date
+
+    add_category_filter(filters, params, categories)
+    return " WHERE " + " AND ".join(filters), params
+
+def build_transaction_list_filters(
+    user_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    categories: Optional[List[str]] = None,
+    merchant_prefix: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None
+) -> Tuple[str, dict]:
+    """
+    WHERE clause + bind params for the paginated transaction list (explicit dates instead of a range).
+    """
+    filters = ["user_id = :uid"]
+    params = {"uid": user_id}
+
+    if start_date:
+        filters.append("date >= :start_date")
+        params["start_date"] = start_date
+    if end_date:
+        filters.append("date <= :end_date")
+        params["end_date"] = end_date
+    add_category_filter(filters, params, categories)
+    if merchant_prefix:
+        filters.append("merchant >= :m_lo AND merchant < :m_hi")
+        params["m_lo"] = merchant_prefix
+        params["m_hi"] = merchant_prefix + _PREFIX_UPPER_BOUND
+    if min_amount is not None:
+        filters.append("amount >= :min_amount")
+        params["min_amount"] = min_amount
+    if max_amount is not None:
+        filters.append("amount <= :max_amount")
+        params["max_amount"] = max_amount
+
+    return " WHERE " + " AND ".join(filters), params
+
+def build_rollup_filters(
+    user_id: int,
+    time_range: TimeRange,
+    categories: Optional[List[str]] = None
+) -> Tuple[str, dict]:
+    """
+    Same filters for monthly_rollups (archived months). Rollups have no days, so a
+    range only includes months that start on or after its start date.
+    """
+    filters = ["user_id = :uid"]
+    params = {"uid": user_id}
+
+    start_date = resolve_start_date(time_range)
+    if start_date:
+        first_full = start_date if start_date.day == 1 else (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
+        filters.append("month >= :start_month")
+        params["start_month"] = first_full.strftime("%Y-%m")
+
+    add_category_filter(filters, params, categories)
+    return " WHERE " + " AND ".join(filters), params
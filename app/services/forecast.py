@@ -0,0 +1,188 @@
+"""
+Month-end spending forecast per category.
+
+projected = spent so far this month
+          + baseline for the remaining days (rolling daily rate x weekday profile)
+          + recurring charges still due this month (from detect_recurring)
+
+Recurring merchants are taken out of the baseline so they are not counted twice.
+Everything per category is computed with bincounts over the user's daily
+series; the only Python loop is over detected subscriptions.
+"""
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import text
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.services.diagnostics import SpendingHistory, load_history, detect_recurring, RECURRENCE_PERIODS
+
+BASELINE_DAYS = 90
+RECENT_DAYS = 28
+# Blend of the 28-day and 90-day daily rates (recent spending weighs more than its share of days).
+RECENT_WEIGHT = 0.5
+# How far weekday effects move the baseline (0 = flat, 1 = raw weekday means); shrunk because the data is sparse.
+WEEKDAY_SHRINK = 0.5
+
+_EPOCH = date(1970, 1, 1)
+
+def _to_day(d: date) -> int:
+    return (d - _EPOCH).days
+
+def _weekday(days):
+    # 1970-01-01 was a Thursday; Monday = 0
+    return (days + 3) % 7
+
+def month_bounds(today: date):
+    start = today.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+def forecast(history: SpendingHistory, budgets: dict, today: date = None) -> dict:
+    """
+    budgets: {category: monthly limit}. Returns the month's projection per category.
+    """
+    today = today or date.today()
+    month_start, month_end = month_bounds(today)
+    t, ms, me = _to_day(today), _to_day(month_start), _to_day(month_end)
+
+    categories = np.asarray([c or "Uncategorized" for c in history.categories], dtype=object).astype(str)
+    names, codes = np.unique(np.concatenate([categories, np.asarray(list(budgets), dtype=str)]), return_inverse=True)
+    codes = codes[:len(history)]
+    n = len(names)
+    days, amounts = history.days, history.amounts
+
+    # 1. Recurring charges: excluded from the baseline, projected by their own schedule
+    recurring = detect_recurring(history)
+    recurring_codes = np.flatnonzero(np.isin(history.merchant_names, [r["merchant"] for r in recurring]))
+    is_recurring = np.isin(history.merchant_codes, recurring_codes)
+
+    # 2. Spent so far this month (everything, recurring included)
+    this_month = (days >= ms) & (days <= t)
+    spent = np.bincount(codes[this_month], weights=amounts[this_month], minlength=n)
+
+    # 3. Baseline daily rate from complete days before today, for users with short histories
+    #    dividing by the days actually covered
+    history_days = max(1, t - int(days.min())) if len(history) else 1
+    base = ~is_recurring & (days < t)
+    rates = []
+    for window in (RECENT_DAYS, BASELINE_DAYS):
+        in_window = base & (days >= t - window)
+        rates.append(np.bincount(codes[in_window], weights=amounts[in_window], minlength=n) / min(window, history_days))
+    rate = RECENT_WEIGHT * rates[0] + (1 - RECENT_WEIGHT) * rates[1]
+
+    # Weekday profile per category over the baseline window, relative to the category's average day
+    window = base & (days >= t - BASELINE_DAYS)
+    by_weekday = np.bincount(
+        codes[window] * 7 + _weekday(days[window]), weights=amounts[window], minlength=n * 7
+    ).reshape(n, 7)
+    weekday_days = np.bincount(_weekday(np.arange(t - BASELINE_DAYS, t)), minlength=7)
+    per_weekday = by_weekday / weekday_days
+    mean_day = per_weekday.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profile = np.where(mean_day > 0, per_weekday / mean_day, 1.0)
+    profile = 1.0 + WEEKDAY_SHRINK * (profile - 1.0)
+
+    remaining_weekdays = np.bincount(_weekday(np.arange(t + 1, me + 1)), minlength=7)
+    baseline_remaining = rate * (profile @ remaining_weekdays)
+
+    # 4. Recurring charges still due this month. One that was due earlier this month but has
+    #    not posted yet is counted as pending; one overdue since before this month is ignored.
+    # Each merchant's category is the one on its latest charge (repeated indices: last write wins)
+    by_date = np.argsort(days, kind="stable")
+    merchant_category = np.zeros(len(history.merchant_names), dtype=np.int64)
+    merchant_category[history.merchant_codes[by_date]] = codes[by_date]
+    name_to_code = {name: i for i, name in enumerate(history.merchant_names)}
+    recurring_remaining = np.zeros(n)
+    upcoming = []
+    for charge in recurring:
+        period = RECURRENCE_PERIODS[charge["period"]][0]
+        category = merchant_category[name_to_code[charge["merchant"]]]
+        due = _to_day(date.fromisoformat(charge["next_expected"]))
+        while due <= me:
+            if due >= ms:
+                recurring_remaining[category] += charge["amount"]
+                upcoming.append({
+                    "merchant": charge["merchant"],
+                    "category": names[category],
+                    "amount": round(charge["amount"], 2),
+                    "date": (_EPOCH + timedelta(days=int(due))).isoformat(),
+                    "pending": bool(due <= t),
+                })
+            due += period
+
+    projected = spent + baseline_remaining + recurring_remaining
+
+    rows = []
+    for i in np.flatnonzero((projected > 0) | np.isin(names, list(budgets))):
+        name = str(names[i])
+        limit = budgets.get(name)
+        if limit is None:
+            status = None
+        elif spent[i] > limit:
+            status = "over"
+        elif projected[i] > limit:
+            status = "at_risk"
+        else:
+            status = "on_track"
+        rows.append({
+            "category": name,
+            "spent": round(float(spent[i]), 2),
+            "baseline_remaining": round(float(baseline_remaining[i]), 2),
+            "recurring_remaining": round(float(recurring_remaining[i]), 2),
+            "projected": round(float(projected[i]), 2),
+            "budget": limit,
+            "projected_vs_budget": round(float(projected[i] - limit), 2) if limit is not None else None,
+            "status": status,
+        })
+    rows.sort(key=lambda r: -r["projected"])
+    upcoming.sort(key=lambda r: r["date"])
+
+    return {
+        "month": month_start.strftime("%Y-%m"),
+        "as_of": today.isoformat(),
+        "days_remaining": me - t,
+        "spent": round(float(spent.sum()), 2),
+        "projected": round(float(projected.sum()), 2),
+        "categories": rows,
+        "upcoming_recurring": upcoming,
+    }
+
+def render_forecast(result: dict) -> str:
+    report = f"--- Spending Forecast for {result['month']} (as of {result['as_of']}, {result['days_remaining']} days left) ---\n"
+    report += f"Spent so far: ${result['spent']:.2f} | Projected month-end: ${result['projected']:.2f}\n"
+    for row in result["categories"]:
+        line = f"- {row['category']}: spent ${row['spent']:.2f}, projected ${row['projected']:.2f}"
+        if row["budget"] is not None:
+            line += f" vs budget ${row['budget']:.2f} -> {row['status'].replace('_', ' ').upper()}"
+        report += line + "\n"
+    if result["upcoming_recurring"]:
+        report += "\n[Recurring charges still due this month]\n"
+        for row in result["upcoming_recurring"]:
+            report += f"- {row['merchant']}: ${row['amount']:.2f} on {row['date']}{' (pending)' if row['pending'] else ''}\n"
+    return report
+
+# user_id -> (data_version, day, forecast). Ingestion and budget changes bump users.data_version.
+_forecasts = TTLCache(maxsize=settings.FORECAST_CACHE_MAX_USERS, ttl=settings.FORECAST_CACHE_TTL_SECONDS)
+
+async def get_forecast(user_id: int, today: date = None) -> dict:
+    """
+    Cached forecast for the user; recomputed when their data version or the day changes.
+    """
+    today = today or date.today()
+    async with ReadSessionLocal() as session:
+        version = (await session.execute(
+            text("SELECT data_version FROM users WHERE id = :uid"), {"uid": user_id}
+        )).scalar() or 0
+        cached = _forecasts.get(user_id)
+        if cached is not None and cached[0] == version and cached[1] == today:
+            return cached[2]
+
+        result = await session.execute(text("SELECT category, amount FROM budgets WHERE user_id = :uid"), {"uid": user_id})
+        budgets = {row.category: row.amount for row in result.fetchall()}
+
+    history = await load_history(user_id)
+    result = forecast(history, budgets, today)
+    _forecasts.set(user_id, (version, today, result))
+    return result
@@ -0,0 +1,165 @@
+"""
+Currency conversion to settings.BASE_CURRENCY.
+
+Rates live in the fx_rates table (one row per currency per day, loaded from a
+file feed) and are served from an in-memory cache: per currency a sorted list
+of day ordinals and a parallel list of rates, so a lookup is one bisect.
+Conversion happens once, at ingestion or backfill, into Transaction.amount_base;
+aggregates only ever sum that column.
+"""
+import csv
+import time
+from bisect import bisect_right
+from datetime import date
+from sqlalchemy import select, update, func
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging import get_logger
+from app.models.sql import FxRate, Transaction
+
+logger = get_logger(__name__)
+
+# SQL expression every aggregate sums. Rows without a rate yet (unknown currency,
+# or written before the backfill ran) fall back to their raw amount.
+BASE_AMOUNT_SQL = "COALESCE(amount_base, amount)"
+
+def base_amount_column():
+    return func.coalesce(Transaction.amount_base, Transaction.amount)
+
+class FxCache:
+    def __init__(self, rows=(), base: str = None):
+        self.base = (base or settings.BASE_CURRENCY).upper()
+        self._days = {}
+        self._rates = {}
+        for day, currency, rate in sorted(rows, key=lambda r: (r[1], r[0])):
+            currency = currency.upper()
+            self._days.setdefault(currency, []).append(_ordinal(day))
+            self._rates.setdefault(currency, []).append(rate)
+        self.loaded_at = time.monotonic()
+
+    @property
+    def currencies(self):
+        return set(self._days) | {self.base}
+
+    def rate(self, currency: str, day):
+        """
+        Latest rate on or before `day` (weekends/holidays use the previous fixing).
+        Days before the first known fixing use the earliest one. None if the currency is unknown.
+        """
+        currency = (currency or self.base).upper()
+        if currency == self.base:
+            return 1.0
+        days = self._days.get(currency)
+        if not days:
+            return None
+        i = bisect_right(days, _ordinal(day)) - 1
+        return self._rates[currency][max(i, 0)]
+
+    def to_base(self, amount, currency: str, day):
+        if amount is None:
+            return None
+        rate = self.rate(currency, day)
+        return None if rate is None else round(amount * rate, 2)
+
+def _ordinal(day) -> int:
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    return day.toordinal()
+
+_cache = None
+
+async def get_fx_cache(refresh: bool = False) -> FxCache:
+    """
+    Process-wide cache, reloaded from fx_rates every FX_CACHE_TTL_SECONDS (feeds are daily).
+    """
+    global _cache
+    if refresh or _cache is None or time.monotonic() - _cache.loaded_at > settings.FX_CACHE_TTL_SECONDS:
+        async with SessionLocal() as session:
+            result = await session.execute(select(FxRate.date, FxRate.currency, FxRate.rate))
+            _cache = FxCache(result.all())
+    return _cache
+
+def read_feed(path: str):
+    """
+    Parses a CSV feed with a header row: date,currency,rate (rate = BASE_CURRENCY per 1 unit).
+    """
+    rows = []
+    with open(path, newline="") as f:
+        for record in csv.DictReader(f):
+            currency = record["currency"].strip().upper()
+            if currency == settings.BASE_CURRENCY or not record["rate"].strip():
+                continue
+            rows.append((date.fromisoformat(record["date"].strip()), currency, float(record["rate"])))
+    return rows
+
+async def load_feed(path: str) -> dict:
+    """
+    Upserts a feed file into fx_rates. Returns counts of inserted and updated rows.
+    """
+    rows = read_feed(path)
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+    first, last = min(r[0] for r in rows), max(r[0] for r in rows)
+
+    async with SessionLocal() as session:
+        result = await session.execute(
+            select(FxRate.id, FxRate.date, FxRate.currency, FxRate.rate)
+            .where(FxRate.date >= first, FxRate.date <= last)
+        )
+        existing = {(r.date, r.currency): (r.id, r.rate) for r in result.all()}
+
+        inserts, updates = [], []
+        for day, currency, rate in rows:
+            current = existing.get((day, currency))
+            if current is None:
+                inserts.append({"date": day, "currency": currency, "rate": rate})
+            elif current[1] != rate:
+                updates.append({"id": current[0], "rate": rate})
+        if inserts:
+            await session.execute(FxRate.__table__.insert(), inserts)
+        if updates:
+            await session.execute(update(FxRate), updates)
+        await session.commit()
+
+    await get_fx_cache(refresh=True)
+    return {"inserted": len(inserts), "updated": len(updates)}
+
+async def backfill_amount_base(batch_size: int = 5000, recompute: bool = False, user_id: int = None) -> dict:
+    """
+    Fills amount_base in id-ordered batches (keyset on id, one bulk UPDATE per batch).
+    By default only rows still NULL are touched; recompute=True redoes every row
+    (e.g. after a feed correction). Rows whose currency has no rate stay NULL.
+    """
+    fx = await get_fx_cache(refresh=True)
+    last_id, converted, missing = 0, 0, {}
+
+    while True:
+        query = select(Transaction.id, Transaction.amount, Transaction.currency, Transaction.date).where(Transaction.id > last_id)
+        if not recompute:
+            query = query.where(Transaction.amount_base.is_(None))
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+
+        async with SessionLocal() as session:
+            rows = (await session.execute(query.order_by(Transaction.id).limit(batch_size))).all()
+            if not rows:
+                break
+
+            values = []
+            for row in rows:
+                amount_base = fx.to_base(row.amount, row.currency, row.date) if row.date else None
+                if amount_base is None:
+                    currency = (row.currency or "?").upper()
+                    missing[currency] = missing.get(currency, 0) + 1
+                    continue
+                values.append({"id": row.id, "amount_base": amount_base})
+            if values:
+                await session.execute(update(Transaction), values)
+                await session.commit()
+
+        converted += len(values)
+        last_id = rows[-1].id
+        logger.info("amount_base backfill progress", extra={"converted": converted, "last_id": last_id})
+
+    return {"converted": converted, "missing_rates": missing}
@@ -0,0 +1,144 @@
+"""
+SQL-backed ingestion job queue with lease/heartbeat semantics.
+
+A job is claimed with a conditional UPDATE, so only one worker wins even across
+processes and machines. A worker that dies stops heartbeating; once its lease
+expires the job becomes claimable again.
+"""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import update, and_, or_, func
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.sql import Document, IngestionJob
+
+def _claimable(now: datetime):
+    return or_(
+        and_(IngestionJob.status == "queued", IngestionJob.run_after <= now),
+        and_(IngestionJob.status == "running", IngestionJob.lease_expires_at < now),
+    )
+
+async def enqueue_ingestion(session, document_id: int, user_id: int, file_path: str) -> IngestionJob:
+    """
+    Adds a job inside the caller's transaction (committed together with the Document).
+    """
+    now = datetime.utcnow()
+    job = IngestionJob(
+        document_id=document_id,
+        user_id=user_id,
+        file_path=file_path,
+        status="queued",
+        attempts=0,
+        max_attempts=settings.INGESTION_MAX_ATTEMPTS,
+        run_after=now,
+        created_at=now,
+        updated_at=now
+    )
+    session.add(job)
+    return job
+
+async def claim_next_job(worker_id: str):
+    """
+    Leases the oldest runnable job. Returns the IngestionJob or None when the queue is empty.
+    """
+    async with SessionLocal() as session:
+        for _ in range(5): # Lost a race to another worker: look again
+            now = datetime.utcnow()
+            result = await session.execute(
+                select(IngestionJob.id)
+                .where(_claimable(now))
+                .order_by(IngestionJob.run_after, IngestionJob.id)
+                .limit(1)
+            )
+            job_id = result.scalar()
+            if job_id is None:
+                return None
+
+            claimed = await session.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, _claimable(now))
+                .values(
+                    status="running",
+                    lease_owner=worker_id,
+                    lease_expires_at=now + timedelta(seconds=settings.INGESTION_LEASE_SECONDS),
+                    attempts=IngestionJob.attempts + 1,
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            if claimed.rowcount == 1:
+                return await session.get(IngestionJob, job_id, populate_existing=True)
+    return None
+
+async def heartbeat(job_id: int, worker_id: str) -> bool:
+    """
+    Extends the lease. False means another worker took the job over.
+    """
+    now = datetime.utcnow()
+    async with SessionLocal() as session:
+        result = await session.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.lease_owner == worker_id, IngestionJob.status == "running")
+            .values(lease_expires_at=now + timedelta(seconds=settings.INGESTION_LEASE_SECONDS), updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+async def complete_job(job_id: int, worker_id: str):
+    async with SessionLocal() as session:
+        await session.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.lease_owner == worker_id)
+            .values(status="completed", lease_expires_at=None, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+def retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with full jitter.
+    """
+    return random.uniform(0, settings.INGESTION_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+
+async def fail_job(job: IngestionJob, worker_id: str, error: str):
+    """
+    Reschedules the job with backoff, or marks it (and its document) failed once out of attempts.
+    """
+    now = datetime.utcnow()
+    exhausted = job.attempts >= job.max_attempts
+    async with SessionLocal() as session:
+        await session.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job.id, IngestionJob.lease_owner == worker_id)
+            .values(
+                status="failed" if exhausted else "queued",
+                run_after=now + timedelta(seconds=0 if exhausted else retry_delay(job.attempts)),
+                lease_owner=None,
+                lease_expires_at=None,
+                last_error=error[:2000],
+                updated_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(
+            update(Document)
+            .where(Document.id == job.document_id)
+            .values(status="failed" if exhausted else "retrying")
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    return exhausted
+
+async def pending_job_count() -> int:
+    """
+    Jobs waiting or in progress (the ingestion backlog).
+    """
+    async with SessionLocal() as session:
+        result = await session.execute(
+            select(func.count(IngestionJob.id)).where(IngestionJob.status.in_(["queued", "running"]))
+        )
+        return result.scalar() or 0
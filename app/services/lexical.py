@@ -0,0 +1,155 @@
+"""
+Per-user lexical (BM25) index over transaction merchant/category/description text.
+
+Exact and near-exact queries ("Starbucks") are answered here without an embedding
+call; fuzzy ones are fused with vector results via reciprocal-rank fusion.
+
+A cached index is valid for the users.data_version it was built at. Any write
+that bumps it (ingestion in any process, archiving, budgets) makes the next
+search rebuild the index, so removed rows never linger in it.
+"""
+import heapq
+import math
+import re
+from collections import defaultdict
+from sqlalchemy import text
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.core.vector import transaction_document
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+def tokenize(value: str):
+    return _TOKEN_RE.findall((value or "").lower())
+
+def normalize_merchant(value: str) -> str:
+    return " ".join(tokenize(value))
+
+class LexicalIndex:
+    def __init__(self):
+        self.texts = {} # doc_id -> document text
+        self.doc_tokens = {} # doc_id -> set of tokens, for AND-matching
+        self.doc_lengths = {}
+        self.postings = defaultdict(dict) # token -> {doc_id: term frequency}
+        self.by_merchant = defaultdict(list) # normalized merchant -> [doc_id]
+        self.by_category = defaultdict(list) # normalized category -> [doc_id]
+        self.total_length = 0
+        self.data_version = None # users.data_version the rows were read at
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, doc_id: str, merchant, category, document: str):
+        if doc_id in self.texts:
+            return
+        tokens = tokenize(f"{merchant or ''} {category or ''} {document}")
+        self.texts[doc_id] = document
+        self.doc_tokens[doc_id] = set(tokens)
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+        for token in tokens:
+            self.postings[token][doc_id] = self.postings[token].get(doc_id, 0) + 1
+        self.by_merchant[normalize_merchant(merchant)].append(doc_id)
+        self.by_category[normalize_merchant(category)].append(doc_id)
+
+    def search(self, query: str, n_results: int = 5):
+        """
+        Returns (ranked doc ids, confident). Confident means every result is an exact
+        merchant/category match or contains all query terms, so no vector lookup is needed.
+        """
+        normalized = normalize_merchant(query)
+        exact = self.by_merchant.get(normalized) or self.by_category.get(normalized)
+        if exact:
+            return list(reversed(exact))[:n_results], True
+
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+        if not terms or not self.texts:
+            return [], False
+
+        n_docs = len(self.texts)
+        length_weight = BM25_K1 * BM25_B * n_docs / self.total_length
+        base = BM25_K1 * (1 - BM25_B)
+        doc_lengths = self.doc_lengths
+        scores = defaultdict(float)
+        for term in terms:
+            postings = self.postings[term]
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            boost = idf * (BM25_K1 + 1)
+            for doc_id, tf in postings.items():
+                scores[doc_id] += boost * tf / (tf + base + length_weight * doc_lengths[doc_id])
+
+        ranked = heapq.nlargest(n_results, scores, key=scores.get)
+        query_terms = set(tokenize(query))
+        confident = bool(ranked) and all(query_terms <= self.doc_tokens[d] for d in ranked)
+        return ranked, confident
+
+_indexes = TTLCache(maxsize=settings.LEXICAL_INDEX_MAX_USERS, ttl=settings.LEXICAL_INDEX_TTL_SECONDS)
+
+async def _build_index(user_id: int) -> LexicalIndex:
+    index = LexicalIndex()
+    async with ReadSessionLocal() as session:
+        # Version first: a write landing mid-read leaves the index stale (rebuilt next time), not wrong
+        index.data_version = (await session.execute(
+            text("SELECT data_version FROM users WHERE id = :uid"), {"uid": user_id}
+        )).scalar() or 0
+        result = await session.execute(
+            text("""
+            SELECT description_embedding_id, merchant, category, date, amount, currency
+            FROM transactions
+            WHERE user_id = :uid AND description_embedding_id IS NOT NULL
+            ORDER BY id
+            """),
+            {"uid": user_id}
+        )
+        rows = result.fetchall()
+    for row in rows:
+        index.add(
+            row.description_embedding_id, row.merchant, row.category,
+            transaction_document(row.merchant, row.category, str(row.date)[:10], row.amount, row.currency)
+        )
+    return index
+
+async def get_user_index(user_id: int) -> LexicalIndex:
+    """
+    Returns the user's index, rebuilt from SQL when the user's data version changed since it was built.
+    """
+    index = _indexes.get(user_id)
+    if index is not None:
+        async with ReadSessionLocal() as session:
+            version = (await session.execute(
+                text("SELECT data_version FROM users WHERE id = :uid"), {"uid": user_id}
+            )).scalar() or 0
+        if version == index.data_version:
+            return index
+
+    index = await _build_index(user_id)
+    _indexes.set(user_id, index)
+    return index
+
+def index_transactions(user_id: int, data_version: int, entries):
+    """
+    Ingestion hook, called after the commit that bumped the user to data_version.
+    entries: iterable of (doc_id, merchant, category, document). Applied only when that commit
+    is the one change the cached index is missing; otherwise the next search rebuilds it.
+    """
+    index = _indexes.get(user_id)
+    if index is None or index.data_version is None or index.data_version != (data_version or 0) - 1:
+        return
+    for doc_id, merchant, category, document in entries:
+        index.add(doc_id, merchant, category, document)
+    index.data_version = data_version
+
+def reciprocal_rank_fusion(rankings, k: int = RRF_K):
+    """
+    Merges ranked id lists; ids ranked high in any list float to the top.
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
@@ -0,0 +1,188 @@
+"""
+Storage lifecycle for uploads and cold transaction history.
+
+Documents: a completed document's PDF is gzipped into ARCHIVE_DIR under its
+SHA-256 (ab/abcdef....pdf.gz, so re-uploads of the same statement share one
+object) and the original in UPLOAD_DIR is deleted once it is older than
+UPLOAD_RETENTION_DAYS. Failed and in-flight documents are left alone so they
+can be re-processed from the original.
+
+Transactions: whole months older than TRANSACTION_HOT_MONTHS move to
+transactions_archive, and their per-category totals are added to
+monthly_rollups in the same commit. Aggregates (dashboard, budgets, agent
+tools) add the rollups to sums over the hot table.
+"""
+import gzip
+import hashlib
+import os
+import shutil
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, update, delete, insert, text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging import get_logger
+from app.models.sql import Document, Transaction, TransactionArchive, MonthlyRollup, Anomaly
+from app.services.data_version import bump_data_version
+
+logger = get_logger(__name__)
+
+ARCHIVED_COLUMNS = [
+    "id", "document_id", "user_id", "date", "merchant", "amount", "currency", "amount_base", "category",
+    "description_embedding_id", "fingerprint"
+]
+
+def archive_path(key: str) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, key[:2], f"{key}.pdf.gz")
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def archive_file(path: str) -> str:
+    """
+    Gzips the file into content-addressed storage and returns its key.
+    Written to a temp name and renamed, so a crash never leaves a truncated object under a valid key.
+    """
+    key = _sha256(path)
+    target = archive_path(key)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f"{target}.{os.getpid()}.tmp"
+        with open(path, "rb") as src, gzip.open(partial, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(partial, target)
+    return key
+
+async def archive_documents(retention_days: int, batch_size: int = 500) -> dict:
+    """
+    Archives completed documents not yet archived, then deletes originals past retention.
+    """
+    counts = {"archived": 0, "purged": 0, "missing": 0}
+    purge_before = datetime.now() - timedelta(days=retention_days)
+    last_id = 0
+    while True:
+        async with SessionLocal() as session:
+            result = await session.execute(
+                select(Document.id, Document.filename, Document.upload_date, Document.archive_key)
+                .where(Document.id > last_id, Document.status == "completed", Document.purged_at.is_(None))
+                .order_by(Document.id)
+                .limit(batch_size)
+            )
+            docs = result.all()
+            if not docs:
+                return counts
+
+            updates = []
+            for doc in docs:
+                original = os.path.join(settings.UPLOAD_DIR, doc.filename)
+                values = {}
+                if doc.archive_key is None:
+                    if not os.path.exists(original):
+                        counts["missing"] += 1
+                        continue
+                    values["archive_key"] = archive_file(original)
+                    counts["archived"] += 1
+                if doc.upload_date is not None and doc.upload_date < purge_before:
+                    try:
+                        os.remove(original)
+                    except FileNotFoundError:
+                        pass
+                    values["purged_at"] = datetime.now()
+                    counts["purged"] += 1
+                if values:
+                    updates.append({"id": doc.id, **values})
+
+            # Keys are recorded after the archive object exists, so a crash can only leave an unreferenced object
+            for values in updates:
+                await session.execute(
+                    update(Document).where(Document.id == values.pop("id")).values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            await session.commit()
+        last_id = docs[-1].id
+        logger.info("documents archived", extra={"last_id": last_id, **counts})
+
+def hot_cutoff(months: int, today: date = None) -> date:
+    """
+    First day of the oldest month kept in the hot table.
+    """
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_key(value) -> str:
+    return str(value)[:7]
+
+def _amount(row) -> float:
+    # Same base-currency fallback as BASE_AMOUNT_SQL
+    return (row.amount_base if row.amount_base is not None else row.amount) or 0.0
+
+async def _add_to_rollups(session, rows):
+    totals = {}
+    for row in rows:
+        entry = totals.setdefault((row.user_id, month_key(row.date), row.category), [0.0, 0])
+        entry[0] += _amount(row)
+        entry[1] += 1
+
+    # Existing rows looked up per (user, month): the unique constraint does not cover NULL categories
+    user_ids = {key[0] for key in totals}
+    months = {key[1] for key in totals}
+    result = await session.execute(
+        select(MonthlyRollup).where(MonthlyRollup.user_id.in_(user_ids), MonthlyRollup.month.in_(months))
+    )
+    existing = {(r.user_id, r.month, r.category): r for r in result.scalars().all()}
+    for key, (total, count) in totals.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            session.add(MonthlyRollup(user_id=key[0], month=key[1], category=key[2], total=total, count=count))
+        else:
+            rollup.total += total
+            rollup.count += count
+
+async def archive_transactions(months: int, batch_size: int = 5000, user_id: int = None) -> dict:
+    """
+    Moves transactions dated before hot_cutoff(months) into transactions_archive, batch by batch.
+    Each batch (copy, rollup update, delete, data_version bump) commits atomically.
+    """
+    cutoff = hot_cutoff(months)
+    counts = {"moved": 0, "users": 0, "cutoff": cutoff.isoformat()}
+    users = set()
+    while True:
+        query = select(*[getattr(Transaction, c) for c in ARCHIVED_COLUMNS]).where(Transaction.date < cutoff)
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+
+        async with SessionLocal() as session:
+            rows = (await session.execute(query.order_by(Transaction.id).limit(batch_size))).all()
+            if not rows:
+                counts["users"] = len(users)
+                return counts
+            ids = [row.id for row in rows]
+
+            await session.execute(insert(TransactionArchive), [dict(row._mapping) for row in rows])
+            await _add_to_rollups(session, rows)
+            # Flags on archived charges go with them (anomalies reference transactions.id)
+            await session.execute(delete(Anomaly).where(Anomaly.transaction_id.in_(ids)))
+            await session.execute(delete(Transaction).where(Transaction.id.in_(ids)))
+            batch_users = {row.user_id for row in rows}
+            for uid in batch_users:
+                await bump_data_version(session, uid)
+            await session.commit()
+
+        users |= batch_users
+        counts["moved"] += len(rows)
+        logger.info("transactions archived", extra={"moved": counts["moved"], "last_id": ids[-1]})
+
+async def compact(engine) -> None:
+    """
+    Returns the space freed by archived rows (SQLite keeps deleted pages; Postgres autovacuum handles it).
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM"))
@@ -0,0 +1,314 @@
+"""
+Central async gateway for every LLM call in the process.
+
+Calls wait in a priority queue until both token buckets (requests/min and
+tokens/min) and a concurrency slot allow them through, so interactive chat is
+always dispatched before extraction running in the same process.
+
+The buckets are per process and nothing is coordinated between processes, so
+each one enforces its own slice of the OpenAI quota (process_quota): API
+processes share LLM_CHAT_SHARE of it and ingestion workers the rest. Chat
+therefore keeps its capacity however busy the workers are.
+
+Each call is bounded by a per-call timeout and by the caller's deadline
+(deadline_context), transient failures are retried with jittered backoff, and
+a slow call can be hedged with a duplicate once it passes the recent latency
+percentile for its priority.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from enum import IntEnum
+
+from app.core.config import settings
+from app.core.context import remaining_time, DeadlineExceeded
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+class Priority(IntEnum):
+    CHAT = 0
+    INGESTION = 1
+
+class TokenBucket:
+    """
+    Refills continuously at rate_per_minute, holding at most one minute's worth.
+    """
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        # A request bigger than the whole bucket waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and upstream 5xx
+TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    # openai.APIConnectionError / APITimeoutError carry no status code
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def estimate_tokens(messages) -> int:
+    """
+    Rough prompt size (~4 characters per token) plus headroom for the completion.
+    """
+    chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return chars // 4 + 500
+
+class LLMGateway:
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        call_timeout: float = 30.0,
+        max_retries: int = 3,
+        retry_base: float = 0.5,
+        hedge_percentile: float = 0
+    ):
+        self.call_timeout = call_timeout
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.hedge_percentile = hedge_percentile
+        self._latencies = {p: deque(maxlen=200) for p in Priority}
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._waiters = [] # heap of (priority, sequence, future, estimated tokens)
+        self._sequence = itertools.count()
+        self._timer = None
+        self._stats = {
+            p.name.lower(): {
+                "queued": 0, "dispatched": 0, "wait_seconds_sum": 0.0, "wait_seconds_max": 0.0,
+                "timeouts": 0, "retries": 0, "hedged": 0, "failed": 0
+            }
+            for p in Priority
+        }
+
+    def set_quota(self, requests_per_minute: float, tokens_per_minute: float):
+        """
+        Resizes both buckets, e.g. when a process turns out to be an ingestion worker.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def stats(self) -> dict:
+        """
+        Queue depth and queue-wait totals per priority class.
+        """
+        return {"in_flight": self.in_flight, **{k: dict(v) for k, v in self._stats.items()}}
+
+    def _dispatch(self):
+        self._timer = None
+        while self._waiters and self.in_flight < self.max_concurrency:
+            priority, _, future, est_tokens = self._waiters[0]
+            if future.done(): # Caller gave up while queued
+                heapq.heappop(self._waiters)
+                self._stats[Priority(priority).name.lower()]["queued"] -= 1
+                continue
+            wait = max(self.requests.time_until(1), self.tokens.time_until(est_tokens))
+            if wait > 0:
+                # Head of line keeps its place; retry once the buckets have refilled
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(est_tokens)
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def _acquire(self, priority: Priority, est_tokens: int, timeout: float = None):
+        stats = self._stats[priority.name.lower()]
+        future = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._sequence), future, est_tokens)
+        heapq.heappush(self._waiters, entry)
+        stats["queued"] += 1
+        enqueued = time.monotonic()
+        if self._timer is None:
+            self._dispatch()
+        elif self._waiters[0] is entry:
+            # Jumped ahead of a head waiting for a refill: re-plan for this call's own cost
+            self._timer.cancel()
+            self._dispatch()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if future.done() and not future.cancelled():
+                # Slot was granted just as the caller was cancelled; hand it back
+                stats["queued"] -= 1
+                self._release()
+            raise
+
+        waited = time.monotonic() - enqueued
+        stats["queued"] -= 1
+        stats["dispatched"] += 1
+        stats["wait_seconds_sum"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+    def _release(self):
+        self.in_flight -= 1
+        if self._timer is None:
+            self._dispatch()
+
+    def hedge_after(self, priority: Priority):
+        """
+        Latency past which a duplicate request is sent, or None while hedging is off or warming up.
+        """
+        samples = self._latencies[priority]
+        if not self.hedge_percentile or len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(samples, self.hedge_percentile)
+
+    async def _attempt(self, make_call, priority: Priority, est_tokens: int, timeout: float):
+        """
+        One admitted call. Queue wait is bounded by the deadline, the call itself by timeout.
+        """
+        await self._acquire(priority, est_tokens, remaining_time())
+        remaining = remaining_time()
+        if remaining is not None:
+            timeout = min(timeout, max(remaining, 0.001))
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(make_call(), timeout)
+        except asyncio.TimeoutError:
+            self._stats[priority.name.lower()]["timeouts"] += 1
+            raise
+        finally:
+            self._release()
+        self._latencies[priority].append(time.monotonic() - started)
+        return result
+
+    async def _hedged_attempt(self, make_call, priority: Priority, est_tokens: int, timeout: float):
+        primary = asyncio.ensure_future(self._attempt(make_call, priority, est_tokens, timeout))
+        pending = {primary}
+        try:
+            threshold = self.hedge_after(priority)
+            if threshold is None or threshold >= timeout:
+                return await primary
+
+            done, pending = await asyncio.wait(pending, timeout=threshold)
+            if not done:
+                # Primary is in the slow tail: race a duplicate against it, first success wins
+                self._stats[priority.name.lower()]["hedged"] += 1
+                pending.add(asyncio.ensure_future(self._attempt(make_call, priority, est_tokens, timeout - threshold)))
+            while pending and not any(t.done() and t.exception() is None for t in done):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            raise primary.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, make_call, priority: Priority = Priority.CHAT, est_tokens: int = 1000):
+        """
+        Runs make_call() (a zero-argument coroutine factory) once admitted, retrying transient
+        failures until max_retries or the caller's deadline runs out.
+        Raises DeadlineExceeded when the deadline, rather than the upstream error, ends the call.
+        """
+        stats = self._stats[priority.name.lower()]
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded("LLM call deadline exceeded")
+            timeout = self.call_timeout if remaining is None else min(self.call_timeout, remaining)
+
+            try:
+                result = await self._hedged_attempt(make_call, priority, est_tokens, timeout)
+                break
+            except Exception as e:
+                if not is_transient(e) or attempt > self.max_retries:
+                    stats["failed"] += 1
+                    raise
+                # Exponential backoff with full jitter, never sleeping past the deadline
+                delay = random.uniform(0, self.retry_base * (2 ** (attempt - 1)))
+                remaining = remaining_time()
+                if remaining is not None and delay >= remaining:
+                    stats["failed"] += 1
+                    raise DeadlineExceeded(f"LLM call deadline exceeded after {attempt} attempt(s)") from e
+                stats["retries"] += 1
+                logger.info("retrying LLM call", extra={
+                    "priority": priority.name.lower(), "attempt": attempt, "error": type(e).__name__, "delay": round(delay, 3)
+                })
+                await asyncio.sleep(delay)
+
+        # Settle the estimate against reported usage when the model returns it
+        usage = getattr(result, "usage_metadata", None)
+        if usage and usage.get("total_tokens"):
+            self.tokens.consume(usage["total_tokens"] - est_tokens)
+        return result
+
+def process_quota(role: str = "api"):
+    """
+    (requests/min, tokens/min) one process may spend. API processes split LLM_CHAT_SHARE of
+    the account quota, workers the rest; with no worker processes the API gets all of it.
+    """
+    chat_share = settings.LLM_CHAT_SHARE if settings.LLM_WORKER_PROCESSES > 0 else 1.0
+    if role == "worker":
+        share = (1.0 - chat_share) / max(settings.LLM_WORKER_PROCESSES, 1)
+    else:
+        share = chat_share / max(settings.LLM_API_PROCESSES, 1)
+    # At least one call a minute, so a misconfigured share stalls instead of dividing by zero
+    return max(settings.LLM_REQUESTS_PER_MINUTE * share, 1.0), max(settings.LLM_TOKENS_PER_MINUTE * share, 1.0)
+
+_requests_per_minute, _tokens_per_minute = process_quota()
+gateway = LLMGateway(
+    requests_per_minute=_requests_per_minute,
+    tokens_per_minute=_tokens_per_minute,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    call_timeout=settings.LLM_CALL_TIMEOUT_SECONDS,
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_base=settings.LLM_RETRY_BASE_SECONDS,
+    hedge_percentile=settings.LLM_HEDGE_PERCENTILE
+)
+
+_chat_model = None
+
+def get_chat_model():
+    """
+    The one ChatOpenAI client for the process; call sites bind tools or structured output on top.
+    """
+    global _chat_model
+    if _chat_model is None:
+        from langchain_openai import ChatOpenAI
+        _chat_model = ChatOpenAI(
+            model=settings.LLM_MODEL,
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            # Timeouts and retries are owned by the gateway so they respect request deadlines
+            timeout=settings.LLM_CALL_TIMEOUT_SECONDS,
+            max_retries=0
+        )
+    return _chat_model
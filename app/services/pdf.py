@@ -1,16 +1,30 @@
+import asyncio
 import os
 from datetime import date, datetime
-from pypdf import PdfReader
-from sqlalchemy.future import select
+from sqlalchemy import update
 
+from app.core.config import settings
+from app.core.context import set_deadline, deadline_context
+from app.core.logging import get_logger
 from app.core.database import SessionLocal
 from app.models.sql import Document, Transaction
 from app.services.extraction import clean_data_with_llm
+from app.services.anomaly import update_stats_and_flag
+from app.services.fx import get_fx_cache
+from app.services.dedup import transaction_fingerprint, find_duplicates
+from app.services.data_version import bump_data_version
+from app.services.profile import update_profile
+from app.services.lexical import index_transactions
+from app.services.embeddings import embed
+
+logger = get_logger(__name__)
 
 def extract_text(file_path: str) -> str:
     """
     Synchronously extracts text from a PDF file.
     """
+    from pypdf import PdfReader
+
     try:
         reader = PdfReader(file_path)
         text = ""
@@ -18,54 +32,79 @@ def extract_text(file_path: str) -> str:
             text += page.extract_text() + "\n"
         return text
     except Exception as e:
-        print(f"Error reading PDF: {e}")
+        logger.warning("could not read PDF", extra={"file": file_path, "error": repr(e)})
         return ""
 
-async def process_document_task(file_path: str, user_id: int):
+async def process_document_task(document_id: int, file_path: str, user_id: int, attempt: int = 1):
     """
     Extraction + Persistence Worker.
+    Idempotent: safe to re-run for the same document after a crash or failed attempt.
+    Raises on failure so the job queue can retry it.
     """
     filename = os.path.basename(file_path)
-    print(f"--- [Worker] Starting processing for: {filename} ---")
+    logger.info("processing document", extra={"document_id": document_id, "file": filename, "attempt": attempt})
 
     async with SessionLocal() as db:
-        # 1. Create Document Record
-        new_doc = Document(
-            filename=filename,
-            upload_date=datetime.now(),
-            status="processing",
-            user_id=user_id
-        )
-        db.add(new_doc)
+        # 1. Load Document Record (created at upload time)
+        new_doc = await db.get(Document, document_id)
+        if new_doc is None:
+            logger.warning("document no longer exists, skipping", extra={"document_id": document_id})
+            return
+        if new_doc.status == "completed":
+            # A previous attempt finished but its job was not acknowledged
+            logger.info("document already processed, skipping", extra={"document_id": document_id})
+            return
+        doc_id = new_doc.id
+
+        # Transactions, stats and anomalies are committed together with 'completed' below,
+        # so a failed attempt leaves no SQL rows behind to clean up.
+        new_doc.status = "processing"
         await db.commit()
-        await db.refresh(new_doc)
 
         try:
             # 2. Extract Text
-            raw_text = extract_text(file_path)
+            # PDF parsing is CPU-bound; off the loop so lease heartbeats and the API keep running
+            raw_text = await asyncio.to_thread(extract_text, file_path)
             
-            # 3. Clean Data (LLM)
-            structured_data = clean_data_with_llm(raw_text)
+            # 3. Clean Data (LLM), bounded so a stalled upstream cannot hold the job lease forever
+            deadline = set_deadline(settings.EXTRACTION_DEADLINE_SECONDS)
+            try:
+                structured_data = await clean_data_with_llm(raw_text)
+            finally:
+                deadline_context.reset(deadline)
             
             # 4. Save Transactions & Prepare Vector Data
-            print(f"--- [Worker] Saving {len(structured_data.transactions)} items to DB & Vector Store ---")
+            logger.debug("saving transactions", extra={"document_id": doc_id, "rows": len(structured_data.transactions)})
             
-            from app.core.vector import get_transaction_collection
-            collection = get_transaction_collection()
+            from app.core.vector import get_transaction_collection, transaction_document, transaction_metadata
+            # First use per process opens the client and the collection, both blocking
+            collection = await asyncio.to_thread(get_transaction_collection, user_id)
+            fx = await get_fx_cache()
 
             ids = []
             documents = []
             metadatas = []
+            new_transactions = []
 
+            # Parse dates and fingerprint every extracted row first, so duplicates are found in one query
+            parsed = []
             for i, tx in enumerate(structured_data.transactions):
-                # Unique ID for vector store
-                vec_id = f"{new_doc.id}_{i}"
-                
                 # Robust date parsing
                 try:
                     tx_date = datetime.strptime(tx.date, "%Y-%m-%d").date()
                 except ValueError:
                     tx_date = date.today()
+                parsed.append((i, tx, tx_date, transaction_fingerprint(user_id, tx.merchant, tx.amount, tx.currency)))
+
+            duplicates = await find_duplicates(db, user_id, doc_id, [(fp, tx_date) for _, _, tx_date, fp in parsed])
+
+            for position, (i, tx, tx_date, fingerprint) in enumerate(parsed):
+                if position in duplicates:
+                    # Already stored from an overlapping statement
+                    continue
+
+                # Unique ID for vector store
+                vec_id = f"{new_doc.id}_{i}"
 
                 # SQL Record
                 db_tx = Transaction(
@@ -75,35 +114,62 @@ async def process_document_task(file_path: str, user_id: int):
                     merchant=tx.merchant,
                     amount=tx.amount,
                     currency=tx.currency,
+                    amount_base=fx.to_base(tx.amount, tx.currency, tx_date), # converted once, summed everywhere
                     category=tx.category,
+                    fingerprint=fingerprint,
                     description_embedding_id=vec_id # Linked!
                 )
                 db.add(db_tx)
+                new_transactions.append(db_tx)
                 
                 # Vector Data
                 ids.append(vec_id)
                 # The "Text" we search against: "Starbucks (Food) on 2024-01-01"
-                documents.append(f"{tx.merchant} ({tx.category}) on {tx.date}. Amount: {tx.amount} {tx.currency}")
+                documents.append(transaction_document(tx.merchant, tx.category, tx.date, tx.amount, tx.currency))
                 
                 # Metadata for filtering
-                metadatas.append({
-                    "merchant": tx.merchant,
-                    "category": tx.category or "Unknown",
-                    "amount": tx.amount,
-                    "date": tx.date, # String format YYYY-MM-DD
-                    "doc_id": new_doc.id,
-                    "user_id": user_id # Required for RLS
-                })
+                metadatas.append(transaction_metadata(tx.merchant, tx.category, tx.amount, tx.date, new_doc.id, user_id))
+
+            new_doc.duplicates_skipped = len(duplicates)
+            if duplicates:
+                logger.info("skipped duplicate transactions", extra={"document_id": doc_id, "duplicates": len(duplicates)})
+
+            # Score against running merchant/category stats (needs the new row ids)
+            await db.flush()
+            flagged = await update_stats_and_flag(db, user_id, new_transactions)
+            if flagged:
+                logger.info("flagged unusual charges", extra={"document_id": doc_id, "anomalies": flagged})
 
             # Batch Insert to Vector DB
+            if attempt > 1:
+                # An earlier attempt may have written vectors before failing
+                await asyncio.to_thread(collection.delete, where={"doc_id": doc_id})
             if ids:
-                collection.add(ids=ids, documents=documents, metadatas=metadatas)
+                embeddings = await embed(documents)
+                # Chroma's client is blocking
+                await asyncio.to_thread(
+                    collection.upsert, ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+                )
 
             new_doc.status = "completed"
+            data_version = await bump_data_version(db, user_id)
             await db.commit()
-            print(f"--- [Worker] Detailed Success: {filename} processed and indexed. ---")
+
+            # Keep this process's lexical search index current (only after the rows are committed)
+            index_transactions(user_id, data_version, [
+                (vec_id, meta["merchant"], meta["category"], document)
+                for vec_id, meta, document in zip(ids, metadatas, documents)
+            ])
+            await update_profile(user_id, [
+                (t.date, t.merchant, t.category, t.amount if t.amount_base is None else t.amount_base)
+                for t in new_transactions
+            ])
+            logger.info("document processed", extra={"document_id": doc_id, "rows": len(new_transactions), "duplicates": len(duplicates)})
             
         except Exception as e:
-            print(f"!!! [Worker] Error processing {filename}: {e}")
-            new_doc.status = "failed"
+            logger.error("document processing failed", extra={"document_id": doc_id, "attempt": attempt, "error": repr(e)})
+            # Drop flushed rows and stats updates so a failed document leaves nothing behind
+            await db.rollback()
+            await db.execute(update(Document).where(Document.id == doc_id).values(status="failed"))
             await db.commit()
+            raise
@@ -0,0 +1,272 @@
+"""
+Per-user financial profile snapshot for the agent's system prompt.
+
+Holds what most questions need first: monthly totals by category for the
+last PROFILE_MONTHS complete months plus the current one, this month's budget
+utilization and active recurring charges. With it in the prompt, simple
+questions are answered in one model call instead of a tool round trip.
+
+The snapshot is stored in user_profiles with the users.data_version it was
+built from. After an ingestion or budget change it is updated in place from
+the new rows and budgets (update_profile); it is rebuilt from the full
+history on read if it is stale (other writers, new month).
+"""
+import json
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import select, text, update, or_
+
+from app.core.config import settings
+from app.core.database import SessionLocal, ReadSessionLocal
+from app.core.logging import get_logger
+from app.models.sql import UserProfile
+from app.services.diagnostics import SpendingHistory, load_history, detect_recurring, RECURRENCE_PERIODS
+
+logger = get_logger(__name__)
+
+RECURRING_LIMIT = 10
+
+def _month_label(index: int) -> str:
+    return f"{index // 12 + 1970}-{index % 12 + 1:02d}"
+
+def _budget_rows(budgets: dict, this_month: dict) -> list:
+    rows = []
+    for category, limit in sorted(budgets.items()):
+        spent = this_month.get(category, 0.0)
+        rows.append({
+            "category": category,
+            "limit": limit,
+            "spent": round(spent, 2),
+            "percent_used": round(spent / limit * 100, 1) if limit else None,
+        })
+    return rows
+
+def build_profile(history: SpendingHistory, budgets: dict, today: date = None, months: int = None) -> dict:
+    """
+    budgets: {category: monthly limit}. Amounts are in the base currency.
+    """
+    today = today or date.today()
+    months = settings.PROFILE_MONTHS if months is None else months
+    current = (today.year - 1970) * 12 + today.month - 1
+    first = current - months
+    slots = months + 1
+
+    # Months since 1970-01 for every row, then one bincount over (category, month) cells
+    month_index = history.days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    categories = np.asarray([c or "Uncategorized" for c in history.categories], dtype=object).astype(str)
+    names, codes = np.unique(categories, return_inverse=True)
+    in_window = (month_index >= first) & (month_index <= current)
+    grid = np.bincount(
+        codes[in_window] * slots + (month_index[in_window] - first),
+        weights=history.amounts[in_window],
+        minlength=len(names) * slots
+    ).reshape(len(names), slots)
+
+    window_totals = grid.sum(axis=1)
+    category_rows = [
+        {"category": str(names[i]), "totals": [round(float(v), 2) for v in grid[i]]}
+        for i in np.argsort(-window_totals, kind="stable") if window_totals[i] > 0
+    ]
+
+    this_month = dict(zip(names.tolist(), grid[:, -1].tolist())) if len(names) else {}
+    budget_rows = _budget_rows(budgets, this_month)
+
+    # Active subscriptions only: the next charge is at most one period overdue
+    recurring = [
+        {"merchant": str(r["merchant"]), "period": r["period"], "amount": round(r["amount"], 2), "next_expected": r["next_expected"]}
+        for r in detect_recurring(history)
+        if date.fromisoformat(r["next_expected"]) + timedelta(days=RECURRENCE_PERIODS[r["period"]][0]) >= today
+    ][:RECURRING_LIMIT]
+
+    return {
+        "as_of": today.isoformat(),
+        "currency": settings.BASE_CURRENCY,
+        "months": [_month_label(first + i) for i in range(slots)],
+        "month_totals": [round(float(v), 2) for v in grid.sum(axis=0)],
+        "categories": category_rows,
+        "budgets": budget_rows,
+        "recurring": recurring,
+    }
+
+def apply_changes(profile: dict, rows, budgets: dict, today: date = None) -> dict:
+    """
+    The snapshot after one write, without the full history: rows are the new transactions as
+    (date, merchant, category, base amount), budgets the user's current limits.
+    New rows inside the window are added to the totals, and a charge from a known subscription
+    moves its next expected date. Subscriptions detected for the first time appear at the next
+    full rebuild (new month, or a write this process did not apply).
+    """
+    today = today or date.today()
+    slots = {month: i for i, month in enumerate(profile["months"])}
+    categories = {c["category"]: c for c in profile["categories"]}
+    recurring = {r["merchant"]: r for r in profile["recurring"]}
+
+    for day, merchant, category, amount in rows:
+        day = date.fromisoformat(str(day)[:10])
+        amount = amount or 0.0
+        slot = slots.get(day.isoformat()[:7])
+        if slot is not None:
+            row = categories.setdefault(category or "Uncategorized", {
+                "category": category or "Uncategorized", "totals": [0.0] * len(slots)
+            })
+            row["totals"][slot] = round(row["totals"][slot] + amount, 2)
+            profile["month_totals"][slot] = round(profile["month_totals"][slot] + amount, 2)
+
+        known = recurring.get(merchant or "Unknown")
+        if known:
+            period = RECURRENCE_PERIODS[known["period"]][0]
+            # Later than the last charge seen: this is the next one
+            if day > date.fromisoformat(known["next_expected"]) - timedelta(days=period):
+                known["amount"] = round(amount, 2)
+                known["next_expected"] = (day + timedelta(days=period)).isoformat()
+
+    profile["categories"] = sorted(
+        (c for c in categories.values() if sum(c["totals"]) > 0), key=lambda c: -sum(c["totals"])
+    )
+    this_month = {c["category"]: c["totals"][-1] for c in profile["categories"]}
+    profile["budgets"] = _budget_rows(budgets, this_month)
+    profile["as_of"] = today.isoformat()
+    return profile
+
+def render_profile(profile: dict, max_tokens: int = None) -> str:
+    """
+    Compact text for the system prompt, cut to about max_tokens (~4 characters per token).
+    Sections are filled in priority order: totals, budgets, subscriptions, then categories by size.
+    """
+    max_chars = (settings.PROFILE_PROMPT_MAX_TOKENS if max_tokens is None else max_tokens) * 4
+    months = profile["months"]
+    header = [
+        f"As of {profile['as_of']}, amounts in {profile['currency']}; {months[-1]} is month-to-date.",
+        "Monthly totals: " + ", ".join(f"{m} {t:.2f}" for m, t in zip(months, profile["month_totals"])),
+    ]
+    sections = [
+        ("Budgets this month:", [
+            f"- {b['category']}: {b['spent']:.2f}"
+            + (f" of {b['limit']:.2f}" if b["limit"] is not None else " (no limit set)")
+            + (f" ({b['percent_used']:.0f}%)" if b["percent_used"] is not None else "")
+            for b in profile["budgets"]
+        ]),
+        ("Recurring charges:", [
+            f"- {r['merchant']}: {r['amount']:.2f} {r['period']}, next ~{r['next_expected']}"
+            for r in profile["recurring"]
+        ]),
+        ("By category (" + ", ".join(months) + "):", [
+            f"- {c['category']}: " + " / ".join(f"{v:.2f}" for v in c["totals"])
+            for c in profile["categories"]
+        ]),
+    ]
+
+    lines = list(header)
+    used = sum(len(line) + 1 for line in lines)
+    for title, rows in sections:
+        if not rows or used + len(title) + len(rows[0]) + 2 > max_chars:
+            continue
+        lines.append(title)
+        used += len(title) + 1
+        for row in rows:
+            if used + len(row) + 1 > max_chars:
+                lines.append("- ... (truncated; use the tools for the rest)")
+                break
+            lines.append(row)
+            used += len(row) + 1
+    return "\n".join(lines)
+
+async def _read_version_and_budgets(user_id: int):
+    async with ReadSessionLocal() as session:
+        version = (await session.execute(
+            text("SELECT data_version FROM users WHERE id = :uid"), {"uid": user_id}
+        )).scalar() or 0
+        result = await session.execute(text("SELECT category, amount FROM budgets WHERE user_id = :uid"), {"uid": user_id})
+        return version, {row.category: row.amount for row in result.fetchall()}
+
+async def _store(user_id: int, profile: dict, version: int, expected: int = None) -> bool:
+    """
+    Writes the snapshot built from data_version == version. With expected, only over the
+    snapshot built from that version; otherwise over any older one, so a slow rebuild
+    never replaces a newer snapshot. Returns whether it was written.
+    """
+    async with SessionLocal() as session:
+        values = {"data_version": version, "payload": json.dumps(profile), "updated_at": datetime.utcnow()}
+        condition = (
+            UserProfile.data_version == expected if expected is not None
+            else or_(UserProfile.data_version.is_(None), UserProfile.data_version <= version)
+        )
+        result = await session.execute(
+            update(UserProfile).where(UserProfile.user_id == user_id, condition).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            if expected is not None or (await session.execute(
+                select(UserProfile.id).where(UserProfile.user_id == user_id)
+            )).first():
+                return False
+            session.add(UserProfile(user_id=user_id, **values))
+        await session.commit()
+        return True
+
+async def refresh_profile(user_id: int) -> dict:
+    """
+    Rebuilds and stores the user's snapshot. Best effort: on failure the error is logged,
+    the old snapshot stays and the next read retries. Returns the profile or None.
+    """
+    try:
+        # Version read before the data, so a change landing mid-build leaves the snapshot stale, not wrong
+        version, budgets = await _read_version_and_budgets(user_id)
+        profile = build_profile(await load_history(user_id), budgets)
+        await _store(user_id, profile, version)
+        return profile
+    except Exception as e:
+        logger.warning("profile rebuild failed", extra={"user_id": user_id, "error": repr(e)})
+        return None
+
+async def update_profile(user_id: int, new_rows=()) -> dict:
+    """
+    Brings the snapshot up to date after a write that bumped data_version once: new_rows are
+    the transactions it added as (date, merchant, category, base amount), and budgets are re-read.
+    Falls back to a full rebuild when the snapshot is missing, from an earlier month or more than
+    that one version behind (other writers). Best effort, like refresh_profile.
+    """
+    try:
+        version, budgets = await _read_version_and_budgets(user_id)
+        async with ReadSessionLocal() as session:
+            row = (await session.execute(
+                text("SELECT data_version, payload FROM user_profiles WHERE user_id = :uid"), {"uid": user_id}
+            )).first()
+        profile = json.loads(row.payload) if row and row.payload else None
+        if profile is None or (row.data_version or 0) != version - 1 or profile["as_of"][:7] != date.today().isoformat()[:7]:
+            return await refresh_profile(user_id)
+
+        profile = apply_changes(profile, new_rows, budgets)
+        # Conditional on the version it was applied to: a concurrent update wins and this one is dropped
+        if not await _store(user_id, profile, version, expected=row.data_version):
+            return None
+        return profile
+    except Exception as e:
+        logger.warning("profile update failed", extra={"user_id": user_id, "error": repr(e)})
+        return None
+
+async def get_profile_text(user_id: int) -> str:
+    """
+    Rendered snapshot for the system prompt; rebuilt first if the user's data changed
+    or the month rolled over since it was built. Empty when there is nothing to show.
+    """
+    async with ReadSessionLocal() as session:
+        row = (await session.execute(text("""
+        SELECT u.data_version AS current_version, p.data_version AS built_version, p.payload
+        FROM users u LEFT JOIN user_profiles p ON p.user_id = u.id
+        WHERE u.id = :uid
+        """), {"uid": user_id})).first()
+    if row is None:
+        return ""
+
+    profile = json.loads(row.payload) if row.payload else None
+    stale = (
+        profile is None
+        or (row.built_version or 0) != (row.current_version or 0)
+        or profile["as_of"][:7] != date.today().isoformat()[:7]
+    )
+    if stale:
+        profile = await refresh_profile(user_id) or profile
+    if profile is None or not (profile["categories"] or profile["budgets"]):
+        return ""
+    return render_profile(profile)
@@ -0,0 +1,187 @@
+"""
+Validation and user scoping for the SQL the agent writes.
+
+The agent's query runs behind CTEs named after the user-data tables, each holding
+only the current user's rows, so unqualified names never reach the real tables.
+check_query tokenizes the query (string literals, quoted identifiers, comments)
+and rejects anything that could step around those CTEs: a quoted or
+schema-qualified scoped table (main."transactions", "public".transactions,
+SQLite's main.'transactions'), hidden tables, catalogs, functions that run
+SQL from a string, and writes.
+
+Stdlib only, so it can be tested without a database driver.
+"""
+import re
+
+# User data the agent may query. Each is shadowed by a CTE holding only the current user's rows.
+SCOPED_TABLES = ("transactions", "monthly_rollups", "anomalies", "budgets")
+# Other tables with per-user rows are not exposed to the agent at all.
+HIDDEN_TABLES = frozenset({"users", "documents", "user_profiles", "spending_stats", "ingestion_jobs", "transactions_archive"})
+# Statements and clauses that write, change the session or leave the read-only SELECT.
+WRITE_KEYWORDS = frozenset({
+    "insert", "update", "delete", "drop", "alter", "create", "truncate", "grant", "revoke", "copy",
+    "attach", "detach", "pragma", "vacuum", "reindex", "merge", "call", "do", "execute", "prepare",
+    "lock", "set", "reset", "listen", "notify", "load", "into",
+})
+# Catalogs, and functions that read files or run SQL passed as a string (query_to_xml, dblink, ts_stat).
+FORBIDDEN_NAME = re.compile(
+    r"^(pg_|lo_|dblink|sqlite_|pragma_|information_schema$)|_to_xml"
+    r"|^(ts_stat|ts_rewrite|load_extension|readfile|writefile|edit|set_config|current_setting|fts3_tokenizer)$"
+)
+
+READ_ONLY_ERROR = "Error: Read-only access."
+SCOPE_ERROR = "Error: Security Violation. Only the transactions, monthly_rollups, anomalies and budgets tables can be queried."
+
+_WORD = re.compile(r"\w+")
+_CLOSING = {'"': '"', "`": "`", "[": "]"}
+
+class QueryRejected(ValueError):
+    pass
+
+def tokenize(query: str) -> list:
+    """
+    Splits a query into (kind, value, start) tokens: kind is "word", "ident" (quoted identifier,
+    value without quotes), "string" or "op". Comments and whitespace are dropped.
+    Raises QueryRejected on syntax the scan cannot follow safely.
+    """
+    tokens = []
+    i, n = 0, len(query)
+    while i < n:
+        ch = query[i]
+        if ch.isspace():
+            i += 1
+        elif query.startswith("--", i):
+            end = query.find("\n", i)
+            i = n if end == -1 else end + 1
+        elif query.startswith("/*", i):
+            end = query.find("*/", i + 2)
+            # Postgres nests block comments; a scan that does not would lose track
+            if end == -1 or "/*" in query[i + 2:end]:
+                raise QueryRejected(SCOPE_ERROR)
+            i = end + 2
+        elif ch == "'":
+            end = i + 1
+            while True:
+                end = query.find("'", end)
+                if end == -1:
+                    raise QueryRejected(SCOPE_ERROR)
+                if query.startswith("''", end):
+                    end += 2
+                    continue
+                break
+            tokens.append(("string", query[i + 1:end], i))
+            i = end + 1
+        elif ch in _CLOSING:
+            close = _CLOSING[ch]
+            end = i + 1
+            while True:
+                end = query.find(close, end)
+                if end == -1:
+                    raise QueryRejected(SCOPE_ERROR)
+                if close != "]" and query.startswith(close * 2, end):
+                    end += 2
+                    continue
+                break
+            tokens.append(("ident", query[i + 1:end].replace(close * 2, close), i))
+            i = end + 1
+        elif ch.isalpha() or ch == "_":
+            word = _WORD.match(query, i).group(0)
+            # U&"..." escapes and E'...' backslash strings would desynchronize the scan
+            if word.lower() in ("u", "e") and i + len(word) < n and query[i + len(word)] in "&'":
+                raise QueryRejected(SCOPE_ERROR)
+            tokens.append(("word", word, i))
+            i += len(word)
+        elif ch in "\\$":
+            # Backslash escapes and dollar quoting ($$...$$) are not followed either
+            raise QueryRejected(SCOPE_ERROR)
+        else:
+            tokens.append(("op", ch, i))
+            i += 1
+    return tokens
+
+# Keywords after which SQLite reads a single-quoted literal as a table name
+TABLE_POSITION = frozenset({"from", "join"})
+
+def _check_string(tokens: list, index: int, value: str):
+    """
+    SQLite accepts a string literal as a table or schema name (FROM 'users', main.'transactions'),
+    so literals naming a table, in a table position or next to a "." are treated as names.
+    """
+    name = value.strip().lower()
+    if name in HIDDEN_TABLES or name in SCOPED_TABLES:
+        raise QueryRejected(SCOPE_ERROR)
+    before = tokens[index - 1][:2] if index > 0 else None
+    after = tokens[index + 1][:2] if index + 1 < len(tokens) else None
+    if before == ("op", ".") or after == ("op", "."):
+        raise QueryRejected(SCOPE_ERROR)
+    in_table_position = before is not None and before[0] == "word" and before[1].lower() in TABLE_POSITION
+    if in_table_position or (before == ("op", ",") and _in_from_list(tokens, index)):
+        raise QueryRejected(SCOPE_ERROR)
+
+def _in_from_list(tokens: list, index: int) -> bool:
+    # Walks back over the comma-separated list to the keyword that opened it, at the same depth
+    depth = 0
+    for kind, value, _ in reversed(tokens[:index]):
+        if kind == "op" and value == ")":
+            depth += 1
+        elif kind == "op" and value == "(":
+            if depth == 0:
+                return False
+            depth -= 1
+        elif depth == 0 and kind == "word":
+            lowered = value.lower()
+            if lowered in TABLE_POSITION:
+                return True
+            if lowered in ("select", "where", "on", "group", "order", "having", "by", "values", "in"):
+                return False
+    return False
+
+def _validate(query: str):
+    tokens = tokenize(query.strip().rstrip(";"))
+    if not tokens or tokens[0][0] != "word" or tokens[0][1].lower() not in ("select", "with"):
+        raise QueryRejected(READ_ONLY_ERROR)
+
+    for index, (kind, value, _) in enumerate(tokens):
+        if kind == "op" and value == ";":
+            raise QueryRejected(READ_ONLY_ERROR)
+        if kind == "string":
+            _check_string(tokens, index, value)
+            continue
+        if kind not in ("word", "ident"):
+            continue
+        name = value.lower()
+        if kind == "word" and name in WRITE_KEYWORDS:
+            raise QueryRejected(READ_ONLY_ERROR)
+        if name in HIDDEN_TABLES or FORBIDDEN_NAME.search(name):
+            raise QueryRejected(SCOPE_ERROR)
+        if name in SCOPED_TABLES:
+            # Only the bare name resolves to the CTE; quoting or a schema prefix can reach the table
+            qualified = index > 0 and tokens[index - 1][:2] == ("op", ".")
+            if kind == "ident" or qualified:
+                raise QueryRejected(SCOPE_ERROR)
+
+def check_query(query: str):
+    """
+    Returns an error message for queries the agent may not run, else None.
+    """
+    try:
+        _validate(query)
+    except QueryRejected as e:
+        return str(e)
+    return None
+
+def scope_query(query: str, schema: str) -> str:
+    """
+    Prepends CTEs that restrict every scoped table to :scope_uid, merging with the query's own WITH.
+    schema qualifies the real tables inside the CTEs ("main" on SQLite), so neither backend reads
+    a CTE as a reference to itself, even under WITH RECURSIVE. Run check_query first.
+    """
+    body = query.strip().rstrip(";").strip()
+    ctes = ",\n".join(f"{name} AS (SELECT * FROM {schema}.{name} WHERE user_id = :scope_uid)" for name in SCOPED_TABLES)
+    tokens = tokenize(body)
+    if tokens and tokens[0][1].lower() == "with":
+        recursive = len(tokens) > 1 and tokens[1][1].lower() == "recursive"
+        first = 2 if recursive else 1
+        rest = tokens[first][2] if first < len(tokens) else len(body)
+        return f"WITH {'RECURSIVE ' if recursive else ''}{ctes},\n{body[rest:]}"
+    return f"WITH {ctes}\n{body}"
@@ -1,39 +1,132 @@
+import asyncio
+import time
 from sqlalchemy import text
-from app.core.database import SessionLocal
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.core.dialect import table_schema
 from app.core.vector import get_transaction_collection
 
-from app.core.context import user_id_context
+from app.core.logging import get_logger
+from app.services.diagnostics import load_history, analyze, render_report
+from app.services.embeddings import embed
+from app.services.forecast import get_forecast, render_forecast
+from app.services.fx import BASE_AMOUNT_SQL
+from app.services.lexical import get_user_index, reciprocal_rank_fusion
+from app.services.llm_gateway import Priority
+from app.services.sql_guard import check_query, scope_query
+
+logger = get_logger(__name__)
+
+# Driver messages for a statement stopped by the limits below
+TIMEOUT_MESSAGES = ("interrupted", "statement timeout")
+
+async def _execute_scoped(session, query: str, user_id: int):
+    """
+    Runs an agent query behind the user scope, stopped inside the database after AGENT_SQL_TIMEOUT_SECONDS.
+    Cancelling the awaiting task would leave the statement running and its pooled connection busy,
+    so Postgres gets a statement_timeout and SQLite a progress handler that interrupts the VM.
+    Raises asyncio.TimeoutError when the limit is hit.
+    """
+    timeout = settings.AGENT_SQL_TIMEOUT_SECONDS
+    statement = text(scope_query(query, table_schema()))
+    connection = await session.connection()
+    try:
+        if connection.dialect.name == "postgresql":
+            # Local to the session's transaction, so the pooled connection keeps its default
+            await session.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+            return await session.execute(statement, {"scope_uid": user_id})
+
+        driver = (await connection.get_raw_connection()).driver_connection # aiosqlite.Connection
+        deadline = time.monotonic() + timeout
+        # Called every 1000 VM instructions; a truthy return aborts the statement
+        await driver.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        try:
+            return await session.execute(statement, {"scope_uid": user_id})
+        finally:
+            await driver.set_progress_handler(None, 1000)
+    except Exception as e:
+        if any(message in str(e).lower() for message in TIMEOUT_MESSAGES):
+            raise asyncio.TimeoutError() from e
+        raise
 
 async def run_sql_query(query: str, user_id: int):
     """
     This tool executes a read-only SQL query against the database.
     Useful for aggregation capability (SUM, COUNT, AVG, etc.)
+    The query only ever sees the user's own rows, so it needs no user_id filter.
     """
-    # Basic security check
-    if "DROP" in query.upper() or "DELETE" in query.upper() or "INSERT" in query.upper():
-        return "Error: Read-only access."
-
     if not user_id:
         return "Error: No user_id provided."
 
-    print("Using run_sql_query tool", flush=True)
-    print("User ID:", user_id, flush=True)
-    
-    # Simple Heuristic: If querying 'transactions', MUST filter by user_id
-    if "transactions" in query.lower() and "user_id" not in query.lower():
-         return "Error: Security Violation. You must filter by 'user_id' in your SQL query."
+    error = check_query(query)
+    if error:
+        return error
+
+    logger.debug("tool call", extra={"tool": "run_sql_query", "user_id": user_id})
 
     try:
-        async with SessionLocal() as session:
-            result = await session.execute(text(query))
+        async with ReadSessionLocal() as session:
+            result = await _execute_scoped(session, query, user_id)
             rows = result.fetchall()
             # Convert to list of dicts for LLM readability
             if not rows:
                 return "No results found."
             return [dict(row._mapping) for row in rows]
+    except asyncio.TimeoutError:
+        return f"Error: query exceeded {settings.AGENT_SQL_TIMEOUT_SECONDS}s"
     except Exception as e:
         return f"Database Error: {e}"
 
+def _cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "NULL" if value is None else str(value)
+
+async def _run_labeled(label: str, query: str, user_id: int) -> str:
+    """
+    One batch entry, on its own pooled read connection, bounded in time and rows.
+    """
+    error = check_query(query)
+    if error:
+        return f"## {label}\n{error}"
+    limit = settings.AGENT_SQL_MAX_ROWS
+    try:
+        async with ReadSessionLocal() as session:
+            result = await _execute_scoped(session, query, user_id)
+            columns = list(result.keys())
+            rows = result.fetchmany(limit + 1)
+    except asyncio.TimeoutError:
+        return f"## {label}\nError: query exceeded {settings.AGENT_SQL_TIMEOUT_SECONDS}s"
+    except Exception as e:
+        return f"## {label}\nDatabase Error: {e}"
+
+    # Compact table: one header line, one line per row
+    lines = [f"## {label} ({min(len(rows), limit)} rows{', truncated' if len(rows) > limit else ''})"]
+    if rows:
+        lines.append(" | ".join(columns))
+        lines.extend(" | ".join(_cell(v) for v in row) for row in rows[:limit])
+    return "\n".join(lines)
+
+async def run_sql_batch(queries: list, user_id: int):
+    """
+    Runs several labeled read-only queries concurrently and returns one combined result.
+    queries: [{"label": ..., "query": ...}], at most AGENT_SQL_BATCH_MAX_QUERIES.
+    """
+    if not user_id:
+        return "Error: No user_id provided."
+    if not queries:
+        return "Error: No queries given."
+
+    logger.debug("tool call", extra={"tool": "run_sql_batch", "user_id": user_id, "queries": len(queries)})
+
+    accepted = queries[:settings.AGENT_SQL_BATCH_MAX_QUERIES]
+    sections = await asyncio.gather(*[
+        _run_labeled(q["label"] or f"query_{i + 1}", q["query"], user_id) for i, q in enumerate(accepted)
+    ])
+    if len(queries) > len(accepted):
+        sections.append(f"Skipped {len(queries) - len(accepted)} queries: at most {len(accepted)} per batch.")
+    return "\n\n".join(sections)
+
 async def check_budget_status(user_id: int):
     """
     Checks the user's budget status.
@@ -43,20 +136,23 @@ async def check_budget_status(user_id: int):
     try:
         if not user_id: return "Error: No user_id."
 
-        print("Using check_budget_status tool", flush=True)
-        print("User ID:", user_id, flush=True)
+        logger.debug("tool call", extra={"tool": "check_budget_status", "user_id": user_id})
         query = """
         SELECT 
             b.category, 
             b.amount as limit_amount, 
-            COALESCE(SUM(t.amount), 0) as spent
+            COALESCE((
+                SELECT SUM(COALESCE(t.amount_base, t.amount)) FROM transactions t
+                WHERE t.user_id = b.user_id AND t.category = b.category
+            ), 0) + COALESCE((
+                SELECT SUM(r.total) FROM monthly_rollups r
+                WHERE r.user_id = b.user_id AND r.category = b.category
+            ), 0) as spent
         FROM budgets b
-        LEFT JOIN transactions t ON b.category = t.category AND t.user_id = b.user_id
         WHERE b.user_id = :uid
-        GROUP BY b.id
         """
         
-        async with SessionLocal() as session:
+        async with ReadSessionLocal() as session:
             result = await session.execute(text(query), {"uid": user_id})
             rows = result.fetchall()
             
@@ -78,81 +174,50 @@ async def diagnose_spending(user_id: int):
     """
     Analyzes financial data to find patterns:
     1. High Frequency Merchants (The 'Latte Factor').
-    2. Potential Subscriptions (Same amount > 2 times).
+    2. Subscriptions (charges repeating weekly/monthly/annually at a stable amount).
     3. Largest Single Expenses.
     """
-    report = "--- Financial Diagnostics Report ---\n"
-    print("Using diagnose_spending tool", flush=True)
-    print("User ID:", user_id, flush=True)
-    
-    async with SessionLocal() as session:
-        # 1. High Frequency
-        freq_query = """
-        SELECT merchant, COUNT(*) as cnt, SUM(amount) as total
-        FROM transactions 
-        WHERE user_id = :uid
-        GROUP BY merchant 
-        HAVING cnt > 4
-        ORDER BY cnt DESC
-        LIMIT 5
-        """
-        result = await session.execute(text(freq_query), {"uid": user_id})
-        rows = result.fetchall()
-        if rows:
-            report += "\n[High Frequency Habits]\n"
-            for row in rows:
-                report += f"- {row.merchant}: {row.cnt} times (Total: ${row.total})\n"
-
-        # 2. Potential Subscriptions
-        sub_query = """
-        SELECT merchant, amount, COUNT(*) as cnt
-        FROM transactions
-        WHERE user_id = :uid AND amount > 5
-        GROUP BY merchant, amount
-        HAVING cnt > 1
-        ORDER BY cnt DESC
-        LIMIT 5
-        """
-        result = await session.execute(text(sub_query), {"uid": user_id})
-        rows = result.fetchall()
-        if rows:
-            report += "\n[Potential Subscriptions / Recurring]\n"
-            for row in rows:
-                report += f"- {row.merchant}: ${row.amount} (seen {row.cnt} times)\n"
-        
-        # 3. Top Spenders
-        top_query = """
-        SELECT merchant, amount, date, category
-        FROM transactions
-        WHERE user_id = :uid
-        ORDER BY amount DESC
-        LIMIT 3
-        """
-        result = await session.execute(text(top_query), {"uid": user_id})
-        rows = result.fetchall()
-        if rows:
-            report += "\n[Largest Single Expenses]\n"
-            for row in rows:
-                report += f"- {row.merchant}: ${row.amount} ({row.category}) on {row.date}\n"
+    logger.debug("tool call", extra={"tool": "diagnose_spending", "user_id": user_id})
 
-    return report
+    history = await load_history(user_id)
+    return render_report(analyze(history))
+
+async def forecast_spending(user_id: int):
+    """
+    Month-end projection per category against budgets (cached per user data version).
+    """
+    logger.debug("tool call", extra={"tool": "forecast_spending", "user_id": user_id})
+    try:
+        return render_forecast(await get_forecast(user_id))
+    except Exception as e:
+        return f"Forecast Tool Error: {e}"
 
 async def search_vector_db(query: str, user_id: int, n_results: int = 5):
     """
-    This tool searches the vector database for transaction descriptions.
-    Useful for finding specific merchants or categories.
+    This tool searches transaction descriptions.
+    Exact merchant/keyword queries are answered from the local lexical index;
+    anything fuzzier is fused with vector results (reciprocal-rank fusion).
     """
     try:
         if not user_id: return "Error: No user_id."
 
-        collection = get_transaction_collection()
+        index = await get_user_index(user_id)
+        lexical_ids, confident = index.search(query, n_results)
+        if confident:
+            return [index.texts[doc_id] for doc_id in lexical_ids]
+
+        collection = get_transaction_collection(user_id)
         results = collection.query(
-            query_texts=[query],
+            query_embeddings=await embed([query], Priority.CHAT),
             n_results=n_results,
             where={"user_id": user_id} # RLS Filter
         )
-        # Flatten results
-        return results["documents"][0]
+        vector_ids = results["ids"][0]
+        texts = dict(zip(vector_ids, results["documents"][0]))
+        texts.update({doc_id: index.texts[doc_id] for doc_id in lexical_ids})
+
+        fused = reciprocal_rank_fusion([lexical_ids, vector_ids])[:n_results]
+        return [texts[doc_id] for doc_id in fused]
     except Exception as e:
         return f"Vector Store Error: {e}"
 
@@ -160,12 +225,36 @@ def get_db_schema():
     """
     This tool returns the schema info for the LLM to write SQL.
     """
-    return """
+    return f"""
+    Every table below holds only the current user's rows: never filter by user_id.
+
     Table: transactions
     Columns:
     - date (Date)
     - merchant (String)
-    - amount (Float)
+    - amount (Float, in the original currency)
     - currency (String)
+    - amount_base (Float, amount converted to the base currency, NULL until converted; use {BASE_AMOUNT_SQL} for SUM/AVG across transactions)
+    - category (String)
+
+    Table: monthly_rollups (totals of archived transactions older than the transactions table keeps)
+    Columns:
+    - month (String 'YYYY-MM')
     - category (String)
+    - total (Float, base currency; add to SUM({BASE_AMOUNT_SQL}) for all-time totals)
+    - count (Integer)
+
+    Table: budgets
+    Columns:
+    - category (String)
+    - amount (Float, monthly limit in the base currency)
+
+    Table: anomalies (unusually large charges, flagged at ingestion)
+    Columns:
+    - transaction_id (Integer, joins transactions.id)
+    - dimension (String: 'merchant' or 'category')
+    - key (String: the merchant or category name)
+    - amount (Float)
+    - expected (Float: typical amount before this charge)
+    - zscore (Float)
     """
@@ -0,0 +1,22 @@
+from app.core.config import settings
+
+def warm_up(components=None):
+    """
+    Eagerly initializes heavy subsystems that are otherwise created on first use.
+    Blocking; run it off the event loop.
+    """
+    if components is None:
+        components = [c.strip() for c in settings.WARMUP_COMPONENTS.split(",") if c.strip()]
+
+    if "vector" in components:
+        from app.core.vector import get_client, get_embedding_function
+        get_client()
+        get_embedding_function()
+    if "extraction" in components:
+        from app.services.extraction import get_extraction_chain
+        get_extraction_chain()
+    if "agent" in components:
+        from app.services.agent import get_app_graph, get_llm_with_tools
+        get_llm_with_tools()
+        get_app_graph()
+    return components
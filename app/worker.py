@@ -0,0 +1,103 @@
+"""
+Standalone ingestion worker.
+
+    python -m app.worker --concurrency 4
+
+Runs N consumers that lease jobs from the ingestion_jobs table and execute
+process_document_task. Start more processes (on any machine sharing the
+database) to scale ingestion throughput.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.services.jobs import claim_next_job, heartbeat, complete_job, fail_job
+from app.services.llm_gateway import gateway, process_quota
+from app.services.pdf import process_document_task
+
+logger = get_logger(__name__)
+
+async def _keep_lease(job_id: int, worker_id: str, work: asyncio.Task) -> bool:
+    """
+    Heartbeats until cancelled. Once the lease is lost another worker may already be re-running the job,
+    so the local run is cancelled before it commits a second copy of the rows. Returns True in that case.
+    """
+    while True:
+        await asyncio.sleep(settings.INGESTION_HEARTBEAT_SECONDS)
+        if not await heartbeat(job_id, worker_id):
+            logger.warning("lost job lease", extra={"worker": worker_id, "job_id": job_id})
+            work.cancel()
+            return True
+
+async def consume(worker_id: str, stop: asyncio.Event):
+    """
+    One consumer: claim, process, acknowledge, repeat until stopped.
+    """
+    while not stop.is_set():
+        try:
+            job = await claim_next_job(worker_id)
+        except Exception as e:
+            logger.error("could not poll queue", extra={"worker": worker_id, "error": repr(e)})
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.INGESTION_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        work = asyncio.create_task(process_document_task(job.document_id, job.file_path, job.user_id, attempt=job.attempts))
+        lease = asyncio.create_task(_keep_lease(job.id, worker_id, work))
+        try:
+            await work
+            await complete_job(job.id, worker_id)
+        except asyncio.CancelledError:
+            lost = lease.done() and not lease.cancelled() and lease.exception() is None
+            if not lost: # Shutdown, not a lost lease
+                raise
+            # The job belongs to whoever reclaimed it: neither complete nor fail it here
+            logger.warning("abandoned job after losing its lease", extra={
+                "worker": worker_id, "job_id": job.id, "document_id": job.document_id
+            })
+        except Exception as e:
+            exhausted = await fail_job(job, worker_id, repr(e))
+            logger.warning("job failed", extra={
+                "worker": worker_id, "job_id": job.id, "document_id": job.document_id,
+                "attempt": job.attempts, "outcome": "giving up" if exhausted else "will retry", "error": repr(e)
+            })
+        finally:
+            lease.cancel()
+
+def worker_ids(count: int):
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    return [f"{prefix}:{i}" for i in range(count)]
+
+async def run_workers(concurrency: int, stop: asyncio.Event = None):
+    stop = stop or asyncio.Event()
+    await asyncio.gather(*[consume(worker_id, stop) for worker_id in worker_ids(concurrency)])
+
+async def main(concurrency: int):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError: # Windows
+            pass
+    configure_logging()
+    # A worker spends the extraction slice of the LLM quota, not an API process's
+    gateway.set_quota(*process_quota("worker"))
+    logger.info("worker starting", extra={"consumers": concurrency})
+    await run_workers(concurrency, stop)
+    logger.info("worker stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("INGESTION_WORKER_CONCURRENCY", "2")))
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
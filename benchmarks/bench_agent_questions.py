@@ -0,0 +1,133 @@
+"""
+Agent round trips on the offline question set.
+
+Usage:
+    python -m benchmarks.bench_agent_questions --user-id 1
+    python -m benchmarks.bench_agent_questions --user-id 1 --variants baseline batch-sql --verbose
+
+Runs every question in test_data/test_questions.txt through the real agent
+graph for an existing user with data in DATABASE_URL, once per variant, and
+reports model calls (= agent/tool loop iterations), tool calls, prompt tokens
+and end-to-end latency per variant. Needs OPENAI_API_KEY: the point is how
+the real model behaves.
+
+Each variant runs in its own process, because the tool set and the static
+system prompt are fixed at import time.
+
+Variants:
+    baseline        no profile, single-query SQL tool only
+    profile         precomputed user profile in the system prompt
+    batch-sql       query_sql_batch_tool available
+    profile+batch   both
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+VARIANTS = {
+    "baseline": {"AGENT_PROFILE_ENABLED": "false", "AGENT_SQL_BATCH_ENABLED": "false"},
+    "profile": {"AGENT_PROFILE_ENABLED": "true", "AGENT_SQL_BATCH_ENABLED": "false"},
+    "batch-sql": {"AGENT_PROFILE_ENABLED": "false", "AGENT_SQL_BATCH_ENABLED": "true"},
+    "profile+batch": {"AGENT_PROFILE_ENABLED": "true", "AGENT_SQL_BATCH_ENABLED": "true"},
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--questions", default="test_data/test_questions.txt")
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--verbose", action="store_true", help="Print the tools each question used")
+    parser.add_argument("--run-variant", choices=list(VARIANTS), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def load_questions(path: str):
+    with open(path, encoding="utf-8") as f:
+        # "12. If I keep spending like this..." -> the question text
+        return [re.sub(r"^\s*\d+[.)]\s*", "", line).strip() for line in f if line.strip()]
+
+async def ask(graph, question: str) -> dict:
+    from langchain_core.messages import HumanMessage, AIMessage
+
+    started = time.perf_counter()
+    result = await graph.ainvoke({"messages": [HumanMessage(content=question)]})
+    elapsed = time.perf_counter() - started
+
+    replies = [m for m in result["messages"] if isinstance(m, AIMessage)]
+    return {
+        "seconds": elapsed,
+        "model_calls": len(replies),
+        "tools": [call["name"] for m in replies for call in (m.tool_calls or [])],
+        "prompt_tokens": sum((m.usage_metadata or {}).get("input_tokens", 0) for m in replies),
+    }
+
+async def run_variant(name: str, questions, args) -> list:
+    """
+    Runs inside the child process, with the variant's settings already in the environment.
+    """
+    from app.core.context import user_id_context
+    from app.services.agent import get_app_graph
+
+    user_id_context.set(args.user_id)
+    graph = get_app_graph()
+
+    results = []
+    for i, question in enumerate(questions, 1):
+        try:
+            row = await ask(graph, question)
+        except Exception as e:
+            print(f"  [{name}] question {i} failed: {e!r}", file=sys.stderr)
+            continue
+        results.append(row)
+        if args.verbose:
+            print(f"  [{name}] {i}: {row['model_calls']} model calls, tools={row['tools']}, {row['seconds']:.1f}s", file=sys.stderr)
+    return results
+
+def spawn_variant(name: str, args) -> list:
+    command = [
+        sys.executable, "-m", "benchmarks.bench_agent_questions",
+        "--user-id", str(args.user_id), "--questions", args.questions, "--run-variant", name,
+    ] + (["--verbose"] if args.verbose else [])
+    done = subprocess.run(command, env={**os.environ, **VARIANTS[name]}, stdout=subprocess.PIPE, text=True, check=True)
+    return json.loads(done.stdout)
+
+def summarize(name: str, results: list):
+    if not results:
+        print(f"{name:<14} no successful answers")
+        return
+    seconds = [r["seconds"] for r in results]
+    model_calls = sum(r["model_calls"] for r in results)
+    tool_calls = sum(len(r["tools"]) for r in results)
+    direct = sum(1 for r in results if not r["tools"])
+    print(
+        f"{name:<14} answered={len(results):<3} model_calls={model_calls:<4} tool_calls={tool_calls:<4} "
+        f"answered_without_tools={direct:<3} prompt_tokens={sum(r['prompt_tokens'] for r in results):<7} "
+        f"p50={percentile(seconds, 50):.1f}s p95={percentile(seconds, 95):.1f}s total={sum(seconds):.1f}s"
+    )
+
+def main(args):
+    questions = load_questions(args.questions)
+    if args.run_variant:
+        print(json.dumps(asyncio.run(run_variant(args.run_variant, questions, args))))
+        return
+
+    from app.core.config import settings
+    if not settings.OPENAI_API_KEY:
+        raise SystemExit("OPENAI_API_KEY is not set: this benchmark measures the real model's tool use.")
+    print(f"{len(questions)} questions, user {args.user_id}")
+
+    summaries = {name: spawn_variant(name, args) for name in args.variants}
+    print()
+    for name, results in summaries.items():
+        summarize(name, results)
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,78 @@
+"""
+Correctness and throughput of the incremental merchant/category statistics.
+
+Usage:
+    python -m benchmarks.bench_anomaly --rows 200000
+
+Feeds a synthetic history through score_and_update() in random-sized ingestion
+batches, asserts the running count/mean/variance/last_seen match a full
+recompute for every key, then reports rows/s.
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from app.services.anomaly import score_and_update, stddev
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--merchants", type=int, default=500)
+    return parser.parse_args()
+
+def new_stat(dimension, key):
+    return SimpleNamespace(count=0, mean=0.0, m2=0.0, last_seen=None)
+
+def main(args):
+    categories = ["Groceries", "Dining", "Utilities", "Shopping", "Travel", "Gas"]
+    start = date.today() - timedelta(days=2 * 365)
+    rows = []
+    for i in range(args.rows):
+        merchant = random.randrange(args.merchants)
+        amount = abs(random.gauss(20 + merchant % 80, 5))
+        if random.random() < 0.001:
+            amount *= 20 # Planted outliers
+        rows.append((
+            i + 1,
+            start + timedelta(days=i * 2 * 365 // args.rows),
+            f"Merchant {merchant}",
+            categories[merchant % len(categories)],
+            round(amount, 2),
+        ))
+
+    stats, flagged, position = {}, [], 0
+    began = time.perf_counter()
+    while position < len(rows):
+        size = random.randint(20, 400) # One statement's worth of rows
+        flagged += score_and_update(stats, rows[position:position + size], new_stat)
+        position += size
+    elapsed = time.perf_counter() - began
+
+    # Full recompute.
+    grouped = defaultdict(list)
+    last_seen = {}
+    for _, tx_date, merchant, category, amount in rows:
+        for key in (("merchant", merchant), ("category", category)):
+            grouped[key].append(amount)
+            last_seen[key] = max(last_seen.get(key, tx_date), tx_date)
+
+    assert set(grouped) == set(stats), "key sets differ"
+    for key, amounts in grouped.items():
+        stat = stats[key]
+        assert stat.count == len(amounts), key
+        assert math.isclose(stat.mean, statistics.fmean(amounts), rel_tol=1e-9), key
+        if len(amounts) > 1:
+            assert math.isclose(stddev(stat), statistics.stdev(amounts), rel_tol=1e-6), key
+        assert stat.last_seen == last_seen[key], key
+
+    print(f"rows={args.rows} keys={len(stats)} flagged={len(flagged)}")
+    print(f"  incremental stats match full recompute for all {len(stats)} keys")
+    print(f"  throughput: {args.rows / elapsed:,.0f} rows/s")
+
+if __name__ == "__main__":
+    main(parse_args())
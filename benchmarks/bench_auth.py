@@ -0,0 +1,77 @@
+"""
+Throughput of an authenticated no-op endpoint with and without the principal cache.
+
+Usage:
+    python -m benchmarks.bench_auth --requests 5000 --concurrency 50
+
+Runs the app's real get_current_user dependency in-process (httpx ASGI transport)
+against a throwaway SQLite database, first with the cache disabled, then enabled.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    return parser.parse_args()
+
+async def run_load(client, headers, total, concurrency):
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get("/noop", headers=headers)
+            response.raise_for_status()
+
+    began = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return total / (time.perf_counter() - began)
+
+async def main(args):
+    tmpdir = tempfile.mkdtemp(prefix="bench_auth_")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmpdir}/bench.db"
+
+    import httpx
+    from datetime import timedelta
+    from fastapi import Depends, FastAPI
+    from app.api import deps
+    from app.core.cache import TTLCache
+    from app.core.config import settings
+    from app.core.database import engine, Base, SessionLocal
+    from app.core.security import create_access_token
+    from app.models.sql import User
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        user = User(email="bench@example.com", full_name="Bench", hashed_password="x")
+        session.add(user)
+        await session.commit()
+        token = create_access_token({"sub": user.email, "uid": user.id}, timedelta(minutes=30))
+
+    app = FastAPI()
+
+    @app.get("/noop")
+    async def noop(current_user=Depends(deps.get_current_user)):
+        return {"id": current_user.id}
+
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deps._principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=0)
+        uncached = await run_load(client, headers, args.requests, args.concurrency)
+
+        deps._principal_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=60)
+        cached = await run_load(client, headers, args.requests, args.concurrency)
+
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"  no cache : {uncached:9.1f} req/s")
+    print(f"  cache    : {cached:9.1f} req/s  ({cached / uncached:.2f}x)")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
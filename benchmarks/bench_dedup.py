@@ -0,0 +1,102 @@
+"""
+Overlapping-statement de-duplication: correctness and cost.
+
+Usage:
+    python -m benchmarks.bench_dedup --statements 24 --per-statement 300 --overlap-days 5
+
+Ingests monthly statements whose date ranges overlap by --overlap-days (the
+overlapping rows re-appear with merchant spelling noise and a +/-1 day posting
+shift) into a throwaway SQLite database, using the same fingerprint +
+find_duplicates path as process_document_task. Asserts that the stored rows
+equal the unique charges, that genuine same-day repeats inside one statement
+survive, and reports lookup time per batch.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--statements", type=int, default=24)
+    parser.add_argument("--per-statement", type=int, default=300)
+    parser.add_argument("--overlap-days", type=int, default=5)
+    return parser.parse_args()
+
+MERCHANTS = ["Starbucks", "Whole Foods", "Shell", "Netflix", "Uber", "Amazon", "Chipotle", "Con Edison"]
+
+def noisy(merchant: str) -> str:
+    return random.choice([merchant, merchant.upper(), f"POS {merchant.upper()} #{random.randrange(9999):04d}", f"{merchant}.com"])
+
+async def main(args):
+    tmpdir = tempfile.mkdtemp(prefix="bench_dedup_")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmpdir}/bench.db"
+
+    from app.core.database import engine, Base, SessionLocal
+    from app.models.sql import User, Document, Transaction
+    from app.services.dedup import transaction_fingerprint, find_duplicates
+    from sqlalchemy import select, func
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Unique charges over the whole period; each statement covers a month plus the overlap
+    start = date(2023, 1, 1)
+    charges = []
+    for month in range(args.statements):
+        for _ in range(args.per_statement):
+            day = start + timedelta(days=month * 30 + random.randrange(30))
+            charges.append((day, random.choice(MERCHANTS), round(random.uniform(3, 200), 2)))
+    # Genuine repeats: same merchant, amount and day twice within one statement
+    repeats = charges[: args.statements]
+    charges += repeats
+
+    async with SessionLocal() as db:
+        user = User(email="dedup@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    lookup_times, skipped_total = [], 0
+    for month in range(args.statements):
+        own_lo, own_hi = start + timedelta(days=month * 30), start + timedelta(days=(month + 1) * 30)
+        overlap = timedelta(days=args.overlap_days)
+        rows = []
+        for d, m, a in charges:
+            if not own_lo - overlap <= d < own_hi + overlap:
+                continue
+            if not own_lo <= d < own_hi:
+                # The neighbouring statement's copy: posting date may drift by a day
+                d += timedelta(days=random.choice([-1, 0, 1]))
+            rows.append((d, noisy(m), a))
+
+        async with SessionLocal() as db:
+            doc = Document(filename=f"statement_{month}.pdf", status="processing", user_id=user_id)
+            db.add(doc)
+            await db.flush()
+            candidates = [(transaction_fingerprint(user_id, m, a, "USD"), d) for d, m, a in rows]
+            began = time.perf_counter()
+            duplicates = await find_duplicates(db, user_id, doc.id, candidates)
+            lookup_times.append(time.perf_counter() - began)
+            skipped_total += len(duplicates)
+            db.add_all([
+                Transaction(document_id=doc.id, user_id=user_id, date=d, merchant=m, amount=a, currency="USD", fingerprint=fp)
+                for position, ((d, m, a), (fp, _)) in enumerate(zip(rows, candidates)) if position not in duplicates
+            ])
+            doc.duplicates_skipped = len(duplicates)
+            doc.status = "completed"
+            await db.commit()
+
+    async with SessionLocal() as db:
+        stored = (await db.execute(select(func.count(Transaction.id)))).scalar()
+
+    print(f"{len(charges)} unique charges, {stored} stored, {skipped_total} duplicates skipped")
+    print(f"find_duplicates: avg {sum(lookup_times) / len(lookup_times) * 1000:.2f}ms per statement of ~{args.per_statement + 2 * args.per_statement * args.overlap_days // 30} rows")
+    assert stored == len(charges), "overlap rows were double counted or genuine repeats were dropped"
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,63 @@
+"""
+Speed of the vectorized diagnostics engine on large synthetic histories.
+
+Usage:
+    python -m benchmarks.bench_diagnostics --rows 100000
+
+Builds a SpendingHistory with planted subscriptions (including a price change)
+amid random purchases, times analyze() and checks the planted ones are found.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.services.diagnostics import SpendingHistory, analyze
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--merchants", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+def synthesize(rows: int, merchants: int):
+    start = date.today() - timedelta(days=3 * 365)
+    data = []
+    for i in range(rows):
+        data.append((
+            f"Shop {random.randrange(merchants)}",
+            round(random.uniform(3, 250), 2),
+            (start + timedelta(days=random.randrange(3 * 365))).isoformat(),
+            "Shopping",
+        ))
+    planted = {
+        "Netflix": (30, lambda k: 15.49 if k < 20 else 17.99),
+        "Gym Weekly": (7, lambda k: 12.00),
+        "Domain Renewal": (365, lambda k: 20.00),
+    }
+    for name, (period, price) in planted.items():
+        for k in range(3 * 365 // period):
+            day = start + timedelta(days=k * period + random.choice([-1, 0, 1]))
+            data.append((name, price(k), day.isoformat(), "Subscription"))
+    merchants_col, amounts, dates, categories = zip(*data)
+    return SpendingHistory(merchants_col, amounts, dates, categories), set(planted)
+
+def main(args):
+    history, planted = synthesize(args.rows, args.merchants)
+
+    timings = []
+    for _ in range(args.repeat):
+        began = time.perf_counter()
+        result = analyze(history)
+        timings.append((time.perf_counter() - began) * 1000)
+
+    found = {r["merchant"] for r in result["recurring"]}
+    timings.sort()
+    print(f"rows={len(history)} merchants={len(history.merchant_names)}")
+    print(f"  analyze(): median={timings[len(timings) // 2]:.2f}ms  min={timings[0]:.2f}ms")
+    print(f"  planted subscriptions found: {sorted(planted & found)}  missed: {sorted(planted - found)}")
+    print(f"  other merchants flagged recurring: {len(found - planted)}")
+
+if __name__ == "__main__":
+    main(parse_args())
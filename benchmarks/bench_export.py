@@ -0,0 +1,84 @@
+"""
+Memory and throughput of the streaming transaction export.
+
+Usage:
+    python -m benchmarks.bench_export --rows 1000000 --format parquet
+
+Seeds a throwaway SQLite database, then drains stream_transactions_export()
+for one user and reports rows/s, bytes produced and peak Python heap usage.
+Peak memory should stay flat as --rows grows.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", default="csv", choices=["csv", "arrow", "parquet"])
+    return parser.parse_args()
+
+def seed(path: str, rows: int):
+    categories = ["Groceries", "Dining", "Utilities", "Shopping", "Travel", "Gas"]
+    start = date.today() - timedelta(days=3650)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO transactions (document_id, user_id, date, merchant, amount, currency, category) "
+        "VALUES (1, 1, ?, ?, ?, 'USD', ?)",
+        (
+            (
+                (start + timedelta(days=i % 3650)).isoformat(),
+                f"Merchant {i % 5000}",
+                round(random.uniform(1, 500), 2),
+                categories[i % len(categories)],
+            )
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+async def main(args):
+    tmpdir = tempfile.mkdtemp(prefix="bench_export_")
+    db_path = os.path.join(tmpdir, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+
+    from app.core.database import engine, read_engine, Base
+    from app.schemas.dashboard import TimeRange
+    from app.services.export import ExportFormat, stream_transactions_export
+    from app.services.filters import build_transaction_filters
+    import app.models.sql  # noqa: F401  (registers tables)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    began = time.perf_counter()
+    seed(db_path, args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - began:.1f}s")
+
+    where_clause, params = build_transaction_filters(1, TimeRange.ALL_TIME)
+    total_bytes = 0
+    tracemalloc.start()
+    began = time.perf_counter()
+    async for chunk in stream_transactions_export(where_clause, params, ExportFormat(args.format)):
+        total_bytes += len(chunk)
+    elapsed = time.perf_counter() - began
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"format={args.format} rows={args.rows}")
+    print(f"  elapsed    : {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s)")
+    print(f"  output     : {total_bytes / 1e6:.1f} MB")
+    print(f"  peak heap  : {peak / 1e6:.1f} MB (Python allocations, excludes Arrow buffers)")
+
+    await engine.dispose()
+    await read_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,83 @@
+"""
+Throughput of the forecasting engine as a nightly batch over many users.
+
+Usage:
+    python -m benchmarks.bench_forecast --users 10000 --tx-per-user 400
+
+Synthesizes a year of history per user (random purchases plus a monthly
+subscription and a budget), runs forecast() for every user and reports
+users/s and latency percentiles. Also checks the planted subscription is
+projected on its schedule and that an empty history forecasts to zero.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.services.diagnostics import SpendingHistory
+from app.services.forecast import forecast
+
+CATEGORIES = ["Groceries", "Dining", "Transport", "Shopping", "Entertainment"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tx-per-user", type=int, default=400)
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today())
+    return parser.parse_args()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def synthesize(tx: int, today: date):
+    start = today - timedelta(days=365)
+    data = []
+    for _ in range(tx):
+        data.append((
+            f"Shop {random.randrange(50)}",
+            round(random.uniform(3, 120), 2),
+            (start + timedelta(days=random.randrange(365))).isoformat(),
+            random.choice(CATEGORIES),
+        ))
+    # Monthly subscription billed on the 20th, so it is still due in the first part of the month
+    month = start.replace(day=20)
+    while month < today.replace(day=1):
+        data.append(("Streaming Co", 15.99, month.isoformat(), "Subscription"))
+        month = (month + timedelta(days=32)).replace(day=20)
+    merchants, amounts, dates, categories = zip(*data)
+    budgets = {c: round(random.uniform(100, 600), 2) for c in random.sample(CATEGORIES, 3)}
+    return SpendingHistory(merchants, amounts, dates, categories), budgets
+
+def main(args):
+    random.seed(7)
+    began = time.perf_counter()
+    users = [synthesize(args.tx_per_user, args.today) for _ in range(args.users)]
+    print(f"synthesized {args.users} users x ~{args.tx_per_user} rows in {time.perf_counter() - began:.1f}s")
+
+    timings = []
+    statuses = {}
+    began = time.perf_counter()
+    for history, budgets in users:
+        started = time.perf_counter()
+        result = forecast(history, budgets, args.today)
+        timings.append((time.perf_counter() - started) * 1000)
+        for row in result["categories"]:
+            statuses[row["status"]] = statuses.get(row["status"], 0) + 1
+    elapsed = time.perf_counter() - began
+
+    print(f"forecast(): {args.users / elapsed:,.0f} users/s ({elapsed:.2f}s total)")
+    print(f"  per user: p50={percentile(timings, 50):.2f}ms  p95={percentile(timings, 95):.2f}ms  p99={percentile(timings, 99):.2f}ms")
+    print(f"  category statuses: {statuses}")
+
+    upcoming = {r["merchant"]: r for r in result["upcoming_recurring"]}
+    if args.today.day < 20:
+        assert "Streaming Co" in upcoming, result["upcoming_recurring"]
+        print(f"  planted subscription projected on {upcoming['Streaming Co']['date']}")
+
+    empty = forecast(SpendingHistory([], [], [], []), {"Dining": 200.0}, args.today)
+    assert empty["projected"] == 0 and empty["categories"][0]["status"] == "on_track", empty
+    print("  empty history: zero projection, budgets on track")
+
+if __name__ == "__main__":
+    main(parse_args())
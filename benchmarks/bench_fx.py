@@ -0,0 +1,57 @@
+"""
+FX cache lookup cost and correctness.
+
+Usage:
+    python -m benchmarks.bench_fx --currencies 30 --years 10 --lookups 500000
+
+Builds an FxCache from synthetic weekday fixings (no weekends, as real feeds),
+checks rate() against a linear "latest fixing on or before" scan, and reports
+lookups per second. This is the per-row cost paid at ingestion/backfill, in
+place of converting at query time.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from app.services.fx import FxCache
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=500_000)
+    parser.add_argument("--checks", type=int, default=2_000)
+    return parser.parse_args()
+
+def main(args):
+    start_day = date.today() - timedelta(days=365 * args.years)
+    days = [start_day + timedelta(days=i) for i in range(365 * args.years)]
+    fixings = [d for d in days if d.weekday() < 5]
+    currencies = [f"C{i:02d}" for i in range(args.currencies)]
+    rows = [(d, c, round(random.uniform(0.01, 2.0), 6)) for c in currencies for d in fixings]
+
+    began = time.perf_counter()
+    fx = FxCache(rows, base="USD")
+    print(f"built cache: {len(rows)} rates in {(time.perf_counter() - began) * 1000:.0f}ms")
+
+    by_currency = {}
+    for d, c, r in rows:
+        by_currency.setdefault(c, []).append((d, r))
+    for _ in range(args.checks):
+        c, d = random.choice(currencies), random.choice(days)
+        expected = [r for fixing, r in by_currency[c] if fixing <= d]
+        expected = expected[-1] if expected else by_currency[c][0][1]
+        assert fx.rate(c, d) == expected, (c, d)
+    assert fx.rate("USD", days[0]) == 1.0 and fx.rate("XXX", days[0]) is None
+    print(f"{args.checks} lookups match a linear scan (weekends use the previous fixing)")
+
+    queries = [(random.choice(currencies), random.choice(days)) for _ in range(args.lookups)]
+    began = time.perf_counter()
+    for c, d in queries:
+        fx.to_base(100.0, c, d)
+    elapsed = time.perf_counter() - began
+    print(f"to_base: {args.lookups / elapsed:,.0f} conversions/s ({elapsed / args.lookups * 1e6:.2f}us each)")
+
+if __name__ == "__main__":
+    main(parse_args())
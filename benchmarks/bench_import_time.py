@@ -0,0 +1,67 @@
+"""
+Import-time budget for the API entry point.
+
+Usage:
+    python -m benchmarks.bench_import_time --budget-ms 1200
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter, prints
+the heaviest imports and fails (exit code 1) if the total exceeds the budget or
+any heavy subsystem that should load lazily got imported.
+"""
+import argparse
+import subprocess
+import sys
+
+# Top-level packages that must not be imported just by loading the API.
+LAZY_PACKAGES = {"langchain", "langchain_core", "langchain_openai", "langgraph", "chromadb", "openai", "numpy", "pyarrow", "pypdf"}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1200.0)
+    parser.add_argument("--top", type=int, default=15)
+    return parser.parse_args()
+
+def measure(module: str):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        print(completed.stderr[-2000:])
+        raise SystemExit(f"Importing {module} failed")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|", 1).split("|")]
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+def main(args):
+    entries = measure(args.module)
+    total_ms = next(c for name, _, c in entries if name == args.module) / 1000
+    imported_roots = {name.split(".")[0] for name, _, _ in entries}
+    leaked = sorted(imported_roots & LAZY_PACKAGES)
+
+    print(f"import {args.module}: {total_ms:.1f}ms (budget {args.budget_ms:.0f}ms)")
+    print(f"Heaviest imports (cumulative):")
+    top_level = [e for e in entries if "." not in e[0]]
+    for name, _, cumulative in sorted(top_level, key=lambda e: -e[2])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failed = False
+    if leaked:
+        print(f"FAIL: heavy packages imported eagerly: {', '.join(leaked)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.1f}ms exceeds budget {args.budget_ms:.0f}ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,72 @@
+"""
+Evaluation and latency of the lexical transaction index.
+
+Usage:
+    python -m benchmarks.bench_lexical --rows 20000
+
+Indexes a synthetic history, then issues three query sets:
+exact merchant names, partial names ("starbucks" vs "STARBUCKS #0412") and
+category words. Reports how often results are answered lexically (no embedding
+call), hit rate@5 against ground truth and p50/p99 latency.
+"""
+import argparse
+import random
+import time
+
+from app.core.vector import transaction_document
+from app.services.lexical import LexicalIndex, reciprocal_rank_fusion
+
+BRANDS = [
+    ("Starbucks", "Dining"), ("Whole Foods", "Groceries"), ("Shell", "Gas"), ("Netflix", "Subscription"),
+    ("Uber", "Travel"), ("Amazon", "Shopping"), ("Con Edison", "Utilities"), ("CVS Pharmacy", "Health"),
+    ("Delta Air Lines", "Travel"), ("Trader Joe's", "Groceries"), ("Chipotle", "Dining"), ("Spotify", "Subscription"),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    return parser.parse_args()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main(args):
+    index = LexicalIndex()
+    truth_brand = {}
+    for i in range(args.rows):
+        brand, category = random.choice(BRANDS)
+        merchant = brand if random.random() < 0.5 else f"{brand.upper()} #{random.randrange(10000):04d}"
+        doc_id = f"doc_{i}"
+        index.add(doc_id, merchant, category, transaction_document(merchant, category, "2025-01-01", 12.5, "USD"))
+        truth_brand[doc_id] = (brand, category)
+
+    query_sets = {
+        "exact merchant": [(b, lambda d, b=b: truth_brand[d][0] == b) for b, _ in BRANDS],
+        "partial merchant": [(b.split()[0].lower(), lambda d, b=b: truth_brand[d][0] == b) for b, _ in BRANDS],
+        "category word": [(c, lambda d, c=c: truth_brand[d][1] == c) for _, c in BRANDS],
+    }
+
+    for name, queries in query_sets.items():
+        latencies, lexical_only, hits = [], 0, 0
+        for _ in range(args.queries):
+            query, relevant = random.choice(queries)
+            began = time.perf_counter()
+            ranked, confident = index.search(query, 5)
+            latencies.append((time.perf_counter() - began) * 1000)
+            lexical_only += confident
+            hits += bool(ranked) and all(relevant(d) for d in ranked)
+        print(
+            f"{name:>16}: answered lexically={lexical_only / args.queries:6.1%}  "
+            f"all-relevant@5={hits / args.queries:6.1%}  "
+            f"p50={percentile(latencies, 50):.3f}ms  p99={percentile(latencies, 99):.3f}ms"
+        )
+
+    # Fusion: a lexical list and a (simulated) vector list sharing one document.
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d", "e"]])
+    assert fused[0] == "c", fused
+    print(f"indexed={len(index)} docs; RRF sanity check passed")
+
+if __name__ == "__main__":
+    main(parse_args())
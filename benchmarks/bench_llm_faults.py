@@ -0,0 +1,91 @@
+"""
+Fault-injection harness for LLM deadlines, retries and hedging.
+
+Usage:
+    python -m benchmarks.bench_llm_faults --calls 200 --error-rate 0.1 --stall-rate 0.05 --deadline 5
+
+Starts benchmarks.fake_openai in-process with injected 429/503 errors and
+stalled responses, then sends the same workload through the LLM gateway with
+three policies: no retries, retries, and retries plus hedging. For each it
+reports success rate and p50/p99/max latency, and asserts that no call
+outlives its deadline by more than --slack seconds.
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+
+from app.core.context import set_deadline, DeadlineExceeded
+from app.services.llm_gateway import LLMGateway, Priority, percentile
+from benchmarks.fake_openai import create_app
+
+POLICIES = [
+    ("no retries", dict(max_retries=0, hedge_percentile=0)),
+    ("retries", dict(max_retries=3, hedge_percentile=0)),
+    ("retries+hedge", dict(max_retries=3, hedge_percentile=90)),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--stall-rate", type=float, default=0.05)
+    parser.add_argument("--call-timeout", type=float, default=2.0)
+    parser.add_argument("--deadline", type=float, default=5.0)
+    parser.add_argument("--slack", type=float, default=0.5)
+    return parser.parse_args()
+
+def start_fake_server(args) -> str:
+    import uvicorn
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    app = create_app(args.latency_ms, args.latency_ms / 2, args.error_rate, args.stall_rate, stall_ms=60_000)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+async def run_policy(args, base_url: str, options: dict):
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(model="gpt-4o", api_key="fake", base_url=base_url, timeout=args.call_timeout, max_retries=0)
+    gateway = LLMGateway(100_000, 10_000_000, args.concurrency, call_timeout=args.call_timeout, retry_base=0.2, **options)
+    latencies, outcomes = [], {"ok": 0, "deadline": 0, "error": 0}
+
+    async def one(i):
+        set_deadline(args.deadline)
+        start = time.perf_counter()
+        try:
+            await gateway.call(lambda: llm.ainvoke(f"question {i}"), priority=Priority.CHAT, est_tokens=100)
+            outcomes["ok"] += 1
+        except DeadlineExceeded:
+            outcomes["deadline"] += 1
+        except Exception:
+            outcomes["error"] += 1
+        latencies.append(time.perf_counter() - start)
+
+    # Warm the latency window so hedging has a percentile to work from
+    for i in range(0, args.calls, args.concurrency):
+        await asyncio.gather(*[one(j) for j in range(i, min(i + args.concurrency, args.calls))])
+    return latencies, outcomes, gateway.stats()["chat"]
+
+async def main(args):
+    base_url = start_fake_server(args)
+    print(f"fake server at {base_url}: latency={args.latency_ms}ms errors={args.error_rate:.0%} stalls={args.stall_rate:.0%}")
+    print(f"call timeout={args.call_timeout}s deadline={args.deadline}s, {args.calls} calls per policy\n")
+
+    for name, options in POLICIES:
+        latencies, outcomes, stats = await run_policy(args, base_url, options)
+        print(f"{name:<14} ok={outcomes['ok'] / args.calls:6.1%}  deadline={outcomes['deadline']:4d}  error={outcomes['error']:4d}  "
+              f"p50={percentile(latencies, 50):5.2f}s  p99={percentile(latencies, 99):5.2f}s  max={max(latencies):5.2f}s  "
+              f"retries={stats['retries']} hedged={stats['hedged']} timeouts={stats['timeouts']}")
+        assert max(latencies) <= args.deadline + args.slack, f"{name}: a call outlived its deadline ({max(latencies):.2f}s)"
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,70 @@
+"""
+Queue-wait behaviour of the LLM gateway under a mixed chat / ingestion load.
+
+Usage:
+    python -m benchmarks.bench_llm_gateway --ingestion 200 --chat 40 --rpm 600
+    python -m benchmarks.bench_llm_gateway --base-url http://127.0.0.1:8100/v1   # via benchmarks.fake_openai
+
+A burst of extraction calls is queued first, then chat calls arrive spread over
+the run. With priorities, chat wait should stay near one dispatch interval
+while ingestion absorbs the backlog. Without --base-url the model call is a
+sleep of --latency-ms, so only the limiter is measured.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.services.llm_gateway import LLMGateway, Priority
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ingestion", type=int, default=200)
+    parser.add_argument("--chat", type=int, default=40)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--tpm", type=int, default=400_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--base-url", default="", help="Call a fake OpenAI server instead of sleeping")
+    return parser.parse_args()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def main(args):
+    gateway = LLMGateway(args.rpm, args.tpm, args.concurrency)
+    # Start from an empty request bucket so the run is limiter-bound from the first call
+    gateway.requests.tokens = 0
+
+    if args.base_url:
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(model="gpt-4o", api_key="fake", base_url=args.base_url)
+        make_call = lambda: llm.ainvoke("How much did I spend on coffee?")
+    else:
+        make_call = lambda: asyncio.sleep(args.latency_ms / 1000)
+
+    waits = {Priority.CHAT: [], Priority.INGESTION: []}
+
+    async def one(priority, delay):
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        await gateway.call(make_call, priority=priority, est_tokens=800)
+        waits[priority].append(time.perf_counter() - start)
+
+    duration = args.ingestion / (args.rpm / 60)
+    tasks = [one(Priority.INGESTION, 0) for _ in range(args.ingestion)]
+    tasks += [one(Priority.CHAT, random.uniform(0, duration * 0.8)) for _ in range(args.chat)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.ingestion} ingestion + {args.chat} chat calls in {elapsed:.1f}s (rpm={args.rpm}, concurrency={args.concurrency})")
+    for priority, samples in waits.items():
+        print(f"  {priority.name.lower():<10} p50={percentile(samples, 50) * 1000:8.0f}ms  "
+              f"p99={percentile(samples, 99) * 1000:8.0f}ms  max={max(samples) * 1000:8.0f}ms")
+    print("gateway stats:", gateway.stats())
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
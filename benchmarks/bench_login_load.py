@@ -0,0 +1,96 @@
+"""
+Load test: bursts of logins mixed with dashboard reads.
+
+Usage:
+    python -m benchmarks.bench_login_load --logins 200 --login-concurrency 32 --readers 8
+
+Boots the real app in-process on a throwaway SQLite database, measures
+/dashboard/stats latency on its own, then again while login traffic runs.
+With hashing on the dedicated pool the two distributions should match.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of the baseline phase")
+    return parser.parse_args()
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(name, samples):
+    ms = [s * 1000 for s in samples]
+    print(f"{name:>18}: n={len(ms):6d}  p50={percentile(ms, 50):7.2f}ms  p99={percentile(ms, 99):7.2f}ms  max={max(ms, default=0):7.2f}ms")
+
+async def main(args):
+    tmpdir = tempfile.mkdtemp(prefix="bench_login_")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tmpdir}/bench.db"
+
+    import httpx
+    from app.main import app
+    from app.core.database import engine, Base
+    from app.core.security import password_executor_stats
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench/api/v1", timeout=60) as client:
+        credentials = {"username": "bench@example.com", "password": "password123"}
+        await client.post("/auth/signup", json={"email": credentials["username"], "password": credentials["password"]})
+        token = (await client.post("/auth/login", data=credentials)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def read_dashboard(stop: asyncio.Event, samples: list):
+            while not stop.is_set():
+                began = time.perf_counter()
+                response = await client.get("/dashboard/stats?time_range=all", headers=headers)
+                response.raise_for_status()
+                samples.append(time.perf_counter() - began)
+
+        # Phase 1: dashboard only.
+        baseline, stop = [], asyncio.Event()
+        readers = [asyncio.create_task(read_dashboard(stop, baseline)) for _ in range(args.readers)]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*readers)
+
+        # Phase 2: dashboard while a login burst is in flight.
+        under_load, stop = [], asyncio.Event()
+        login_latencies, statuses, max_queue = [], {}, 0
+        remaining = iter(range(args.logins))
+
+        async def log_in():
+            nonlocal max_queue
+            for _ in remaining:
+                began = time.perf_counter()
+                response = await client.post("/auth/login", data=credentials)
+                login_latencies.append(time.perf_counter() - began)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                max_queue = max(max_queue, password_executor_stats()["queued"])
+
+        readers = [asyncio.create_task(read_dashboard(stop, under_load)) for _ in range(args.readers)]
+        began = time.perf_counter()
+        await asyncio.gather(*[log_in() for _ in range(args.login_concurrency)])
+        login_elapsed = time.perf_counter() - began
+        stop.set()
+        await asyncio.gather(*readers)
+
+    summarize("dashboard (idle)", baseline)
+    summarize("dashboard (logins)", under_load)
+    summarize("login", login_latencies)
+    print(f"logins/s={args.logins / login_elapsed:.1f} statuses={statuses} max_queue_depth={max_queue}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
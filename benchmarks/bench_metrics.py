@@ -0,0 +1,64 @@
+"""
+Per-request cost of the metrics instrumentation.
+
+Usage:
+    python -m benchmarks.bench_metrics --requests 200000
+
+Drives MetricsMiddleware around a no-op ASGI app and times fingerprinting of
+a realistic statement mix, then renders /metrics once to report scrape cost.
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.metrics import MetricsMiddleware, db_query_duration, fingerprint, render_metrics
+
+ROUTES = ["/api/v1/transactions/", "/api/v1/dashboard/stats", "/api/v1/budgets/", "/api/v1/chat/message"]
+
+STATEMENTS = [
+    "SELECT users.id, users.email FROM users WHERE users.id = ?",
+    "SELECT transactions.date, transactions.id, transactions.merchant FROM transactions WHERE transactions.user_id = ? ORDER BY transactions.date DESC LIMIT ?",
+    "UPDATE ingestion_jobs SET status=?, lease_owner=? WHERE ingestion_jobs.id = ? AND ingestion_jobs.status = ?",
+]
+
+class Route:
+    def __init__(self, path):
+        self.path = path
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    return parser.parse_args()
+
+async def main(args):
+    routes = [Route(p) for p in ROUTES]
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = routes[scope["i"] % len(routes)]
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def run(app):
+        start = time.perf_counter()
+        for i in range(args.requests):
+            await app({"type": "http", "method": "GET", "i": i}, None, send)
+        return (time.perf_counter() - start) / args.requests
+
+    bare = await run(endpoint)
+    instrumented = await run(MetricsMiddleware(endpoint))
+    print(f"middleware overhead: {(instrumented - bare) * 1e6:.2f} us/request ({args.requests} requests)")
+
+    start = time.perf_counter()
+    for i in range(args.requests):
+        db_query_duration.observe(("write", fingerprint(STATEMENTS[i % len(STATEMENTS)])), 0.001)
+    print(f"query fingerprint + observe: {(time.perf_counter() - start) / args.requests * 1e6:.2f} us/query")
+
+    start = time.perf_counter()
+    body = render_metrics()
+    print(f"scrape render: {(time.perf_counter() - start) * 1000:.2f} ms, {len(body)} bytes")
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,92 @@
+"""
+Latency of keyset pagination from the first page to deep pages.
+
+Usage:
+    python -m benchmarks.bench_pagination --rows 600000 --pages 10000 --limit 50
+
+Seeds a throwaway SQLite database, walks /transactions page by page through
+the endpoint function and reports per-depth latency. p99 should not grow with depth.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=600_000)
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=50)
+    return parser.parse_args()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def seed(path: str, rows: int):
+    categories = ["Groceries", "Dining", "Utilities", "Shopping", "Travel", "Gas"]
+    start = date.today() - timedelta(days=3650)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO transactions (document_id, user_id, date, merchant, amount, currency, category) "
+        "VALUES (1, ?, ?, ?, ?, 'USD', ?)",
+        (
+            (
+                1 + i % 2, # A second tenant so the user filter matters
+                (start + timedelta(days=random.randrange(3650))).isoformat(),
+                f"Merchant {i % 5000}",
+                round(random.uniform(1, 500), 2),
+                categories[i % len(categories)],
+            )
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+async def main(args):
+    tmpdir = tempfile.mkdtemp(prefix="bench_pages_")
+    db_path = os.path.join(tmpdir, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+
+    from app.api.v1.endpoints.transactions import list_transactions
+    from app.core.database import engine, read_engine, Base
+    from app.schemas.user import UserPrincipal
+    import app.models.sql  # noqa: F401  (registers tables)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    seed(db_path, args.rows)
+
+    principal = UserPrincipal(id=1, email="bench@example.com")
+    latencies, cursor, page = [], None, 0
+    while page < args.pages:
+        began = time.perf_counter()
+        result = await list_transactions(
+            current_user=principal, cursor=cursor, limit=args.limit,
+            start_date=None, end_date=None, categories=None,
+            merchant_prefix=None, min_amount=None, max_amount=None,
+        )
+        latencies.append((time.perf_counter() - began) * 1000)
+        page += 1
+        cursor = result.next_cursor
+        if cursor is None:
+            break
+
+    print(f"rows={args.rows} limit={args.limit} pages_walked={page}")
+    buckets = [(1, 10), (10, 100), (100, 1000), (1000, 10_000)]
+    for lo, hi in buckets:
+        window = latencies[lo - 1:hi]
+        if window:
+            print(f"  pages {lo:>5}-{hi:<6}: p50={percentile(window, 50):6.2f}ms  p99={percentile(window, 99):6.2f}ms")
+
+    await engine.dispose()
+    await read_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,87 @@
+"""
+Token counts of the agent's cache-friendly prompt layout.
+
+Usage:
+    python -m benchmarks.bench_prompt_layout --users 50
+
+Provider-side prefix caching only pays off if every request starts with the
+same bytes; tests/test_prompt_layout.py checks the prefix is byte-identical
+across users and dates and that no tool takes user_id. This builds the system
+messages exactly as agent_node does for many synthetic users, profiles and
+dates, and reports prefix, tool-schema and suffix token counts (tiktoken when
+installed, else ~4 characters per token) and the per-call cost of building
+the messages.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.core.config import settings
+from app.services.agent import TOOLS, SYSTEM_PREFIX, system_messages
+from app.services.profile import render_profile
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10_000)
+    return parser.parse_args()
+
+def token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(settings.LLM_MODEL)
+        return lambda s: len(encoding.encode(s)), "tiktoken"
+    except Exception:
+        return lambda s: len(s) // 4, "~4 chars/token"
+
+def synthetic_profile(user_id: int, today: date) -> str:
+    months = [(today.replace(day=1) - timedelta(days=31 * k)).strftime("%Y-%m") for k in range(3, -1, -1)]
+    categories = random.sample(["Groceries", "Dining", "Rent", "Travel", "Shopping", "Utilities"], 4)
+    return render_profile({
+        "as_of": today.isoformat(),
+        "currency": "USD",
+        "months": months,
+        "month_totals": [round(random.uniform(800, 3000), 2) for _ in months],
+        "categories": [{"category": c, "totals": [round(random.uniform(20, 900), 2) for _ in months]} for c in categories],
+        "budgets": [{"category": categories[0], "limit": 500.0, "spent": 123.45, "percent_used": 24.7}],
+        "recurring": [{"merchant": f"Service {user_id}", "period": "monthly", "amount": 9.99, "next_expected": today.isoformat()}],
+    })
+
+def main(args):
+    count_tokens, counter_name = token_counter()
+    today = date.today()
+
+    # 1. Per-request suffixes for many users, profiles and dates
+    suffixes = []
+    for user_id in range(1, args.users + 1):
+        day = today - timedelta(days=random.randrange(60))
+        profile = synthetic_profile(user_id, day) if user_id % 5 else "" # some users have no profile yet
+        _, suffix = system_messages(profile, day)
+        suffixes.append(suffix.content)
+    schemas = [convert_to_openai_tool(t) for t in TOOLS]
+
+    # 2. Token counts
+    prefix_tokens = count_tokens(SYSTEM_PREFIX)
+    tool_tokens = count_tokens(json.dumps(schemas))
+    suffix_tokens = sorted(count_tokens(s) for s in suffixes)
+    median_suffix = suffix_tokens[len(suffix_tokens) // 2]
+    static = prefix_tokens + tool_tokens
+    print(f"tokens ({counter_name}):")
+    print(f"  static system prefix : {prefix_tokens}")
+    print(f"  tool schemas         : {tool_tokens}")
+    print(f"  per-request suffix   : median={median_suffix} max={suffix_tokens[-1]}")
+    print(f"  cacheable share of the system context: {static / (static + median_suffix):.0%}")
+
+    # 3. Hot-path cost of assembling the system messages
+    profile = synthetic_profile(1, today)
+    began = time.perf_counter()
+    for _ in range(args.repeat):
+        system_messages(profile, today)
+    print(f"system_messages(): {(time.perf_counter() - began) / args.repeat * 1e6:.1f}us per call")
+
+if __name__ == "__main__":
+    main(parse_args())
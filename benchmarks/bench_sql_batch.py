@@ -0,0 +1,96 @@
+"""
+Sequential single-query tool calls vs one concurrent batch, offline.
+
+Usage:
+    python -m benchmarks.bench_sql_batch --transactions 50000 --repeat 20 --model-ms 1500
+
+Seeds a throwaway SQLite database (loadtest.seed), then answers a comparative
+question ("dining vs groceries for each of the last three months") the two
+ways the agent can: one run_sql_query call per figure, or a single
+run_sql_batch call. It checks both return the same figures and reports the SQL
+time of each. It also reports an estimated end-to-end time: every tool call
+costs one model round trip (--model-ms) before it and one final answer after,
+which is where batching saves most.
+"""
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import time
+from datetime import date, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--model-ms", type=float, default=1500.0, help="Assumed latency of one model round trip")
+    return parser.parse_args()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def comparison_queries(today: date):
+    queries = []
+    month = today.replace(day=1)
+    for _ in range(3):
+        month = (month - timedelta(days=1)).replace(day=1)
+        for category in ("Dining", "Groceries"):
+            queries.append({
+                "label": f"{category.lower()}_{month:%Y_%m}",
+                "query": (
+                    "SELECT ROUND(SUM(amount_base), 2) AS total, COUNT(*) AS n FROM transactions "
+                    f"WHERE category = '{category}' AND strftime('%Y-%m', date) = '{month:%Y-%m}'"
+                ),
+            })
+    return queries
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="bench_sql_batch_")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/bench.db"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from app.init_db import init_models
+    from app.services.tools import run_sql_query, run_sql_batch
+    from loadtest.seed import seed
+
+    await init_models()
+    await seed(1, args.transactions)
+    user_id = 1
+    queries = comparison_queries(date.today())
+    print(f"seeded {args.transactions} transactions; {len(queries)} figures per question")
+
+    # 1. Same figures both ways
+    single = [await run_sql_query(q["query"], user_id) for q in queries]
+    batch = await run_sql_batch(queries, user_id)
+    for q, rows in zip(queries, single):
+        total = rows[0]["total"] if isinstance(rows, list) else None
+        section = batch.split(f"## {q['label']}", 1)[1].split("\n## ", 1)[0]
+        figure = re.search(r"\n(\S+) \| \d+", section)
+        assert (figure.group(1) if figure else None) == ("NULL" if total is None else f"{total:.2f}"), (q["label"], total, section)
+    print("batch and single-query results match")
+
+    # 2. SQL time
+    sequential, concurrent = [], []
+    for _ in range(args.repeat):
+        began = time.perf_counter()
+        for q in queries:
+            await run_sql_query(q["query"], user_id)
+        sequential.append((time.perf_counter() - began) * 1000)
+        began = time.perf_counter()
+        await run_sql_batch(queries, user_id)
+        concurrent.append((time.perf_counter() - began) * 1000)
+    seq, con = percentile(sequential, 50), percentile(concurrent, 50)
+    print(f"SQL time  sequential: p50={seq:.1f}ms  batch: p50={con:.1f}ms")
+
+    # 3. Estimated end-to-end: model round trips dominate
+    single_e2e = (len(queries) + 1) * args.model_ms + seq
+    batch_e2e = 2 * args.model_ms + con
+    print(
+        f"estimated answer time at {args.model_ms:.0f}ms per model call: "
+        f"{len(queries) + 1} loop iterations {single_e2e / 1000:.1f}s -> 2 iterations {batch_e2e / 1000:.1f}s"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,76 @@
+"""
+Search latency for one user as the total corpus grows, per partitioning layout.
+
+Usage:
+    python -m benchmarks.bench_vector_partitioning --sizes 10000 50000 200000 --users 200
+
+Uses a throwaway Chroma directory and random unit vectors (no embedding calls).
+With the shared layout latency grows with the whole corpus; per-user collections
+only grow with the user's own data.
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--shards", type=int, default=16)
+    return parser.parse_args()
+
+def unit_vector(dim):
+    v = [random.gauss(0, 1) for _ in range(dim)]
+    norm = sum(x * x for x in v) ** 0.5
+    return [x / norm for x in v]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def route(strategy, user_id, shards):
+    if strategy == "per_user":
+        return f"u{user_id}"
+    if strategy == "sharded":
+        return f"s{user_id % shards}"
+    return "shared"
+
+def main(args):
+    import chromadb
+
+    for size in args.sizes:
+        for strategy in ("shared", "sharded", "per_user"):
+            path = tempfile.mkdtemp(prefix="bench_chroma_")
+            client = chromadb.PersistentClient(path=path)
+            collections = {}
+            for start in range(0, size, 5000):
+                batches = {}
+                for i in range(start, min(size, start + 5000)):
+                    user_id = i % args.users
+                    name = route(strategy, user_id, args.shards)
+                    batch = batches.setdefault(name, {"ids": [], "embeddings": [], "metadatas": []})
+                    batch["ids"].append(f"v{i}")
+                    batch["embeddings"].append(unit_vector(args.dim))
+                    batch["metadatas"].append({"user_id": user_id})
+                for name, batch in batches.items():
+                    if name not in collections:
+                        collections[name] = client.get_or_create_collection(name=name)
+                    collections[name].add(**batch)
+
+            latencies = []
+            for _ in range(args.queries):
+                user_id = random.randrange(args.users)
+                collection = collections[route(strategy, user_id, args.shards)]
+                began = time.perf_counter()
+                collection.query(query_embeddings=[unit_vector(args.dim)], n_results=5, where={"user_id": user_id})
+                latencies.append((time.perf_counter() - began) * 1000)
+
+            print(f"corpus={size:>7} layout={strategy:>8}: p50={percentile(latencies, 50):7.2f}ms  p99={percentile(latencies, 99):7.2f}ms")
+            shutil.rmtree(path, ignore_errors=True)
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,125 @@
+"""
+Local stand-in for the OpenAI API, for exercising the LLM gateway, ingestion
+and chat without a key or quota.
+
+Usage:
+    python -m benchmarks.fake_openai --port 8100 --latency-ms 400 --error-rate 0.05 --stall-rate 0.02
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn app.main:app
+
+Serves /v1/chat/completions and /v1/embeddings. Structured-output requests get a
+small valid ExtractedFinancialData payload, tool-bound chat gets a plain answer,
+and embeddings are deterministic hash vectors. Faults can be injected: a
+fraction of requests answered with 429/503 (--error-rate) and a fraction that
+stall for --stall-ms before answering (--stall-rate).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+EMBEDDING_DIM = 256
+
+FAKE_EXTRACTION = {
+    "transactions": [
+        {"date": "2024-01-03", "merchant": "Starbucks", "amount": 5.75, "currency": "USD", "category": "Dining"},
+        {"date": "2024-01-05", "merchant": "Whole Foods", "amount": 84.20, "currency": "USD", "category": "Groceries"},
+        {"date": "2024-01-09", "merchant": "Netflix", "amount": 15.49, "currency": "USD", "category": "Subscription"},
+    ],
+    "summary": "Three transactions extracted by the fake server."
+}
+
+def create_app(
+    latency_ms: float = 300.0,
+    jitter_ms: float = 100.0,
+    error_rate: float = 0.0,
+    stall_rate: float = 0.0,
+    stall_ms: float = 60_000.0
+) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    async def simulate():
+        app.state.calls += 1
+        delay = max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms))
+        if random.random() < stall_rate:
+            delay = stall_ms
+        await asyncio.sleep(delay / 1000)
+        if random.random() < error_rate:
+            status = random.choice([429, 503])
+            return JSONResponse(status_code=status, content={"error": {"message": f"Injected {status} (fake)", "type": "server_error"}})
+        return None
+
+    def usage(body: dict) -> dict:
+        prompt = sum(len(str(m.get("content") or "")) for m in body.get("messages", [])) // 4
+        return {"prompt_tokens": prompt, "completion_tokens": 60, "total_tokens": prompt + 60}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = await simulate()
+        if error:
+            return error
+
+        message = {"role": "assistant", "content": "You spent $105.44 across 3 transactions (fake answer)."}
+        tool_choice = body.get("tool_choice")
+        forced = tool_choice.get("function", {}).get("name") if isinstance(tool_choice, dict) else None
+        if forced:
+            # with_structured_output(method="function_calling") forces a single tool call
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call_fake",
+                    "type": "function",
+                    "function": {"name": forced, "arguments": json.dumps(FAKE_EXTRACTION)}
+                }]
+            }
+        elif body.get("response_format"):
+            message["content"] = json.dumps(FAKE_EXTRACTION)
+
+        return {
+            "id": f"chatcmpl-fake-{app.state.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if forced else "stop"}],
+            "usage": usage(body)
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        error = await simulate()
+        if error:
+            return error
+
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = []
+        for i, text in enumerate(inputs):
+            digest = hashlib.sha256(str(text).encode()).digest()
+            vector = [(digest[j % len(digest)] - 128) / 128 for j in range(EMBEDDING_DIM)]
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        return {"object": "list", "data": data, "model": body.get("model"), "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+
+    return app
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-ms", type=float, default=60_000.0)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.stall_rate, args.stall_ms), host="127.0.0.1", port=args.port)
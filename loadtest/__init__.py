@@ -0,0 +1,14 @@
+"""
+Mixed-workload HTTP load test.
+
+    python -m loadtest --rps 40 --duration 60 --mix login=1,ingest=1,stats=6,budgets=3,chat=2 --report report.json
+    python -m loadtest.compare before.json after.json
+
+Boots the FastAPI app in-process (lifespan included, embedded ingestion
+workers on) against a throwaway SQLite database seeded with users,
+transactions and budgets. OpenAI chat and embedding calls go to the local
+fake server from benchmarks.fake_openai, so runs are free and repeatable.
+Traffic is open-loop: requests are started at the target rate whether or not
+earlier ones have finished, so a saturated server shows up as growing latency
+and errors rather than as a silently lower request rate.
+"""
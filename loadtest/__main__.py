@@ -0,0 +1,100 @@
+"""
+Entry point: python -m loadtest --help
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import loadtest
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=loadtest.__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=20.0, help="Target request arrival rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unrecorded seconds before measuring")
+    parser.add_argument("--mix", default="login=1,ingest=1,stats=6,budgets=3,chat=2", help="route=weight,...")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=2000, help="Seeded transactions per user")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="Fake OpenAI response time")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=2, help="Embedded ingestion consumers")
+    parser.add_argument("--report", default="", help="Write the JSON report here (default: stdout)")
+    return parser.parse_args()
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def isolate_environment(args) -> str:
+    """
+    Points the app at a scratch directory and the fake OpenAI server. Runs before anything imports
+    app.* (loadtest.runner and loadtest.seed included): settings and engines are built at import time.
+    """
+    # 1. Isolated working directory: SQLite file, ./uploads and ./chroma_db all land here
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/loadtest.db"
+    os.environ["INGESTION_EMBEDDED_WORKERS"] = str(args.workers)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    # 2. Fake OpenAI
+    from loadtest.fakes import start_fake_openai
+    os.environ["OPENAI_BASE_URL"] = start_fake_openai(args.llm_latency_ms, args.llm_error_rate)
+    os.environ["OPENAI_API_KEY"] = "fake-key"
+    os.chdir(workdir)
+    return workdir
+
+async def main(args):
+    commit = git_commit()
+    workdir = isolate_environment(args)
+
+    from loadtest.runner import parse_mix, log_in_users, drive, build_report
+    mix = parse_mix(args.mix)
+
+    import httpx
+    from app.main import app
+    from app.init_db import init_models
+    from app.services.jobs import pending_job_count
+    from app.services.llm_gateway import gateway
+    from loadtest.seed import seed
+
+    await init_models()
+    await seed(args.users, args.transactions)
+    print(f"seeded {args.users} users x {args.transactions} transactions in {workdir}", file=sys.stderr)
+
+    # 3. Drive traffic with the app's lifespan (warm-up, embedded workers) running
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest/api/v1", timeout=120) as client:
+            users = await log_in_users(client, args.users)
+            print(f"driving {args.rps} rps for {args.warmup}+{args.duration}s, mix={mix}", file=sys.stderr)
+            samples, elapsed = await drive(client, users, mix, args.rps, args.duration, args.max_in_flight, args.warmup)
+        backlog = await pending_job_count()
+
+    config = {k: v for k, v in vars(args).items() if k != "report"}
+    config["mix"] = mix
+    config["commit"] = commit
+    report = build_report(samples, elapsed, config, {"ingestion_backlog": backlog, "llm_gateway": gateway.stats()})
+
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for name, route in report["routes"].items():
+        print(f"{name:>8}: {route['throughput_rps']:7.2f} rps  p50={route['p50_ms']:8.1f}ms  p95={route['p95_ms']:8.1f}ms  "
+              f"p99={route['p99_ms']:8.1f}ms  errors={route['error_rate']:.2%}", file=sys.stderr)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.report:
+        args.report = os.path.abspath(args.report) # we chdir into the scratch directory
+    asyncio.run(main(args))
@@ -0,0 +1,37 @@
+"""
+Compare two load-test reports route by route.
+
+    python -m loadtest.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{before['config'].get('commit', '?')} -> {after['config'].get('commit', '?')}")
+    print(f"{'route':>8}  " + "  ".join(f"{m:>22}" for m in METRICS))
+    for name in sorted(set(before["routes"]) | set(after["routes"])):
+        old, new = before["routes"].get(name, {}), after["routes"].get(name, {})
+        cells = []
+        for metric in METRICS:
+            a, b = old.get(metric), new.get(metric)
+            if a is None or b is None:
+                cells.append(f"{'-':>22}")
+                continue
+            change = f"{(b - a) / a:+.0%}" if a else "n/a"
+            cells.append(f"{a:>8.2f} -> {b:>8.2f} {change:>4}")
+        print(f"{name:>8}  " + "  ".join(cells))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Open-loop traffic generator and report aggregation.
+"""
+import asyncio
+import random
+import time
+
+from loadtest.fakes import statement_pdf
+from loadtest.seed import PASSWORD, user_email
+
+CHAT_QUESTIONS = [
+    "How much did I spend on dining last month?",
+    "Am I over budget anywhere?",
+    "What are my subscriptions?",
+    "Where did I buy coffee?",
+]
+
+STATS_RANGES = ["30d", "3m", "6m", "1y", "all"]
+
+STATEMENT_PDF = statement_pdf([f"{day} {merchant} ${amount:.2f}" for day, merchant, amount in [
+    ("2024-01-03", "STARBUCKS #0412", 5.75), ("2024-01-05", "WHOLE FOODS", 84.20), ("2024-01-09", "NETFLIX.COM", 15.49)
+]])
+
+def parse_mix(spec: str) -> dict:
+    """
+    'login=1,stats=6' -> {'login': 1.0, 'stats': 6.0}
+    """
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise ValueError(f"Unknown route '{name}', expected one of {', '.join(ACTIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+# 1. Actions: one HTTP request each, against a randomly chosen seeded user
+async def do_login(client, user):
+    return await client.post("/auth/login", data={"username": user["email"], "password": PASSWORD})
+
+async def do_ingest(client, user):
+    files = {"file": ("statement.pdf", STATEMENT_PDF, "application/pdf")}
+    return await client.post("/documents/ingest", files=files, headers=user["headers"])
+
+async def do_stats(client, user):
+    return await client.get(f"/dashboard/stats?time_range={random.choice(STATS_RANGES)}", headers=user["headers"])
+
+async def do_budgets(client, user):
+    return await client.get("/budgets/status", headers=user["headers"])
+
+async def do_chat(client, user):
+    return await client.post("/chat/message", json={"message": random.choice(CHAT_QUESTIONS)}, headers=user["headers"])
+
+ACTIONS = {
+    "login": do_login,
+    "ingest": do_ingest,
+    "stats": do_stats,
+    "budgets": do_budgets,
+    "chat": do_chat,
+}
+
+# 2. Driver
+async def log_in_users(client, count: int):
+    users = []
+    for i in range(count):
+        email = user_email(i)
+        response = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+        response.raise_for_status()
+        users.append({"email": email, "headers": {"Authorization": f"Bearer {response.json()['access_token']}"}})
+    return users
+
+async def drive(client, users, mix: dict, rps: float, duration: float, max_in_flight: int, warmup: float = 0.0):
+    """
+    Starts requests at Poisson arrivals averaging `rps` for warmup + duration seconds.
+    Only requests started after the warm-up are recorded. Arrivals that find
+    max_in_flight requests already running are counted as dropped (client-side
+    saturation) rather than queued.
+    """
+    names, weights = list(mix), list(mix.values())
+    samples = {name: {"latencies": [], "statuses": {}, "errors": 0, "dropped": 0} for name in names}
+    in_flight = set()
+    loop = asyncio.get_running_loop()
+
+    async def one(name, record):
+        began = time.perf_counter()
+        try:
+            response = await ACTIONS[name](client, random.choice(users))
+            status = str(response.status_code)
+            failed = response.status_code >= 400
+        except Exception as e:
+            status, failed = type(e).__name__, True
+        if record:
+            entry = samples[name]
+            entry["latencies"].append(time.perf_counter() - began)
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["errors"] += failed
+
+    started = loop.time()
+    measure_from, end = started + warmup, started + warmup + duration
+    next_at = started
+    while True:
+        next_at += random.expovariate(rps)
+        if next_at >= end:
+            break
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        name = random.choices(names, weights)[0]
+        record = next_at >= measure_from
+        if len(in_flight) >= max_in_flight:
+            if record:
+                samples[name]["dropped"] += 1
+            continue
+        task = asyncio.create_task(one(name, record))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    # Let stragglers finish so their latency (often the interesting tail) is counted
+    if in_flight:
+        await asyncio.wait(in_flight)
+    return samples, loop.time() - measure_from
+
+def build_report(samples: dict, elapsed: float, config: dict, server: dict) -> dict:
+    routes, total_requests, total_errors = {}, 0, 0
+    for name, entry in samples.items():
+        latencies = entry["latencies"]
+        count = len(latencies)
+        total_requests += count
+        total_errors += entry["errors"]
+        routes[name] = {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2),
+            "errors": entry["errors"],
+            "error_rate": round(entry["errors"] / count, 4) if count else 0.0,
+            "dropped": entry["dropped"],
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(max(latencies, default=0) * 1000, 2),
+            "statuses": entry["statuses"],
+        }
+    return {
+        "config": config,
+        "elapsed_seconds": round(elapsed, 2),
+        "totals": {
+            "requests": total_requests,
+            "throughput_rps": round(total_requests / elapsed, 2),
+            "errors": total_errors,
+            "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+        },
+        "routes": routes,
+        "server": server,
+    }
@@ -0,0 +1,62 @@
+"""
+Seeds the load-test database directly through SQLAlchemy (no HTTP, no LLM).
+"""
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.models.sql import User, Budget, Document, Transaction
+
+PASSWORD = "loadtest-password"
+
+MERCHANTS = [
+    ("Starbucks", "Dining", 6), ("Whole Foods", "Groceries", 85), ("Shell", "Gas", 45), ("Netflix", "Subscription", 15.49),
+    ("Uber", "Travel", 22), ("Amazon", "Shopping", 60), ("Con Edison", "Utilities", 110), ("CVS Pharmacy", "Health", 30),
+    ("Chipotle", "Dining", 14), ("Trader Joe's", "Groceries", 55), ("Spotify", "Subscription", 9.99), ("Delta Air Lines", "Travel", 380),
+]
+BUDGET_CATEGORIES = ["Dining", "Groceries", "Gas", "Shopping", "Travel", "Subscription"]
+
+def user_email(index: int) -> str:
+    return f"load{index}@example.com"
+
+async def seed(users: int, transactions_per_user: int, days: int = 730):
+    """
+    Creates users (one shared bcrypt hash), a completed statement per user with its
+    transactions spread over the last `days`, and a budget per main category.
+    """
+    hashed = get_password_hash(PASSWORD)
+    today = date.today()
+    rng = random.Random(7)
+
+    async with SessionLocal() as session:
+        for i in range(users):
+            user = User(email=user_email(i), full_name=f"Load User {i}", hashed_password=hashed)
+            session.add(user)
+            await session.flush()
+
+            document = Document(filename=f"seed_{i}.pdf", upload_date=datetime.now(), status="completed", user_id=user.id)
+            session.add(document)
+            await session.flush()
+
+            rows = []
+            for _ in range(transactions_per_user):
+                merchant, category, typical = rng.choice(MERCHANTS)
+                amount = round(typical * rng.uniform(0.6, 1.4), 2)
+                rows.append({
+                    "document_id": document.id,
+                    "user_id": user.id,
+                    "date": today - timedelta(days=rng.randrange(days)),
+                    "merchant": merchant,
+                    "amount": amount,
+                    "currency": "USD",
+                    "amount_base": amount,
+                    "category": category,
+                })
+            await session.execute(insert(Transaction), rows)
+            session.add_all([
+                Budget(user_id=user.id, category=category, amount=rng.choice([100, 250, 500, 1000]))
+                for category in BUDGET_CATEGORIES
+            ])
+        await session.commit()
@@ -0,0 +1,30 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    Opens a fresh SQLite file with the app's tables and returns its session factory.
+    Used inside the test's event loop: async with database() as Session.
+    """
+    pytest.importorskip("sqlalchemy")
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("dotenv")
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.database import Base, create_engine_for
+    import app.models.sql # noqa: F401 (registers the tables)
+
+    @asynccontextmanager
+    async def open_database():
+        engine = create_engine_for(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+        finally:
+            await engine.dispose()
+
+    return open_database
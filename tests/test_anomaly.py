@@ -0,0 +1,70 @@
+"""
+Incremental merchant/category statistics against a full recompute.
+"""
+import math
+import random
+import statistics
+from collections import defaultdict
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("dotenv")
+
+from app.core.config import settings
+from app.services.anomaly import score_and_update, stddev
+
+def new_stat(dimension, key):
+    return SimpleNamespace(count=0, mean=0.0, m2=0.0, last_seen=None)
+
+def synthetic_rows(count: int, merchants: int = 40, seed: int = 7):
+    rng = random.Random(seed)
+    categories = ["Groceries", "Dining", "Utilities", "Shopping"]
+    start = date(2023, 1, 1)
+    rows = []
+    for i in range(count):
+        merchant = rng.randrange(merchants)
+        rows.append((
+            i + 1,
+            start + timedelta(days=rng.randrange(500)),
+            f"Merchant {merchant}",
+            None if merchant == 0 else categories[merchant % len(categories)],
+            round(abs(rng.gauss(20 + merchant, 5)), 2),
+        ))
+    return rows
+
+def test_batched_updates_match_a_full_recompute():
+    rows = synthetic_rows(5000)
+    rng = random.Random(3)
+    stats, position = {}, 0
+    while position < len(rows):
+        size = rng.randint(1, 300)
+        score_and_update(stats, rows[position:position + size], new_stat)
+        position += size
+
+    grouped, last_seen = defaultdict(list), {}
+    for _, tx_date, merchant, category, amount in rows:
+        for key in (("merchant", merchant), ("category", category)):
+            if key[1] is None:
+                continue
+            grouped[key].append(amount)
+            last_seen[key] = max(last_seen.get(key, tx_date), tx_date)
+
+    assert set(stats) == set(grouped)
+    for key, amounts in grouped.items():
+        stat = stats[key]
+        assert stat.count == len(amounts)
+        assert math.isclose(stat.mean, statistics.fmean(amounts), rel_tol=1e-9)
+        if len(amounts) > 1:
+            assert math.isclose(stddev(stat), statistics.stdev(amounts), rel_tol=1e-6)
+        assert stat.last_seen == last_seen[key]
+
+def test_flags_a_charge_far_above_the_merchants_history():
+    history = [(i, date(2024, 1, i), "Cafe", "Dining", 4.0 + (i % 3) * 0.5) for i in range(1, settings.ANOMALY_MIN_HISTORY + 5)]
+    stats = {}
+    assert score_and_update(stats, history, new_stat) == []
+
+    flagged = score_and_update(stats, [(100, date(2024, 2, 1), "Cafe", "Dining", 400.0)], new_stat)
+    assert {(tx_id, dimension) for tx_id, dimension, *_ in flagged} == {(100, "merchant"), (100, "category")}
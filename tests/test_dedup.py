@@ -0,0 +1,73 @@
+"""
+Cross-statement duplicate detection: the date window, one-to-one matching and archived rows.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from app.core.config import settings
+from app.models.sql import Transaction, TransactionArchive
+from app.services.dedup import find_duplicates, merchant_key, transaction_fingerprint
+
+DAY = date(2024, 3, 10)
+
+def fingerprint(merchant="Starbucks", amount=5.5, currency="USD"):
+    return transaction_fingerprint(1, merchant, amount, currency)
+
+async def store(Session, *rows, model=Transaction):
+    async with Session() as session:
+        for tx_date, fp, document_id in rows:
+            session.add(model(user_id=1, document_id=document_id, date=tx_date, fingerprint=fp, merchant="m", amount=1.0))
+        await session.commit()
+
+async def duplicates(Session, candidates, document_id=99):
+    async with Session() as session:
+        return await find_duplicates(session, 1, document_id, candidates)
+
+def test_merchant_key_ignores_statement_noise():
+    assert merchant_key("POS STARBUCKS #0412") == merchant_key("Starbucks") == "starbucks"
+    assert fingerprint("CHECKCARD STARBUCKS 0412") == fingerprint("Starbucks")
+    assert fingerprint(amount=5.51) != fingerprint()
+    assert fingerprint(currency="EUR") != fingerprint()
+
+def test_matches_inside_the_date_window_only(database, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_WINDOW_DAYS", 3)
+
+    async def scenario():
+        async with database() as Session:
+            await store(Session, (DAY, fingerprint(), 1))
+            near = date(2024, 3, 13)
+            far = date(2024, 3, 14)
+            assert await duplicates(Session, [(fingerprint(), near)]) == {0}
+            assert await duplicates(Session, [(fingerprint(), far)]) == set()
+            assert await duplicates(Session, [(fingerprint(amount=6.0), DAY)]) == set()
+            # Rows of the same document never count as their own duplicates (a retried ingestion)
+            assert await duplicates(Session, [(fingerprint(), DAY)], document_id=1) == set()
+
+    asyncio.run(scenario())
+
+def test_each_stored_row_absorbs_one_candidate(database):
+    async def scenario():
+        async with database() as Session:
+            await store(Session, (DAY, fingerprint(), 1))
+            # Two identical charges and one stored: the other is a genuine second charge
+            candidates = [(fingerprint(), date(2024, 3, 12)), (fingerprint(), date(2024, 3, 11))]
+            assert await duplicates(Session, candidates) == {0}
+
+            await store(Session, (date(2024, 3, 11), fingerprint(), 2))
+            assert await duplicates(Session, candidates) == {0, 1}
+            assert await duplicates(Session, candidates + [(fingerprint(), DAY)]) == {0, 1}
+
+    asyncio.run(scenario())
+
+def test_archived_rows_count_as_stored(database):
+    async def scenario():
+        async with database() as Session:
+            old = date(2021, 6, 1)
+            await store(Session, (old, fingerprint(), 1), model=TransactionArchive)
+            assert await duplicates(Session, [(fingerprint(), old), (fingerprint(), old)]) == {0}
+
+    asyncio.run(scenario())
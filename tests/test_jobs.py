@@ -0,0 +1,110 @@
+"""
+The SQL-backed ingestion queue: single-winner claims, lease takeover and retry backoff.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.sql import Document, IngestionJob
+from app.services import jobs
+from app.services.jobs import claim_next_job, complete_job, enqueue_ingestion, fail_job, heartbeat, retry_delay
+
+async def enqueue(Session, count: int):
+    async with Session() as session:
+        for i in range(count):
+            document = Document(filename=f"statement_{i}.pdf", user_id=1, status="queued")
+            session.add(document)
+            await session.flush()
+            await enqueue_ingestion(session, document.id, 1, f"uploads/statement_{i}.pdf")
+        await session.commit()
+
+async def job_row(Session, job_id: int):
+    async with Session() as session:
+        return await session.get(IngestionJob, job_id)
+
+def test_each_job_goes_to_exactly_one_worker(database, monkeypatch):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(jobs, "SessionLocal", Session)
+            await enqueue(Session, 3)
+            claimed = await asyncio.gather(*[claim_next_job(f"w{i}") for i in range(6)])
+            won = [job for job in claimed if job is not None]
+            assert sorted(job.id for job in won) == [1, 2, 3]
+            assert len({job.lease_owner for job in won}) == 3
+            assert all(job.status == "running" and job.attempts == 1 for job in won)
+            assert await claim_next_job("late") is None
+
+    asyncio.run(scenario())
+
+def test_expired_lease_is_taken_over(database, monkeypatch):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(jobs, "SessionLocal", Session)
+            await enqueue(Session, 1)
+            job = await claim_next_job("a")
+            assert await heartbeat(job.id, "a")
+            assert await claim_next_job("b") is None # lease still held
+
+            async with Session() as session:
+                await session.execute(
+                    update(IngestionJob).where(IngestionJob.id == job.id)
+                    .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+                )
+                await session.commit()
+            taken = await claim_next_job("b")
+            assert (taken.id, taken.lease_owner, taken.attempts) == (job.id, "b", 2)
+
+            # The old owner can no longer extend, complete or fail the job
+            assert not await heartbeat(job.id, "a")
+            await complete_job(job.id, "a")
+            await fail_job(job, "a", "late failure")
+            row = await job_row(Session, job.id)
+            assert (row.status, row.lease_owner, row.last_error) == ("running", "b", None)
+
+            await complete_job(job.id, "b")
+            assert (await job_row(Session, job.id)).status == "completed"
+
+    asyncio.run(scenario())
+
+def test_failures_back_off_then_give_up(database, monkeypatch):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(jobs, "SessionLocal", Session)
+            monkeypatch.setattr(settings, "INGESTION_MAX_ATTEMPTS", 2)
+            monkeypatch.setattr(jobs, "retry_delay", lambda attempts: 60)
+            await enqueue(Session, 1)
+
+            job = await claim_next_job("a")
+            assert await fail_job(job, "a", "RateLimitError()") is False
+            row = await job_row(Session, job.id)
+            assert (row.status, row.lease_owner) == ("queued", None)
+            assert row.run_after > datetime.utcnow() + timedelta(seconds=50)
+            assert await claim_next_job("a") is None # not before run_after
+
+            async with Session() as session:
+                await session.execute(update(IngestionJob).values(run_after=datetime.utcnow()))
+                await session.commit()
+            job = await claim_next_job("a")
+            assert job.attempts == 2
+            assert await fail_job(job, "a", "RateLimitError()") is True
+            async with Session() as session:
+                status = (await session.execute(select(IngestionJob.status, Document.status).join(
+                    Document, Document.id == IngestionJob.document_id
+                ))).one()
+            assert tuple(status) == ("failed", "failed")
+            assert await claim_next_job("a") is None
+
+    asyncio.run(scenario())
+
+def test_retry_delay_is_jittered_and_doubles(monkeypatch):
+    monkeypatch.setattr(settings, "INGESTION_RETRY_BASE_SECONDS", 10)
+    for attempts, ceiling in [(0, 10), (1, 10), (2, 20), (4, 80)]:
+        delays = [retry_delay(attempts) for _ in range(200)]
+        assert all(0 <= d <= ceiling for d in delays)
+        assert max(delays) > ceiling / 2
@@ -0,0 +1,77 @@
+"""
+Moving cold transactions to the archive: the hot-window cutoff and the monthly rollups that replace them.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import func, select
+
+from app.models.sql import MonthlyRollup, Transaction, TransactionArchive, User
+from app.services import lifecycle
+from app.services.lifecycle import archive_transactions, hot_cutoff
+
+@pytest.mark.parametrize("months, today, expected", [
+    (24, date(2024, 5, 20), date(2022, 5, 1)),
+    (13, date(2024, 1, 31), date(2022, 12, 1)),
+    (1, date(2024, 1, 1), date(2023, 12, 1)),
+    (12, date(2024, 12, 31), date(2023, 12, 1)),
+    (0, date(2024, 3, 15), date(2024, 3, 1)),
+])
+def test_hot_cutoff_is_the_first_day_of_a_whole_month(months, today, expected):
+    assert hot_cutoff(months, today) == expected
+
+def tx(day, category, amount, amount_base=None, user_id=1):
+    return Transaction(
+        user_id=user_id, document_id=1, date=day, merchant="m", category=category,
+        amount=amount, amount_base=amount_base, currency="USD", fingerprint=f"fp{day}{amount}"
+    )
+
+def test_archived_months_are_merged_into_rollups(database, monkeypatch):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(lifecycle, "SessionLocal", Session)
+            monkeypatch.setattr(lifecycle, "hot_cutoff", lambda months, today=None: date(2023, 1, 1))
+            async with Session() as session:
+                session.add_all([User(id=1, email="a@example.com", data_version=3), User(id=2, email="b@example.com")])
+                # Rolled up by an earlier run
+                session.add_all([
+                    MonthlyRollup(user_id=1, month="2022-01", category="Dining", total=100.0, count=2),
+                    MonthlyRollup(user_id=1, month="2022-01", category=None, total=7.0, count=1),
+                ])
+                session.add_all([
+                    tx(date(2022, 1, 5), "Dining", 10.0),
+                    tx(date(2022, 1, 20), "Dining", 20.0, amount_base=18.0), # converted amount wins
+                    tx(date(2022, 1, 21), None, 3.0),
+                    tx(date(2022, 2, 1), "Travel", 50.0),
+                    tx(date(2022, 12, 31), "Dining", 1.0, user_id=2),
+                    tx(date(2023, 1, 1), "Dining", 99.0), # hot: stays
+                ])
+                await session.commit()
+
+            counts = await archive_transactions(months=24, batch_size=2)
+            assert counts["moved"] == 5 and counts["users"] == 2
+
+            async with Session() as session:
+                rollups = {
+                    (r.user_id, r.month, r.category): (r.total, r.count)
+                    for r in (await session.execute(select(MonthlyRollup))).scalars()
+                }
+                hot = (await session.execute(select(Transaction.amount))).scalars().all()
+                archived = (await session.execute(select(func.count(TransactionArchive.id), func.count(TransactionArchive.fingerprint)))).one()
+                version = (await session.execute(select(User.data_version).where(User.id == 1))).scalar()
+
+            assert rollups == {
+                (1, "2022-01", "Dining"): (128.0, 4),
+                (1, "2022-01", None): (10.0, 2),
+                (1, "2022-02", "Travel"): (50.0, 1),
+                (2, "2022-12", "Dining"): (1.0, 1),
+            }
+            assert hot == [99.0]
+            assert tuple(archived) == (5, 5)
+            assert version > 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+"""
+Dispatch order and per-process quota of the LLM gateway.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from app.core.config import settings
+from app.services.llm_gateway import LLMGateway, Priority, process_quota
+
+def test_chat_is_not_held_behind_a_refilling_extraction():
+    async def scenario():
+        gateway = LLMGateway(requests_per_minute=600, tokens_per_minute=6000, max_concurrency=4)
+        gateway.tokens.consume(gateway.tokens.capacity) # empty: 100 tokens/s refill
+        # Head of the queue needs ~50s of refill
+        extraction = asyncio.ensure_future(gateway._acquire(Priority.INGESTION, 5000))
+        await asyncio.sleep(0)
+        # ...while a small chat call can go in ~0.5s
+        await asyncio.wait_for(gateway._acquire(Priority.CHAT, 50), 2)
+        assert not extraction.done()
+        extraction.cancel()
+
+    asyncio.run(scenario())
+
+def test_quota_is_split_between_api_and_worker_processes(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 600)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 60000)
+    monkeypatch.setattr(settings, "LLM_CHAT_SHARE", 0.5)
+    monkeypatch.setattr(settings, "LLM_API_PROCESSES", 2)
+    monkeypatch.setattr(settings, "LLM_WORKER_PROCESSES", 3)
+    assert process_quota("api") == (150, 15000)
+    assert process_quota("worker") == (100, 10000)
+
+    monkeypatch.setattr(settings, "LLM_WORKER_PROCESSES", 0)
+    assert process_quota("api") == (300, 30000)
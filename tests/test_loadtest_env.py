@@ -0,0 +1,38 @@
+"""
+The load test points the app at its scratch directory before anything under app/ is imported.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if k not in ("DATABASE_URL", "OPENAI_API_KEY", "OPENAI_BASE_URL")}
+    env["PYTHONPATH"] = ROOT
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+
+def test_entry_point_does_not_import_the_app():
+    result = run_python(
+        "import sys, loadtest.__main__\n"
+        "assert not [m for m in sys.modules if m == 'app' or m.startswith('app.')], sorted(sys.modules)\n"
+    )
+    assert result.returncode == 0, result.stderr
+
+def test_database_and_credentials_are_isolated():
+    for module in ("fastapi", "uvicorn", "sqlalchemy", "aiosqlite", "dotenv"):
+        pytest.importorskip(module)
+    result = run_python(
+        "import os, types\n"
+        "from loadtest.__main__ import isolate_environment\n"
+        "workdir = isolate_environment(types.SimpleNamespace(workers=1, llm_latency_ms=0, llm_error_rate=0))\n"
+        "from loadtest.runner import parse_mix\n"
+        "from app.core.config import settings\n"
+        "from app.core.database import engine\n"
+        "assert os.getcwd() == workdir\n"
+        "assert engine.url.database == os.path.join(workdir, 'loadtest.db'), engine.url\n"
+        "assert settings.OPENAI_API_KEY == 'fake-key'\n"
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,55 @@
+"""
+The in-place profile update matches a full rebuild.
+"""
+from datetime import date
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from app.services.diagnostics import SpendingHistory
+from app.services.profile import build_profile, apply_changes, render_profile
+
+TODAY = date(2024, 5, 20)
+
+def history(rows):
+    return SpendingHistory(*zip(*[(m, a, d, c) for d, m, c, a in rows]))
+
+BEFORE = [
+    ("2024-02-03", "Netflix", "Entertainment", 15.99),
+    ("2024-03-03", "Netflix", "Entertainment", 15.99),
+    ("2024-04-03", "Netflix", "Entertainment", 15.99),
+    ("2024-04-11", "Cafe", "Dining", 12.50),
+    ("2024-05-02", "Market", "Groceries", 80.00),
+    ("2023-01-15", "Old shop", "Shopping", 40.00), # outside the window
+]
+NEW = [
+    ("2024-05-03", "Netflix", "Entertainment", 17.99),
+    ("2024-05-10", "Cafe", "Dining", 9.25),
+    ("2024-05-11", "Garage", None, 120.00),
+    ("2024-01-02", "Market", "Groceries", 33.00),
+]
+BUDGETS = {"Dining": 100.0, "Groceries": 300.0}
+
+def test_applied_rows_match_a_rebuild():
+    applied = apply_changes(build_profile(history(BEFORE), {}, TODAY, months=3), NEW, BUDGETS, TODAY)
+    rebuilt = build_profile(history(BEFORE + NEW), BUDGETS, TODAY, months=3)
+
+    assert applied["month_totals"] == pytest.approx(rebuilt["month_totals"])
+    assert {c["category"]: c["totals"] for c in applied["categories"]} == pytest.approx(
+        {c["category"]: c["totals"] for c in rebuilt["categories"]}
+    )
+    assert [c["category"] for c in applied["categories"]][0] == rebuilt["categories"][0]["category"]
+    assert applied["budgets"] == rebuilt["budgets"]
+    netflix = next(r for r in applied["recurring"] if r["merchant"] == "Netflix")
+    assert netflix == {"merchant": "Netflix", "period": "monthly", "amount": 17.99, "next_expected": "2024-06-02"}
+
+def test_budget_change_without_rows():
+    profile = build_profile(history(BEFORE), {"Dining": 50.0}, TODAY, months=3)
+    applied = apply_changes(profile, [], {"Groceries": 160.0}, TODAY)
+    assert applied["budgets"] == [{"category": "Groceries", "limit": 160.0, "spent": 80.0, "percent_used": 50.0}]
+
+def test_render_budget_without_limit():
+    profile = build_profile(history(BEFORE), {"Groceries": None}, TODAY, months=3)
+    assert "- Groceries: 80.00 (no limit set)" in render_profile(profile)
@@ -0,0 +1,46 @@
+"""
+The agent's system prompt starts with the same bytes for every user, so provider-side prefix caching applies.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("langgraph")
+pytest.importorskip("numpy")
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.services.agent import TOOLS, SYSTEM_PREFIX, build_system_prefix, system_messages
+from app.services.profile import render_profile
+
+TODAY = date(2024, 5, 20)
+
+def profile_for(user_id: int, today: date) -> str:
+    months = ["2024-02", "2024-03", "2024-04", "2024-05"]
+    return render_profile({
+        "as_of": today.isoformat(),
+        "currency": "USD",
+        "months": months,
+        "month_totals": [1000.0 + user_id, 900.0, 1200.0, 300.0],
+        "categories": [{"category": "Dining", "totals": [100.0, 90.0, 120.0, float(user_id)]}],
+        "budgets": [{"category": "Dining", "limit": 500.0, "spent": float(user_id), "percent_used": user_id / 5}],
+        "recurring": [{"merchant": f"Service {user_id}", "period": "monthly", "amount": 9.99, "next_expected": today.isoformat()}],
+    })
+
+def test_prefix_is_identical_for_every_user_and_date():
+    prefixes = set()
+    for user_id in range(1, 30):
+        day = TODAY - timedelta(days=user_id)
+        # Some users have no profile yet
+        prefix, suffix = system_messages(profile_for(user_id, day) if user_id % 5 else "", day)
+        prefixes.add(prefix.content.encode("utf-8"))
+        assert f"Service {user_id}" not in prefix.content and day.isoformat() not in prefix.content
+        assert day.isoformat() in suffix.content
+    assert prefixes == {SYSTEM_PREFIX.encode("utf-8")}
+    assert build_system_prefix() == SYSTEM_PREFIX
+
+def test_no_tool_takes_user_id():
+    for tool in TOOLS:
+        params = convert_to_openai_tool(tool)["function"]["parameters"].get("properties", {})
+        assert "user_id" not in params, tool.name
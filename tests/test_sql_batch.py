@@ -0,0 +1,78 @@
+"""
+The agent's batched SQL tool: per-entry labels, row caps and errors that stay inside their own entry.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("numpy")
+
+from app.core.config import settings
+from app.models.sql import Budget, Transaction
+from app.services import tools
+from app.services.tools import run_sql_batch
+
+OWNER, OTHER = 1, 2
+
+async def seed(Session):
+    async with Session() as session:
+        for user_id, amounts in ((OWNER, [10.0, 20.0, 30.0]), (OTHER, [999.0])):
+            for amount in amounts:
+                session.add(Transaction(user_id=user_id, date=date(2024, 3, 1), merchant="m", category="Dining", amount=amount))
+        session.add(Budget(user_id=OWNER, category="Dining", amount=100.0))
+        await session.commit()
+
+def run_batch(database, monkeypatch, queries):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(tools, "ReadSessionLocal", Session)
+            await seed(Session)
+            return await run_sql_batch(queries, OWNER)
+    return asyncio.run(scenario())
+
+def test_sections_are_labeled_and_truncated(database, monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_SQL_MAX_ROWS", 2)
+    result = run_batch(database, monkeypatch, [
+        {"label": "rows", "query": "SELECT amount FROM transactions ORDER BY amount"},
+        {"label": "", "query": "SELECT SUM(amount) AS total FROM transactions"},
+        {"label": "budgets", "query": "SELECT category, amount FROM budgets"},
+    ])
+    assert result.split("\n\n") == [
+        "## rows (2 rows, truncated)\namount\n10.00\n20.00",
+        "## query_2 (1 rows)\ntotal\n60.00",
+        "## budgets (1 rows)\ncategory | amount\nDining | 100.00",
+    ]
+
+def test_errors_stay_in_their_own_entry(database, monkeypatch):
+    result = run_batch(database, monkeypatch, [
+        {"label": "ok", "query": "SELECT COUNT(*) AS n FROM transactions"},
+        {"label": "hidden", "query": "SELECT email FROM users"},
+        {"label": "write", "query": "DELETE FROM transactions"},
+        {"label": "broken", "query": "SELECT no_such_column FROM transactions"},
+        {"label": "empty", "query": "SELECT amount FROM transactions WHERE amount > 1000"},
+    ])
+    ok, hidden, write, broken, empty = result.split("\n\n")
+    assert ok == "## ok (1 rows)\nn\n3"
+    assert hidden.startswith("## hidden\nError:")
+    assert write == "## write\nError: Read-only access."
+    assert broken.startswith("## broken\nDatabase Error:") and "no_such_column" in broken
+    assert empty == "## empty (0 rows)"
+
+def test_batch_size_is_capped(database, monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_SQL_BATCH_MAX_QUERIES", 2)
+    result = run_batch(database, monkeypatch, [{"label": f"q{i}", "query": "SELECT 1 AS one"} for i in range(3)])
+    sections = result.split("\n\n")
+    assert [s.splitlines()[0] for s in sections[:2]] == ["## q0 (1 rows)", "## q1 (1 rows)"]
+    assert sections[2] == "Skipped 1 queries: at most 2 per batch."
+
+def test_a_slow_entry_times_out_alone(database, monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_SQL_TIMEOUT_SECONDS", 0.2)
+    result = run_batch(database, monkeypatch, [
+        {"label": "slow", "query": "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"},
+        {"label": "fast", "query": "SELECT MAX(amount) AS top FROM transactions"},
+    ])
+    slow, fast = result.split("\n\n")
+    assert slow == "## slow\nError: query exceeded 0.2s"
+    assert fast == "## fast (1 rows)\ntop\n30.00"
@@ -0,0 +1,119 @@
+"""
+The agent's SQL sandbox, run against a real SQLite database holding two users' rows.
+"""
+import sqlite3
+
+import pytest
+
+from app.services.sql_guard import check_query, scope_query
+
+OWNER, OTHER = 1, 2
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+    CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT);
+    CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id INTEGER, amount REAL, category TEXT, description TEXT);
+    CREATE TABLE monthly_rollups (id INTEGER PRIMARY KEY, user_id INTEGER, month TEXT, total REAL);
+    CREATE TABLE anomalies (id INTEGER PRIMARY KEY, user_id INTEGER, zscore REAL);
+    CREATE TABLE budgets (id INTEGER PRIMARY KEY, user_id INTEGER, category TEXT, amount REAL);
+    INSERT INTO users VALUES (1, 'owner@example.com'), (2, 'other@example.com');
+    INSERT INTO transactions VALUES
+        (1, 1, 10.0, 'Dining', 'drop in cafe'), (2, 1, 20.0, 'Groceries', 'market'),
+        (3, 2, 999.0, 'Dining', 'secret'), (4, 2, 888.0, 'Travel', 'secret');
+    INSERT INTO monthly_rollups VALUES (1, 1, '2024-01', 30.0), (2, 2, '2024-01', 1887.0);
+    INSERT INTO anomalies VALUES (1, 2, 4.2);
+    INSERT INTO budgets VALUES (1, 1, 'Dining', 100.0), (2, 2, 'Dining', 5000.0);
+    """)
+    yield conn
+    conn.close()
+
+def run(db, query):
+    assert check_query(query) is None, check_query(query)
+    return db.execute(scope_query(query, "main"), {"scope_uid": OWNER}).fetchall()
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM main.transactions",
+    'SELECT * FROM main."transactions"',
+    "SELECT * FROM main.[transactions]",
+    "SELECT * FROM main.`transactions`",
+    'SELECT * FROM "main"."transactions"',
+    'SELECT * FROM public."transactions"',
+    "SELECT * FROM public . transactions",
+    "SELECT * FROM main./**/transactions",
+    "SELECT * FROM main.--\ntransactions",
+    'SELECT * FROM "transactions"',
+    'SELECT * FROM "Transactions"',
+    "SELECT * FROM [budgets]",
+    "SELECT amount FROM temp.monthly_rollups",
+    'SELECT * FROM main."anomalies"',
+    "SELECT * FROM users",
+    'SELECT * FROM "users"',
+    "SELECT * FROM transactions_archive",
+    "SELECT * FROM sqlite_master",
+    "SELECT * FROM pragma_table_info('users')",
+    "SELECT * FROM pg_catalog.pg_tables",
+    "SELECT * FROM information_schema.tables",
+    "SELECT query_to_xml('select * from public.transactions', true, false, '')",
+    "SELECT * FROM dblink('dbname=app', 'select 1')",
+    "SELECT * FROM ts_stat('select to_tsvector(description) from public.transactions')",
+    "SELECT $$x$$ FROM transactions",
+    "SELECT E'\\'' FROM transactions",
+    'SELECT U&"\\0074ransactions" FROM transactions',
+    "SELECT * FROM transactions /* unterminated",
+    "SELECT 'unterminated FROM main.transactions",
+    "SELECT email, hashed_password FROM 'users'",
+    "SELECT * FROM main.'transactions'",
+    "SELECT * FROM 'main'.'transactions'",
+    "SELECT * FROM 'Transactions'",
+    "SELECT * FROM budgets b JOIN 'sqlite_master' m ON 1 = 1",
+    "SELECT * FROM budgets, 'spending_stats'",
+])
+def test_rejects_reads_past_the_user_scope(query):
+    assert check_query(query) is not None
+
+@pytest.mark.parametrize("query", [
+    "DELETE FROM transactions",
+    "SELECT 1; DELETE FROM transactions",
+    "INSERT INTO budgets VALUES (3, 1, 'x', 1)",
+    "SELECT * INTO stolen FROM transactions",
+    "UPDATE budgets SET amount = 0",
+    "ATTACH DATABASE 'x.db' AS x",
+    "PRAGMA query_only = OFF",
+    "WITH x AS (SELECT 1) DELETE FROM transactions",
+    "SET search_path = other",
+])
+def test_rejects_writes(query):
+    assert check_query(query) == "Error: Read-only access."
+
+def test_bypass_forms_would_leak_without_the_check(db):
+    # What the rejected forms read once scoped: every user's rows
+    for query in [
+        'SELECT amount FROM main."transactions"', "SELECT amount FROM main.[transactions]",
+        "SELECT amount FROM main.'transactions'", "SELECT amount FROM 'main'.'transactions'",
+    ]:
+        assert len(db.execute(scope_query(query, "main"), {"scope_uid": OWNER}).fetchall()) == 4
+    assert len(db.execute(scope_query("SELECT email FROM 'users'", "main"), {"scope_uid": OWNER}).fetchall()) == 2
+
+def test_only_the_owners_rows_are_visible(db):
+    assert sorted(r[0] for r in run(db, "SELECT amount FROM transactions")) == [10.0, 20.0]
+    assert run(db, "SELECT SUM(total) FROM monthly_rollups") == [(30.0,)]
+    assert run(db, "SELECT COUNT(*) FROM anomalies") == [(0,)]
+    assert run(db, "SELECT t.amount, b.amount FROM transactions t JOIN budgets b ON b.category = t.category") == [(10.0, 100.0)]
+
+def test_merges_with_the_querys_own_ctes(db):
+    query = "WITH dining AS (SELECT * FROM transactions WHERE category = 'Dining') SELECT SUM(amount) FROM dining"
+    assert run(db, query) == [(10.0,)]
+
+def test_recursive_cte_stays_scoped(db):
+    query = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3)
+    SELECT n.i, COUNT(t.id) FROM n LEFT JOIN transactions t ON t.id = n.i GROUP BY n.i
+    """
+    assert run(db, query) == [(1, 1), (2, 1), (3, 0)]
+
+def test_keywords_inside_strings_and_qualified_columns_are_allowed(db):
+    assert run(db, "SELECT transactions.amount FROM transactions WHERE description LIKE '%drop%'") == [(10.0,)]
+    assert run(db, "-- leading comment\nSELECT COUNT(*) FROM transactions;") == [(2,)]
+    assert run(db, "SELECT category, 'x' AS tag FROM transactions WHERE category IN ('Dining', 'Travel')") == [("Dining", "x")]
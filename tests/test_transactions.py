@@ -0,0 +1,101 @@
+"""
+Keyset pagination of the transaction list: every row exactly once, newest first, filters kept across pages.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import transactions
+from app.api.v1.endpoints.transactions import decode_cursor, encode_cursor, list_transactions
+from app.models.sql import Transaction
+from app.schemas.user import UserPrincipal
+
+OWNER = UserPrincipal(id=1, email="owner@example.com")
+
+ROWS = [
+    # (date, merchant, category, amount); several rows share a date so the id breaks ties
+    (date(2024, 3, 1), "Cafe", "Dining", 4.0),
+    (date(2024, 3, 1), "Market", "Groceries", 40.0),
+    (date(2024, 3, 1), "Cafe", "Dining", 5.0),
+    (date(2024, 2, 15), "Airline", "Travel", 300.0),
+    (date(2024, 2, 15), "Bistro", "Dining", 25.0),
+    (date(2024, 2, 1), "Market", "Groceries", 35.0),
+    (date(2024, 1, 20), "Cafe", "Dining", 3.5),
+]
+
+async def seed(Session):
+    async with Session() as session:
+        for tx_date, merchant, category, amount in ROWS:
+            session.add(Transaction(user_id=1, date=tx_date, merchant=merchant, category=category, amount=amount, currency="USD"))
+        # Another user's rows never show up
+        session.add(Transaction(user_id=2, date=date(2024, 3, 1), merchant="Cafe", category="Dining", amount=999.0))
+        await session.commit()
+
+def fetch_page(cursor, limit, **filters):
+    params = dict(start_date=None, end_date=None, categories=None, merchant_prefix=None, min_amount=None, max_amount=None)
+    params.update(filters)
+    return list_transactions(current_user=OWNER, cursor=cursor, limit=limit, **params)
+
+async def all_pages(limit, **filters):
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = await fetch_page(cursor, limit, **filters)
+        pages += 1
+        seen.extend(page.items)
+        if page.next_cursor is None:
+            return seen, pages
+        cursor = page.next_cursor
+
+def test_pages_cover_every_row_once_in_order(database, monkeypatch):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(transactions, "ReadSessionLocal", Session)
+            await seed(Session)
+            for limit in (1, 2, 3, len(ROWS), 50):
+                items, pages = await all_pages(limit)
+                keys = [(item.date, item.id) for item in items]
+                assert keys == sorted(keys, reverse=True)
+                assert sorted(item.id for item in items) == list(range(1, len(ROWS) + 1))
+                assert pages == max(1, -(-len(ROWS) // limit))
+
+    asyncio.run(scenario())
+
+def test_filters_apply_on_every_page(database, monkeypatch):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(transactions, "ReadSessionLocal", Session)
+            await seed(Session)
+            items, _ = await all_pages(1, categories=["Dining", "Travel"], min_amount=4.0)
+            assert [(i.merchant, i.amount) for i in items] == [("Cafe", 5.0), ("Cafe", 4.0), ("Bistro", 25.0), ("Airline", 300.0)]
+            items, _ = await all_pages(2, merchant_prefix="Ma", end_date=date(2024, 2, 28))
+            assert [(i.date, i.merchant) for i in items] == [(date(2024, 2, 1), "Market")]
+
+    asyncio.run(scenario())
+
+def test_rows_added_after_the_first_page_do_not_shift_later_pages(database, monkeypatch):
+    async def scenario():
+        async with database() as Session:
+            monkeypatch.setattr(transactions, "ReadSessionLocal", Session)
+            await seed(Session)
+            first = await fetch_page(None, 3)
+            async with Session() as session:
+                session.add(Transaction(user_id=1, date=date(2024, 4, 1), merchant="New", category="Dining", amount=1.0))
+                await session.commit()
+            second = await fetch_page(first.next_cursor, 3)
+            assert not {i.id for i in first.items} & {i.id for i in second.items}
+            assert [i.date for i in second.items] == [date(2024, 2, 15), date(2024, 2, 15), date(2024, 2, 1)]
+
+    asyncio.run(scenario())
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(date(2024, 3, 1), 42)) == (date(2024, 3, 1), 42)
+    for garbage in ["not-a-cursor", encode_cursor("yesterday", 1), "W10"]:
+        with pytest.raises(HTTPException) as excinfo:
+            decode_cursor(garbage)
+        assert excinfo.value.status_code == 400
@@ -0,0 +1,50 @@
+"""
+A consumer that loses its job's lease stops processing and leaves the job to the new owner.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("dotenv")
+pytest.importorskip("numpy")
+
+from app import worker
+from app.core.config import settings
+
+def test_lost_lease_cancels_the_run_without_acknowledging(monkeypatch):
+    calls, stop = [], asyncio.Event()
+    job = SimpleNamespace(id=7, document_id=3, file_path="x.pdf", user_id=1, attempts=1)
+
+    async def claim_next_job(worker_id):
+        if calls:
+            stop.set()
+            return None
+        calls.append("claim")
+        return job
+
+    async def heartbeat(job_id, worker_id):
+        return False # Reclaimed by another worker
+
+    async def process_document_task(*args, **kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            calls.append("cancelled")
+            raise
+        calls.append("committed")
+
+    async def acknowledge(*args):
+        calls.append("acknowledged")
+
+    monkeypatch.setattr(settings, "INGESTION_HEARTBEAT_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "INGESTION_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(worker, "claim_next_job", claim_next_job)
+    monkeypatch.setattr(worker, "heartbeat", heartbeat)
+    monkeypatch.setattr(worker, "process_document_task", process_document_task)
+    monkeypatch.setattr(worker, "complete_job", acknowledge)
+    monkeypatch.setattr(worker, "fail_job", acknowledge)
+
+    asyncio.run(asyncio.wait_for(worker.consume("w", stop), 5))
+    assert calls == ["claim", "cancelled"]